@@ -6,7 +6,8 @@ Handles sector analysis, scoring, and ranking with configurable weights
 import pandas as pd
 import numpy as np
 
-from indicators import calculate_rsi, calculate_adx, calculate_cmf, calculate_z_score, calculate_mansfield_rs
+from indicators import (calculate_rsi, calculate_adx, calculate_cmf, calculate_z_score, calculate_mansfield_rs,
+                        njit, NUMBA_AVAILABLE)
 from config import (REVERSAL_BUY_DIV, REVERSAL_WATCH, DEFAULT_MOMENTUM_WEIGHTS, 
                     DEFAULT_REVERSAL_WEIGHTS, DECIMAL_PLACES, MANSFIELD_RS_PERIOD)
 
@@ -41,28 +42,142 @@ def calculate_relative_strength(sector_returns, benchmark_returns):
     return rs_rating
 
 
-def analyze_sector(name, data, benchmark_data, momentum_weights=None, reversal_weights=None, symbol=None, interval='1d', reversal_thresholds=None):
+def rank_min(values, ascending=False):
     """
-    Perform comprehensive analysis on a sector.
+    NumPy equivalent of Series.rank(method='min') for small arrays.
+    
+    Args:
+        values: 1-D array of values, or 2-D array ranked row by row (NaN values are left unranked)
+        ascending: If False (default), the highest value gets rank 1
+        
+    Returns:
+        Float array of ranks (ties share the lowest rank, NaN stays NaN)
+    """
+    # float32 inputs are compared as float32; anything else is ranked as float64
+    values = np.asarray(values)
+    if values.dtype != np.float32:
+        values = values.astype(float)
+    if ascending:
+        beats = values[..., None, :] < values[..., :, None]
+    else:
+        beats = values[..., None, :] > values[..., :, None]
+    # Count in int16 (a row holds at most a few dozen sectors) rather than the default int64
+    ranks = 1.0 + beats.sum(axis=-1, dtype=np.int16)
+    ranks[np.isnan(values)] = np.nan
+    return ranks
+
+
+def top_k_desc(values, k=None):
+    """
+    Positions of the k largest values, ordered like Series.sort_values(ascending=False).
+    Uses the same reversed quicksort as pandas so ties resolve the same way; NaN values come last.
+    
+    Args:
+        values: 1-D array of values
+        k: Number of positions to return (default: all)
+        
+    Returns:
+        Integer array of positions, best first
+    """
+    values = np.asarray(values, dtype=float)
+    valid = np.flatnonzero(~np.isnan(values))[::-1]
+    order = valid[values[valid].argsort(kind='quicksort')][::-1]
+    return np.concatenate([order, np.flatnonzero(np.isnan(values))])[:k]
+
+
+@njit(cache=True)
+def _weighted_rank_kernel(values, weights, total_weight, ascending, scale):
+    """
+    Fused min-rank and weighted sum over a (factors, steps, sectors) array.
+    Each term is added as rank * weight / total_weight * scale, in factor order,
+    so the result matches the NumPy path bit for bit.
+    """
+    factors, steps, sectors = values.shape
+    out = np.zeros((steps, sectors))
+    for t in range(steps):
+        for k in range(factors):
+            for i in range(sectors):
+                value = values[k, t, i]
+                if np.isnan(value):
+                    out[t, i] = np.nan
+                    continue
+                rank = 1.0
+                for j in range(sectors):
+                    other = values[k, t, j]
+                    if (other < value) if ascending[k] else (other > value):
+                        rank += 1.0
+                out[t, i] += rank * weights[k] / total_weight * scale
+    return out
+
+
+def weighted_rank_min(factors, weights, ascending, total_weight, scale=1.0):
+    """
+    Weighted sum of min-ranks across several factors, ranked row by row.
+    Uses the compiled kernel when numba is installed, otherwise rank_min per factor.
+    
+    Args:
+        factors: (factors, steps, sectors) array, or a list of (steps, sectors) arrays
+            (NaN values are left unranked)
+        weights: Weight of each factor
+        ascending: Rank direction of each factor (False = highest value gets rank 1)
+        total_weight: Divisor applied to every weight
+        scale: Multiplier applied to every weighted rank
+        
+    Returns:
+        Float array of shape (steps, sectors) (NaN where any factor is NaN)
+    """
+    if NUMBA_AVAILABLE:
+        values = factors if isinstance(factors, np.ndarray) else np.stack(factors)
+        if values.dtype != np.float32:
+            values = values.astype(float)
+        return _weighted_rank_kernel(np.ascontiguousarray(values),
+                                     np.asarray(weights, dtype=float), float(total_weight),
+                                     np.asarray(ascending, dtype=np.bool_), float(scale))
+    return sum(
+        rank_min(values, ascending=asc) * weight / total_weight * scale
+        for values, weight, asc in zip(factors, weights, ascending)
+    )
+
+
+def scale_weighted_rank(weighted_rank):
+    """
+    Scale weighted average ranks to 1-10 where 10 = best (lowest weighted rank).
+    
+    Args:
+        weighted_rank: 1-D array of weighted average ranks, or 2-D array scaled row by row
+        
+    Returns:
+        Float array of scores (5.0 for a whole row when its ranks are identical or it has one sector)
+    """
+    weighted_rank = np.asarray(weighted_rank, dtype=float)
+    if weighted_rank.shape[-1] <= 1:
+        return np.full(weighted_rank.shape, 5.0)
+    
+    # NaN-ignoring min/max without the all-NaN warnings of np.nanmin/np.nanmax
+    missing = np.isnan(weighted_rank)
+    min_rank = np.where(missing, np.inf, weighted_rank).min(axis=-1, keepdims=True)
+    max_rank = np.where(missing, -np.inf, weighted_rank).max(axis=-1, keepdims=True)
+    spread = max_rank > min_rank
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = 10 - ((weighted_rank - min_rank) / (max_rank - min_rank)) * 9
+    return np.where(spread, scores, 5.0)
+
+
+def calculate_sector_indicators(name, data, benchmark_data, symbol=None, interval='1d'):
+    """
+    Calculate the weight-independent indicators for a sector.
     
     Args:
         name: Sector name
         data: Sector data DataFrame
         benchmark_data: Benchmark sector data (Nifty 50)
-        momentum_weights: Dict with weights for momentum score (default: DEFAULT_MOMENTUM_WEIGHTS)
-        reversal_weights: Dict with weights for reversal score (default: DEFAULT_REVERSAL_WEIGHTS)
         symbol: Symbol/ticker for the sector (optional)
         interval: Data interval ('1d', '1wk', '1h') for Mansfield RS calculation
-        reversal_thresholds: Dict with RSI and ADX_Z thresholds for reversal filtering
         
     Returns:
-        Dictionary with analysis results or None if error
+        Dictionary with raw indicator values or None if error
     """
-    if momentum_weights is None:
-        momentum_weights = DEFAULT_MOMENTUM_WEIGHTS
-    if reversal_weights is None:
-        reversal_weights = DEFAULT_REVERSAL_WEIGHTS
-        
     try:
         # Calculate indicators
         rsi = calculate_rsi(data)
@@ -76,7 +191,7 @@ def analyze_sector(name, data, benchmark_data, momentum_weights=None, reversal_w
         latest_cmf = cmf.iloc[-1] if not cmf.isna().all() else 0.0
         
         # Calculate Z-Score for ADX
-        adx_z_score = calculate_z_score(adx.dropna())
+        adx_z_score = calculate_z_score(adx)
         
         # Calculate Mansfield RS with interval-appropriate period
         mansfield_rs = calculate_mansfield_rs(data, benchmark_data, interval=interval)
@@ -97,17 +212,6 @@ def analyze_sector(name, data, benchmark_data, momentum_weights=None, reversal_w
         else:
             rs_rating = 5.0
         
-        # Store values for ranking-based momentum score calculation
-        momentum_score = 0  # Will be calculated after all sectors are analyzed
-        
-        # Calculate Reversal Score with configurable weights
-        reversal_score = calculate_reversal_score(
-            latest_rsi, adx_z_score, latest_cmf, rs_rating, reversal_weights
-        )
-        
-        # Determine Reversal Status (with user-defined thresholds)
-        reversal_status = determine_reversal_status(latest_rsi, adx_z_score, latest_cmf, reversal_thresholds)
-        
         # Get current price and previous close for % change calculation
         current_price = data['Close'].iloc[-1] if len(data) > 0 else 0.0
         prev_close = data['Close'].iloc[-2] if len(data) > 1 else current_price
@@ -124,10 +228,7 @@ def analyze_sector(name, data, benchmark_data, momentum_weights=None, reversal_w
             'DI_Spread': latest_di_spread,
             'CMF': latest_cmf,
             'Mansfield_RS': mansfield_rs,
-            'RS_Rating': rs_rating,
-            'Momentum_Score': momentum_score,
-            'Reversal_Score': reversal_score,
-            'Reversal_Status': reversal_status
+            'RS_Rating': rs_rating
         }
         
     except Exception as e:
@@ -135,6 +236,50 @@ def analyze_sector(name, data, benchmark_data, momentum_weights=None, reversal_w
         return None
 
 
+def analyze_sector(name, data, benchmark_data, momentum_weights=None, reversal_weights=None, symbol=None, interval='1d', reversal_thresholds=None):
+    """
+    Perform comprehensive analysis on a sector.
+    
+    Args:
+        name: Sector name
+        data: Sector data DataFrame
+        benchmark_data: Benchmark sector data (Nifty 50)
+        momentum_weights: Dict with weights for momentum score (default: DEFAULT_MOMENTUM_WEIGHTS)
+        reversal_weights: Dict with weights for reversal score (default: DEFAULT_REVERSAL_WEIGHTS)
+        symbol: Symbol/ticker for the sector (optional)
+        interval: Data interval ('1d', '1wk', '1h') for Mansfield RS calculation
+        reversal_thresholds: Dict with RSI and ADX_Z thresholds for reversal filtering
+        
+    Returns:
+        Dictionary with analysis results or None if error
+    """
+    result = calculate_sector_indicators(name, data, benchmark_data, symbol, interval)
+    if result is None:
+        return None
+    return _score_sector(result, reversal_weights, reversal_thresholds)
+
+
+def _score_sector(result, reversal_weights=None, reversal_thresholds=None):
+    """Add the per-sector (non-ranked) scores and reversal status to a raw indicator dict."""
+    if reversal_weights is None:
+        reversal_weights = DEFAULT_REVERSAL_WEIGHTS
+    
+    result = dict(result)
+    
+    # Store values for ranking-based momentum score calculation
+    result['Momentum_Score'] = 0  # Will be calculated after all sectors are analyzed
+    
+    # Calculate Reversal Score with configurable weights
+    result['Reversal_Score'] = calculate_reversal_score(
+        result['RSI'], result['ADX_Z'], result['CMF'], result['RS_Rating'], reversal_weights
+    )
+    
+    # Determine Reversal Status (with user-defined thresholds)
+    result['Reversal_Status'] = determine_reversal_status(result['RSI'], result['ADX_Z'], result['CMF'], reversal_thresholds)
+    
+    return result
+
+
 def calculate_reversal_score(rsi, adx_z, cmf, rs_rating, weights):
     """
     Calculate reversal score with configurable percentage-based weights.
@@ -208,27 +353,21 @@ def determine_reversal_status(rsi, adx_z, cmf, reversal_thresholds=None):
         return "No"
 
 
-def analyze_all_sectors(sector_data_dict, benchmark_data, momentum_weights=None, reversal_weights=None, symbols_dict=None, interval='1d', reversal_thresholds=None):
+def compute_raw_indicators(sector_data_dict, benchmark_data, symbols_dict=None, interval='1d'):
     """
-    Analyze all sectors and return results DataFrame.
-    Excludes Nifty 50 benchmark from rankings.
-    Uses ranking-based momentum score calculation.
+    Calculate the weight-independent indicators for all sectors.
+    Excludes Nifty 50 benchmark. The result only depends on the price data, so it
+    can be cached and re-scored cheaply with apply_weights().
     
     Args:
         sector_data_dict: Dictionary of sector name to data DataFrame
         benchmark_data: Benchmark data DataFrame
-        momentum_weights: Dict with percentage weights for momentum score (sum to 100%)
-        reversal_weights: Dict with weights for reversal score
         symbols_dict: Dictionary mapping sector names to their symbols
         interval: Data interval ('1d', '1wk', '1h') for Mansfield RS calculation
-        reversal_thresholds: Dict with RSI and ADX_Z thresholds for reversal filtering
         
     Returns:
-        DataFrame with analysis results for all sectors (excluding Nifty 50)
+        DataFrame with one row of raw indicators per sector, or None if no sector succeeded
     """
-    if momentum_weights is None:
-        momentum_weights = DEFAULT_MOMENTUM_WEIGHTS
-    
     results = []
     
     for sector_name, data in sector_data_dict.items():
@@ -236,87 +375,96 @@ def analyze_all_sectors(sector_data_dict, benchmark_data, momentum_weights=None,
             continue
         
         symbol = symbols_dict.get(sector_name, 'N/A') if symbols_dict else 'N/A'
-        result = analyze_sector(sector_name, data, benchmark_data, momentum_weights, reversal_weights, symbol, interval, reversal_thresholds)
+        result = calculate_sector_indicators(sector_name, data, benchmark_data, symbol, interval)
         if result:
             results.append(result)
     
     if not results:
         return None
     
+    return pd.DataFrame(results)
+
+
+def apply_weights(raw_df, momentum_weights=None, reversal_weights=None, reversal_thresholds=None):
+    """
+    Score and rank sectors from their raw indicators.
+    Uses ranking-based momentum score calculation.
+    
+    Args:
+        raw_df: DataFrame returned by compute_raw_indicators()
+        momentum_weights: Dict with percentage weights for momentum score (sum to 100%)
+        reversal_weights: Dict with weights for reversal score
+        reversal_thresholds: Dict with RSI and ADX_Z thresholds for reversal filtering
+        
+    Returns:
+        DataFrame with analysis results for all sectors
+    """
+    if raw_df is None or raw_df.empty:
+        return None
+    
+    if momentum_weights is None:
+        momentum_weights = DEFAULT_MOMENTUM_WEIGHTS
+    
+    results = [_score_sector(row, reversal_weights, reversal_thresholds) for row in raw_df.to_dict('records')]
+    
     df = pd.DataFrame(results)
     
     # Calculate ranking-based momentum score
-    # Rank each indicator: Higher raw value = better = gets rank 1 (ascending=False)
+    # Rank each indicator: Higher raw value = better = gets rank 1 (descending)
     # This means sectors with stronger indicators get lower rank numbers (1 = best)
-    num_sectors = len(df)
-    df['ADX_Z_Rank'] = df['ADX_Z'].rank(ascending=False, method='min')  # Higher ADX_Z = stronger trend = rank 1
-    df['RS_Rating_Rank'] = df['RS_Rating'].rank(ascending=False, method='min')  # Higher RS = outperforming = rank 1
-    df['RSI_Rank'] = df['RSI'].rank(ascending=False, method='min')  # Higher RSI = stronger momentum = rank 1
-    df['DI_Spread_Rank'] = df['DI_Spread'].rank(ascending=False, method='min')  # Higher DI spread = bullish = rank 1
+    # All four indicators are ranked in one call on an (indicators, sectors) matrix
+    momentum_columns = ['ADX_Z', 'RS_Rating', 'RSI', 'DI_Spread']
+    momentum_ranks = rank_min(df[momentum_columns].to_numpy(dtype=float).T)
+    for col, ranks in zip(momentum_columns, momentum_ranks):
+        df[f'{col}_Rank'] = ranks
     
-    # Calculate weighted average rank (lower = better)
+    # Calculate weighted average rank (lower = better), summed in indicator order
     total_weight = sum(momentum_weights.values())
-    df['Weighted_Avg_Rank'] = (
-        (df['ADX_Z_Rank'] * momentum_weights.get('ADX_Z', 20.0) / total_weight) +
-        (df['RS_Rating_Rank'] * momentum_weights.get('RS_Rating', 40.0) / total_weight) +
-        (df['RSI_Rank'] * momentum_weights.get('RSI', 30.0) / total_weight) +
-        (df['DI_Spread_Rank'] * momentum_weights.get('DI_Spread', 10.0) / total_weight)
+    default_momentum_weights = {'ADX_Z': 20.0, 'RS_Rating': 40.0, 'RSI': 30.0, 'DI_Spread': 10.0}
+    df['Weighted_Avg_Rank'] = sum(
+        ranks * momentum_weights.get(col, default_momentum_weights[col]) / total_weight
+        for col, ranks in zip(momentum_columns, momentum_ranks)
     )
     
     # Scale to 1-10 where 10 = best momentum (lowest weighted rank), 1 = worst momentum (highest weighted rank)
     # Formula: Score = 10 - ((weighted_rank - 1) / (num_sectors - 1)) * 9
-    # This maps rank 1 -> score 10, rank N -> score 1
-    if num_sectors > 1:
-        min_rank = df['Weighted_Avg_Rank'].min()
-        max_rank = df['Weighted_Avg_Rank'].max()
-        if max_rank > min_rank:
-            df['Momentum_Score'] = 10 - ((df['Weighted_Avg_Rank'] - min_rank) / (max_rank - min_rank)) * 9
-        else:
-            df['Momentum_Score'] = 5.0  # All same score
-    else:
-        df['Momentum_Score'] = 5.0  # Single sector
+    # This maps rank 1 -> score 10, rank N -> score 1 (5.0 for a single sector or identical ranks)
+    df['Momentum_Score'] = scale_weighted_rank(df['Weighted_Avg_Rank'].to_numpy())
     
     # Calculate rank-based reversal score ONLY for sectors with Reversal_Status != 'No'
     # This ensures reversal scores are relative only among eligible reversal candidates
-    eligible_reversals = df[df['Reversal_Status'] != 'No'].copy()
+    eligible = (df['Reversal_Status'] != 'No').to_numpy()
+    num_eligible = int(eligible.sum())
     
-    if len(eligible_reversals) > 0:
+    if num_eligible > 0:
         # Rank within eligible sectors only
-        # For reversals: Lower RSI/RS_Rating/ADX_Z = better = rank 1 (ascending=True for lower-is-better)
-        # Higher CMF = better = rank 1 (ascending=False for higher-is-better)
-        num_eligible = len(eligible_reversals)
-        eligible_reversals['RS_Rating_Reversal_Rank'] = eligible_reversals['RS_Rating'].rank(ascending=True, method='min')  # Lower RS = more beaten down = rank 1
-        eligible_reversals['CMF_Reversal_Rank'] = eligible_reversals['CMF'].rank(ascending=False, method='min')  # Higher CMF = money inflow = rank 1
-        eligible_reversals['RSI_Reversal_Rank'] = eligible_reversals['RSI'].rank(ascending=True, method='min')  # Lower RSI = more oversold = rank 1
-        eligible_reversals['ADX_Z_Reversal_Rank'] = eligible_reversals['ADX_Z'].rank(ascending=True, method='min')  # Lower ADX_Z = weaker trend = rank 1
-        
-        # Calculate weighted average rank (lower = better reversal candidate)
+        # For reversals: Lower RSI/RS_Rating/ADX_Z = better = rank 1 (ascending)
+        # Higher CMF = better = rank 1 (descending)
         if reversal_weights:
             total_weight = sum(reversal_weights.values())
         else:
             total_weight = 100.0
             reversal_weights = {'RS_Rating': 40.0, 'CMF': 40.0, 'RSI': 10.0, 'ADX_Z': 10.0}
         
-        eligible_reversals['Weighted_Avg_Rank'] = (
-            (eligible_reversals['RS_Rating_Reversal_Rank'] * reversal_weights.get('RS_Rating', 40.0) / total_weight) +
-            (eligible_reversals['CMF_Reversal_Rank'] * reversal_weights.get('CMF', 40.0) / total_weight) +
-            (eligible_reversals['RSI_Reversal_Rank'] * reversal_weights.get('RSI', 10.0) / total_weight) +
-            (eligible_reversals['ADX_Z_Reversal_Rank'] * reversal_weights.get('ADX_Z', 10.0) / total_weight)
-        )
+        reversal_factors = (('RS_Rating', True, 40.0), ('CMF', False, 40.0), ('RSI', True, 10.0), ('ADX_Z', True, 10.0))
+        
+        # Calculate weighted average rank (lower = better reversal candidate); a single
+        # (factors, 1, eligible) block goes through the compiled kernel when numba is installed
+        weighted_rank = weighted_rank_min(
+            np.stack([df[col].to_numpy(dtype=float)[eligible] for col, _, _ in reversal_factors])[:, None, :],
+            [reversal_weights.get(col, default) for col, _, default in reversal_factors],
+            [ascending for _, ascending, _ in reversal_factors],
+            total_weight
+        )[0]
         
         # Scale to 1-10 where 10 = best reversal candidate (lowest weighted rank), 1 = worst
         if num_eligible > 1:
-            min_rank = eligible_reversals['Weighted_Avg_Rank'].min()
-            max_rank = eligible_reversals['Weighted_Avg_Rank'].max()
-            if max_rank > min_rank:
-                eligible_reversals['Reversal_Score_Ranked'] = 10 - ((eligible_reversals['Weighted_Avg_Rank'] - min_rank) / (max_rank - min_rank)) * 9
-            else:
-                eligible_reversals['Reversal_Score_Ranked'] = 5.0  # All same score
+            reversal_scores = scale_weighted_rank(weighted_rank)
         else:
-            eligible_reversals['Reversal_Score_Ranked'] = 10.0  # Single eligible sector gets max score
+            reversal_scores = np.array([10.0])  # Single eligible sector gets max score
         
         # Update the main dataframe with rank-based reversal scores for eligible sectors
-        df.loc[eligible_reversals.index, 'Reversal_Score'] = eligible_reversals['Reversal_Score_Ranked']
+        df.loc[eligible, 'Reversal_Score'] = reversal_scores
     
     # Optionally: Penalize sectors with negative Mansfield RS (commented out for now, can enable if needed)
     # df.loc[df['Mansfield_RS'] < 0, 'Momentum_Score'] = df.loc[df['Mansfield_RS'] < 0, 'Momentum_Score'] * 0.8
@@ -324,6 +472,28 @@ def analyze_all_sectors(sector_data_dict, benchmark_data, momentum_weights=None,
     return df
 
 
+def analyze_all_sectors(sector_data_dict, benchmark_data, momentum_weights=None, reversal_weights=None, symbols_dict=None, interval='1d', reversal_thresholds=None):
+    """
+    Analyze all sectors and return results DataFrame.
+    Excludes Nifty 50 benchmark from rankings.
+    Uses ranking-based momentum score calculation.
+    
+    Args:
+        sector_data_dict: Dictionary of sector name to data DataFrame
+        benchmark_data: Benchmark data DataFrame
+        momentum_weights: Dict with percentage weights for momentum score (sum to 100%)
+        reversal_weights: Dict with weights for reversal score
+        symbols_dict: Dictionary mapping sector names to their symbols
+        interval: Data interval ('1d', '1wk', '1h') for Mansfield RS calculation
+        reversal_thresholds: Dict with RSI and ADX_Z thresholds for reversal filtering
+        
+    Returns:
+        DataFrame with analysis results for all sectors (excluding Nifty 50)
+    """
+    raw_df = compute_raw_indicators(sector_data_dict, benchmark_data, symbols_dict, interval)
+    return apply_weights(raw_df, momentum_weights, reversal_weights, reversal_thresholds)
+
+
 def format_results_dataframe(df):
     """
     Format the results DataFrame with proper decimal places per user preference.
@@ -7,18 +7,23 @@ Optimized with caching for faster loading
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 from company_symbols import SECTOR_COMPANIES, get_company_symbol_list
 from data_fetcher import fetch_sector_data
-from indicators import calculate_rsi, calculate_adx, calculate_cmf, calculate_z_score, calculate_mansfield_rs
+from indicators import calculate_rsi, calculate_adx, calculate_cmf, calculate_z_score, calculate_z_score_series, calculate_mansfield_rs
 from config import DEFAULT_MOMENTUM_WEIGHTS, DEFAULT_REVERSAL_WEIGHTS
+from analysis import rank_min, scale_weighted_rank, top_k_desc
+from table_styles import GREEN_CELL, RED_CELL, color_sign, color_rsi, color_status
+from concurrent.futures import ThreadPoolExecutor
 
+# Parallel downloads per sector when fetching company data
+COMPANY_FETCH_WORKERS = 10
 
-def format_value(val, decimals=1):
-    """Format numerical value with specified decimal places."""
-    try:
-        return f"{float(val):.{decimals}f}"
-    except:
-        return val
+# Decimal places of the company trend columns (shown as formatted text)
+TREND_COLUMN_DECIMALS = {'Mansfield_RS': 1, 'RS_Rating': 1, 'ADX': 1, 'ADX_Z': 1, 'DI_Spread': 1, 'RSI': 1, 'CMF': 2}
+
+# Momentum ranking factors of the company trend as (name, default weight), in weighting order
+TREND_RANK_FACTORS = [('ADX_Z', 20), ('RS_Rating', 40), ('RSI', 30), ('DI_Spread', 10)]
 
 
 @st.cache_data(ttl=300, show_spinner=False)
@@ -46,22 +51,107 @@ def fetch_company_data_cached(selected_sector, interval='1d', analysis_date_str=
     companies_data = {}
     failed_companies = []
     
-    for company_symbol in company_list:
+    def fetch_one(company_symbol):
         try:
-            data = fetch_sector_data(company_symbol, end_date=end_date, interval=interval)
+            return fetch_sector_data(company_symbol, end_date=end_date, interval=interval)
+        except:
+            return None
+    
+    # Downloads are I/O-bound, so the companies and the benchmark are fetched concurrently
+    with ThreadPoolExecutor(max_workers=COMPANY_FETCH_WORKERS) as executor:
+        benchmark_future = executor.submit(fetch_sector_data, '^NSEI', end_date=end_date, interval=interval)
+        results = executor.map(fetch_one, company_list)
+        
+        # map() yields in submission order, so the sector's company order is preserved
+        for company_symbol, data in zip(company_list, results):
             if data is not None and len(data) > 0:
                 companies_data[company_symbol] = data
             else:
                 failed_companies.append(company_symbol)
-        except:
-            failed_companies.append(company_symbol)
-    
-    # Also fetch benchmark
-    benchmark_data = fetch_sector_data('^NSEI', end_date=end_date, interval=interval)
+        
+        benchmark_data = benchmark_future.result()
     
     return companies_data, failed_companies, benchmark_data
 
 
+def _indicator_values(series):
+    """Values of a full-series indicator plus the position of its first non-NaN value."""
+    values = series.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    return values, int(valid.argmax()) if valid.any() else len(values)
+
+
+def _indicator_at(indicator, pos, default):
+    """Read an _indicator_values result at `pos` as if the series ended there."""
+    values, first_valid = indicator
+    return values[pos] if pos >= first_valid else default
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_company_indicators(symbol, last_ts_ns, length, _data):
+    """
+    RSI, ADX, DI spread, ADX Z-Score and CMF over a company's full history.
+    The indicators are causal, so position p equals the value computed on the data
+    truncated after bar p. Weight changes do not touch these, so slider reruns reuse them.
+    
+    Args:
+        symbol: Company symbol
+        last_ts_ns: Timestamp of the last bar in nanoseconds (cache key)
+        length: Number of bars (cache key)
+        _data: Company price data DataFrame (not hashed)
+        
+    Returns:
+        Dict of indicator name to (values, first valid position)
+    """
+    adx, _, _, di_spread = calculate_adx(_data)
+    return {
+        'rsi': _indicator_values(calculate_rsi(_data)),
+        'adx': _indicator_values(adx),
+        'di_spread': _indicator_values(di_spread),
+        'adx_z': _indicator_values(calculate_z_score_series(adx)),
+        'cmf': _indicator_values(calculate_cmf(_data)),
+    }
+
+
+def _company_indicators(symbol, data):
+    """cached_company_indicators keyed by the symbol, last bar and length of `data`."""
+    return cached_company_indicators(symbol, int(data.index[-1].value), len(data), data)
+
+
+def _cumulative_rs_returns(data, benchmark_returns):
+    """
+    Cumulative growth of a company and the benchmark over their common return dates.
+    Element n-1 equals (1 + returns).prod() over the first n common dates, so each
+    trend period reads its RS Rating inputs without rescanning the price series.
+    
+    Args:
+        data: Company price data DataFrame
+        benchmark_returns: Benchmark daily returns (NaN dropped)
+        
+    Returns:
+        Tuple of (common dates, company growth array, benchmark growth array)
+    """
+    returns = data['Close'].pct_change().dropna()
+    common = returns.index.intersection(benchmark_returns.index)
+    return (common,
+            np.cumprod(1 + returns.loc[common].to_numpy(dtype=float)),
+            np.cumprod(1 + benchmark_returns.loc[common].to_numpy(dtype=float)))
+
+
+def _rs_rating_as_of(cumulative, cutoff):
+    """RS Rating from _cumulative_rs_returns over the common dates up to and including `cutoff`."""
+    common, growth, benchmark_growth = cumulative
+    n = common.searchsorted(cutoff, side='right')
+    if n <= 1:
+        return 5.0
+    
+    company_cumret = growth[n - 1] - 1
+    benchmark_cumret = benchmark_growth[n - 1] - 1
+    if pd.isna(company_cumret) or pd.isna(benchmark_cumret):
+        return 5.0
+    return max(0, min(10, 5 + (company_cumret - benchmark_cumret) * 25))
+
+
 def calculate_company_trend(company_symbol, company_data, benchmark_data, all_companies_data_dict, selected_sector, momentum_weights=None, periods=7):
     """
     Calculate trend for a company over the last N periods.
@@ -88,6 +178,25 @@ def calculate_company_trend(company_symbol, company_data, benchmark_data, all_co
         
         trend_data = []
         
+        # Cumulative returns are computed once per company over the full history;
+        # each period reads them as of its last company and benchmark bar
+        cumulative_returns = {}
+        if benchmark_data is not None:
+            benchmark_returns = benchmark_data['Close'].pct_change().dropna()
+            cumulative_returns = {
+                symbol: _cumulative_rs_returns(data, benchmark_returns)
+                for symbol, data in all_companies_data_dict.items()
+                if data is not None and len(data) >= 14
+            }
+            company_cumulative = _cumulative_rs_returns(company_data, benchmark_returns)
+        
+        indicators = _company_indicators(company_symbol, company_data)
+        other_indicators = {
+            symbol: _company_indicators(symbol, data)
+            for symbol, data in all_companies_data_dict.items()
+            if data is not None and len(data) >= 14
+        }
+        
         for i in range(periods, 0, -1):
             try:
                 # Get the actual date for this period from the data index
@@ -107,37 +216,24 @@ def calculate_company_trend(company_symbol, company_data, benchmark_data, all_co
                 if len(subset_data) < 14:  # Minimum for most indicators
                     continue
                 
-                # Calculate all indicators for this company at this point in time
-                rsi = calculate_rsi(subset_data)
-                adx, plus_di, minus_di, di_spread = calculate_adx(subset_data)
-                cmf = calculate_cmf(subset_data)
+                # Cumulative returns count common dates up to the earlier of the two last bars
+                cutoff = None
+                if bench_subset is not None and len(bench_subset) > 0:
+                    cutoff = min(subset_data.index[-1], bench_subset.index[-1])
+                
+                # Read the full-history indicators at this point in time
+                pos = len(subset_data) - 1
                 mansfield_rs = calculate_mansfield_rs(subset_data, bench_subset)
-                adx_z = calculate_z_score(adx.dropna())
                 
                 # Calculate RS Rating
-                rs_rating = 5.0
-                if bench_subset is not None and len(bench_subset) > 0:
-                    company_returns = subset_data['Close'].pct_change().dropna()
-                    benchmark_returns = bench_subset['Close'].pct_change().dropna()
-                    
-                    common_index = company_returns.index.intersection(benchmark_returns.index)
-                    if len(common_index) > 1:
-                        company_returns_aligned = company_returns.loc[common_index]
-                        benchmark_returns_aligned = benchmark_returns.loc[common_index]
-                        
-                        company_cumret = (1 + company_returns_aligned).prod() - 1
-                        benchmark_cumret = (1 + benchmark_returns_aligned).prod() - 1
-                        
-                        if not pd.isna(company_cumret) and not pd.isna(benchmark_cumret):
-                            relative_perf = company_cumret - benchmark_cumret
-                            rs_rating = 5 + (relative_perf * 25)
-                            rs_rating = max(0, min(10, rs_rating))
+                rs_rating = _rs_rating_as_of(company_cumulative, cutoff) if cutoff is not None else 5.0
                 
                 # ============================================================
                 # RANK-BASED SCORING: Calculate rank by comparing ALL companies
                 # at this historical point (same logic as main table)
                 # ============================================================
-                all_company_raw_data = []
+                raw_symbols = []
+                raw_values = []
                 
                 for other_symbol, other_data in all_companies_data_dict.items():
                     if other_data is None or len(other_data) < 14:
@@ -145,91 +241,59 @@ def calculate_company_trend(company_symbol, company_data, benchmark_data, all_co
                     
                     try:
                         other_subset = other_data.iloc[:-i+1] if i > 1 else other_data
-                        other_bench = benchmark_data.iloc[:-i+1] if i > 1 else benchmark_data
                         
                         if len(other_subset) < 14:
                             continue
                         
-                        # Calculate indicators for other company
-                        o_rsi = calculate_rsi(other_subset)
-                        o_adx, _, _, o_di_spread = calculate_adx(other_subset)
-                        o_adx_z = calculate_z_score(o_adx.dropna())
+                        o_indicators = other_indicators[other_symbol]
+                        o_pos = len(other_subset) - 1
                         
                         # Calculate RS Rating for other company
                         o_rs_rating = 5.0
-                        if other_bench is not None and len(other_bench) > 0:
-                            o_returns = other_subset['Close'].pct_change().dropna()
-                            o_bench_returns = other_bench['Close'].pct_change().dropna()
-                            o_common = o_returns.index.intersection(o_bench_returns.index)
-                            if len(o_common) > 1:
-                                o_ret = o_returns.loc[o_common]
-                                o_b_ret = o_bench_returns.loc[o_common]
-                                o_cumret = (1 + o_ret).prod() - 1
-                                o_bench_cumret = (1 + o_b_ret).prod() - 1
-                                if not pd.isna(o_cumret) and not pd.isna(o_bench_cumret):
-                                    o_rs_rating = max(0, min(10, 5 + (o_cumret - o_bench_cumret) * 25))
+                        if cutoff is not None:
+                            o_cutoff = min(other_subset.index[-1], bench_subset.index[-1])
+                            o_rs_rating = _rs_rating_as_of(cumulative_returns[other_symbol], o_cutoff)
                         
-                        all_company_raw_data.append({
-                            'Symbol': other_symbol,
-                            'RSI': o_rsi.iloc[-1] if not o_rsi.isna().all() else 50,
-                            'ADX_Z': o_adx_z if not pd.isna(o_adx_z) else 0,
-                            'RS_Rating': o_rs_rating,
-                            'DI_Spread': o_di_spread.iloc[-1] if not o_di_spread.isna().all() else 0,
-                        })
+                        # Values in TREND_RANK_FACTORS order
+                        raw_values.append((
+                            _indicator_at(o_indicators['adx_z'], o_pos, 0),
+                            o_rs_rating,
+                            _indicator_at(o_indicators['rsi'], o_pos, 50),
+                            _indicator_at(o_indicators['di_spread'], o_pos, 0),
+                        ))
+                        raw_symbols.append(other_symbol)
                     except:
                         continue
                 
-                # Calculate rank using SAME method as main table
+                # Calculate rank using SAME method as main table, on plain arrays
                 rank = 1
-                if all_company_raw_data:
-                    df_raw = pd.DataFrame(all_company_raw_data)
-                    num_companies = len(df_raw)
-                    
-                    # Rank each indicator (higher is better for momentum)
-                    df_raw['ADX_Z_Rank'] = df_raw['ADX_Z'].rank(ascending=False, method='min')
-                    df_raw['RS_Rating_Rank'] = df_raw['RS_Rating'].rank(ascending=False, method='min')
-                    df_raw['RSI_Rank'] = df_raw['RSI'].rank(ascending=False, method='min')
-                    df_raw['DI_Spread_Rank'] = df_raw['DI_Spread'].rank(ascending=False, method='min')
-                    
-                    # Calculate weighted average rank
+                if raw_values:
+                    # Rank each indicator (higher is better for momentum), then weight the
+                    # ranks term by term in TREND_RANK_FACTORS order
+                    ranks = rank_min(np.array(raw_values, dtype=float).T)
                     total_weight = sum(momentum_weights.values())
-                    df_raw['Weighted_Avg_Rank'] = (
-                        (df_raw['ADX_Z_Rank'] * momentum_weights.get('ADX_Z', 20) / total_weight) +
-                        (df_raw['RS_Rating_Rank'] * momentum_weights.get('RS_Rating', 40) / total_weight) +
-                        (df_raw['RSI_Rank'] * momentum_weights.get('RSI', 30) / total_weight) +
-                        (df_raw['DI_Spread_Rank'] * momentum_weights.get('DI_Spread', 10) / total_weight)
-                    )
+                    weighted_rank = sum(factor_ranks * momentum_weights.get(name, default) / total_weight
+                                        for factor_ranks, (name, default) in zip(ranks, TREND_RANK_FACTORS))
                     
                     # Scale to 1-10 (lower weighted avg rank = higher momentum score)
-                    if num_companies > 1:
-                        min_rank = df_raw['Weighted_Avg_Rank'].min()
-                        max_rank = df_raw['Weighted_Avg_Rank'].max()
-                        if max_rank > min_rank:
-                            df_raw['Momentum_Score'] = 10 - ((df_raw['Weighted_Avg_Rank'] - min_rank) / (max_rank - min_rank)) * 9
-                        else:
-                            df_raw['Momentum_Score'] = 5.0
-                    else:
-                        df_raw['Momentum_Score'] = 5.0
-                    
-                    # Sort by Momentum_Score descending and assign ranks
-                    df_raw = df_raw.sort_values('Momentum_Score', ascending=False)
-                    df_raw['Final_Rank'] = range(1, len(df_raw) + 1)
+                    momentum_scores = scale_weighted_rank(weighted_rank)
                     
-                    # Find the rank of our selected company
-                    company_row = df_raw[df_raw['Symbol'] == company_symbol]
-                    if not company_row.empty:
-                        rank = int(company_row.iloc[0]['Final_Rank'])
+                    # Final rank is the selected company's position by descending score
+                    if company_symbol in raw_symbols:
+                        order = top_k_desc(momentum_scores)
+                        rank = int(np.flatnonzero(order == raw_symbols.index(company_symbol))[0]) + 1
                 
+                # Raw values; the columns are formatted in one pass after the loop
                 trend_data.append({
                     'Period': period_label,
-                    'Rank': f'#{rank}',
-                    'Mansfield_RS': format_value(mansfield_rs, 1),
-                    'RS_Rating': format_value(rs_rating, 1),
-                    'ADX': format_value(adx.iloc[-1] if not adx.isna().all() else 0, 1),
-                    'ADX_Z': format_value(adx_z if not pd.isna(adx_z) else 0, 1),
-                    'DI_Spread': format_value(di_spread.iloc[-1] if not di_spread.isna().all() else 0, 1),
-                    'RSI': format_value(rsi.iloc[-1] if not rsi.isna().all() else 50, 1),
-                    'CMF': format_value(cmf.iloc[-1] if not cmf.isna().all() else 0, 2),
+                    'Rank': rank,
+                    'Mansfield_RS': mansfield_rs,
+                    'RS_Rating': rs_rating,
+                    'ADX': _indicator_at(indicators['adx'], pos, 0),
+                    'ADX_Z': _indicator_at(indicators['adx_z'], pos, 0),
+                    'DI_Spread': _indicator_at(indicators['di_spread'], pos, 0),
+                    'RSI': _indicator_at(indicators['rsi'], pos, 50),
+                    'CMF': _indicator_at(indicators['cmf'], pos, 0),
                 })
             except Exception as e:
                 continue
@@ -238,6 +302,9 @@ def calculate_company_trend(company_symbol, company_data, benchmark_data, all_co
             return None
         
         df = pd.DataFrame(trend_data)
+        df['Rank'] = '#' + df['Rank'].astype(str)
+        for col, decimals in TREND_COLUMN_DECIMALS.items():
+            df[col] = np.char.mod(f'%.{decimals}f', df[col].to_numpy(dtype=float))
         return df
         
     except Exception as e:
@@ -425,48 +492,11 @@ def display_company_momentum_tab(time_interval='Daily', momentum_weights=None, a
             'RS_Rating', 'RSI', 'ADX', 'ADX_Z', 'DI_Spread', 'CMF']
     df_companies = df_companies[[c for c in cols if c in df_companies.columns]]
     
-    # Apply color styling for RSI and CMF (same as sector momentum tab)
-    def style_company_momentum_row(row):
-        result = [''] * len(row)
-        
-        # Color RSI (green for >65, red for <35)
-        if 'RSI' in row.index:
-            idx = list(row.index).index('RSI')
-            try:
-                rsi_val = float(row['RSI'])
-                if rsi_val > 65:
-                    result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                elif rsi_val < 35:
-                    result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-            except:
-                pass
-        
-        # Color CMF (green for positive, red for negative)
-        if 'CMF' in row.index:
-            idx = list(row.index).index('CMF')
-            try:
-                cmf_val = float(row['CMF'])
-                if cmf_val > 0:
-                    result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                else:
-                    result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-            except:
-                pass
-        
-        # Color Mansfield_RS (green for positive, red for negative)
-        if 'Mansfield_RS' in row.index:
-            idx = list(row.index).index('Mansfield_RS')
-            try:
-                if float(row['Mansfield_RS']) > 0:
-                    result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                else:
-                    result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-            except:
-                pass
-        
-        return result
-    
-    df_companies_styled = df_companies.style.apply(style_company_momentum_row, axis=1)
+    # Color styling (same as sector momentum tab), one pass per column: RSI is green
+    # above 65 and red below 35; Mansfield RS and CMF are green for positive, red otherwise
+    df_companies_styled = (df_companies.style
+                           .apply(color_rsi, subset=['RSI'], axis=0)
+                           .apply(color_sign, subset=['Mansfield_RS', 'CMF'], axis=0))
     
     st.dataframe(df_companies_styled, use_container_width=True, height=400)
     
@@ -837,45 +867,12 @@ def display_company_reversal_tab(time_interval='Daily', reversal_weights=None, r
             'Mansfield_RS': df_reversals['Mansfield_RS'],
         })
         
-        # Add color coding for RSI and CMF
-        def style_company_reversal_row(row):
-            result = [''] * len(row)
-            
-            # Color RSI (green for <35, red for >50)
-            if 'RSI' in row.index:
-                idx = list(row.index).index('RSI')
-                try:
-                    rsi_val = float(row['RSI'])
-                    if rsi_val < 35:
-                        result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                    elif rsi_val > 50:
-                        result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-                except:
-                    pass
-            
-            # Color CMF (green for positive, red for negative)
-            if 'CMF' in row.index:
-                idx = list(row.index).index('CMF')
-                try:
-                    cmf_val = float(row['CMF'])
-                    if cmf_val > 0:
-                        result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                    else:
-                        result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-                except:
-                    pass
-            
-            # Color Status (green for BUY_DIV, yellow for Watch, gray for No)
-            if 'Status' in row.index:
-                idx = list(row.index).index('Status')
-                if row['Status'] == 'BUY_DIV':
-                    result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                elif row['Status'] == 'Watch':
-                    result[idx] = 'background-color: #F39C12; color: #fff; font-weight: bold'
-            
-            return result
-        
-        df_display_styled = df_display.style.apply(style_company_reversal_row, axis=1)
+        # Add color coding, one pass per column: RSI is green below 35 and red above 50,
+        # CMF is green for positive and red otherwise, Status is green for BUY_DIV and yellow for Watch
+        df_display_styled = (df_display.style
+                             .apply(color_rsi, subset=['RSI'], axis=0, above=RED_CELL, below=GREEN_CELL, upper=50)
+                             .apply(color_sign, subset=['CMF'], axis=0)
+                             .apply(color_status, subset=['Status'], axis=0))
         
         # Add color coding legend
         with st.expander("📊 Color Coding Guide for Reversal Indicators"):
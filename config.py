@@ -69,6 +69,13 @@ SECTOR_ETFS_ALTERNATE = {
     'Pvt Bank': 'PVTBANIETF.NS'
 }
 
+# Data Fetching
+# Download sector symbols in batched yf.download requests; sectors missing from the
+# batch fall back to per-symbol fetches (which also try alternate ETF symbols)
+USE_BATCH_DOWNLOAD = True
+# Symbols per yf.download request; larger lists are split into several requests
+BATCH_DOWNLOAD_MAX_SYMBOLS = 20
+
 # Analysis Thresholds
 MIN_DATA_POINTS = 50
 # For ranking-based momentum score, super bullish means top ~30% of sectors
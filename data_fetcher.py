@@ -5,14 +5,16 @@ Now integrated with local SQLite cache for 6M data + dynamic yfinance fallback
 """
 
 import yfinance as yf
+import pandas as pd
 import warnings
 import hashlib
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from functools import lru_cache
 from datetime import datetime, timedelta
 warnings.filterwarnings('ignore')
 
-from config import MIN_DATA_POINTS
+from config import MIN_DATA_POINTS, BATCH_DOWNLOAD_MAX_SYMBOLS
 
 # Try to import local cache (optional)
 try:
@@ -26,6 +28,24 @@ except Exception as e:
     LOCAL_CACHE_AVAILABLE = False
     print(f"⚠️ Error loading local cache: {e}")
 
+logger = logging.getLogger(__name__)
+
+# Try to enable HTTP-level caching of Yahoo responses (optional)
+try:
+    import requests_cache
+    _http_session = requests_cache.CachedSession(
+        'data_cache/yf_http_cache',
+        backend='sqlite',
+        expire_after=3600,
+        allowable_codes=(200,),
+        urls_expire_after={'*/getcrumb': 60, '*/finance/chart/*': 3600},
+    )
+except ImportError:
+    _http_session = None
+except Exception as e:
+    _http_session = None
+    logger.warning("HTTP cache not available: %s", e)
+
 # Simple in-memory cache for data fetching
 _data_cache = {}
 _cache_ttl = 300  # 5 minutes TTL for cache
@@ -33,6 +53,48 @@ _cache_ttl = 300  # 5 minutes TTL for cache
 # Configuration for local cache
 LOCAL_CACHE_DAYS = 180  # Keep 6 months locally
 
+# Abort a parallel fetch after this many failures in a row (e.g. rate limiting)
+MAX_CONSECUTIVE_FAILURES = 10
+
+# Per-symbol error logging throttle (avoids log storms during rate limiting)
+_recent_errors = {}
+_ERROR_LOG_INTERVAL = 60  # seconds
+
+
+def _log_symbol_warning(symbol, msg, *args):
+    """Log a warning for a symbol, at most once per _ERROR_LOG_INTERVAL seconds."""
+    now = datetime.now().timestamp()
+    if now - _recent_errors.get(symbol, 0) < _ERROR_LOG_INTERVAL:
+        return
+    _recent_errors[symbol] = now
+    logger.warning(msg, symbol, *args)
+
+
+def _make_ticker(symbol):
+    """Create a yf.Ticker, routed through the HTTP cache session when available."""
+    global _http_session
+    if _http_session is not None:
+        try:
+            return yf.Ticker(symbol, session=_http_session)
+        except Exception as e:
+            # Newer yfinance releases reject plain requests sessions
+            logger.warning("Disabling HTTP cache session: %s", e)
+            _http_session = None
+    return yf.Ticker(symbol)
+
+
+def _download(symbols, **kwargs):
+    """Run yf.download, routed through the HTTP cache session when available."""
+    global _http_session
+    if _http_session is not None:
+        try:
+            return yf.download(symbols, session=_http_session, **kwargs)
+        except Exception as e:
+            # Newer yfinance releases reject plain requests sessions
+            logger.warning("Disabling HTTP cache session: %s", e)
+            _http_session = None
+    return yf.download(symbols, **kwargs)
+
 
 def _get_cache_key(symbol, period, end_date, interval):
     """Generate a unique cache key for the request."""
@@ -55,6 +117,54 @@ def clear_data_cache():
     _data_cache = {}
 
 
+def _from_cache_frame(df):
+    """Convert a local cache frame (lowercase columns) to yfinance column names."""
+    df = df.drop(columns=['adj_close'], errors='ignore')
+    return df.rename(columns=str.capitalize).rename_axis('Date')
+
+
+def _to_cache_frame(df):
+    """Convert a yfinance frame to the lowercase schema expected by local_cache."""
+    df = df[['Open', 'High', 'Low', 'Close', 'Volume']].rename(columns=str.lower).rename_axis('date')
+    df['adj_close'] = df['close']
+    return df
+
+
+def _strip_daily_tz(df):
+    """Drop the exchange timezone from daily bars so they line up with cached (naive) dates."""
+    if getattr(df.index, 'tz', None) is not None:
+        df = df.copy()
+        df.index = df.index.tz_localize(None)
+    return df
+
+
+def _date_range(period, end_date, interval):
+    """
+    Resolve the download window for a request.
+    
+    Returns:
+        Tuple of (start_date, actual_end_date, period)
+    """
+    if end_date:
+        actual_end_date = end_date + timedelta(days=1)
+        
+        if interval == '1h':
+            start_date = end_date - timedelta(days=60)
+        elif interval == '1wk':
+            start_date = end_date - timedelta(days=400 if period == '1y' else 800)
+        else:  # Daily
+            start_date = end_date - timedelta(days=400 if period == '1y' else 800)
+    else:
+        actual_end_date = datetime.now() + timedelta(days=1)
+        if interval == '1h':
+            start_date = datetime.now() - timedelta(days=60)
+            period = '60d'
+        else:
+            start_date = datetime.now() - timedelta(days=400)
+    
+    return start_date, actual_end_date, period
+
+
 def fetch_sector_data(symbol, period='1y', min_data_points=MIN_DATA_POINTS, end_date=None, interval='1d', use_cache=True):
     """
     Fetch historical data for a sector with hybrid caching strategy:
@@ -81,57 +191,71 @@ def fetch_sector_data(symbol, period='1y', min_data_points=MIN_DATA_POINTS, end_
         return _data_cache[cache_key].get('data')
     
     try:
-        # Determine date range
-        if end_date:
-            actual_end_date = end_date + timedelta(days=1)
-            
-            if interval == '1h':
-                start_date = end_date - timedelta(days=60)
-            elif interval == '1wk':
-                start_date = end_date - timedelta(days=400 if period == '1y' else 800)
-            else:  # Daily
-                start_date = end_date - timedelta(days=400 if period == '1y' else 800)
-        else:
-            actual_end_date = datetime.now() + timedelta(days=1)
-            if interval == '1h':
-                start_date = datetime.now() - timedelta(days=60)
-                period = '60d'
-            else:
-                start_date = datetime.now() - timedelta(days=400)
+        start_date, actual_end_date, period = _date_range(period, end_date, interval)
         
         # For daily data within 6M, try local cache first
         data = None
+        cached = None
         if LOCAL_CACHE_AVAILABLE and interval == '1d' and use_cache:
             try:
-                cache_start = max(start_date, datetime.now() - timedelta(days=LOCAL_CACHE_DAYS))
-                data = get_cached_data(symbol, cache_start, actual_end_date)
+                # The app passes date end dates; compare as timestamps so date and datetime both work
+                cache_start = max(pd.Timestamp(start_date), pd.Timestamp.now() - pd.Timedelta(days=LOCAL_CACHE_DAYS))
+                cached = get_cached_data(symbol, cache_start, pd.Timestamp(actual_end_date))
                 
-                if data is not None and len(data) >= min_data_points:
-                    # Cache hit - return immediately
-                    _data_cache[cache_key] = {'data': data, 'timestamp': datetime.now().timestamp()}
-                    return data
+                if cached is not None:
+                    cached = _from_cache_frame(cached)
+                    if len(cached) >= min_data_points:
+                        # Cache hit - return immediately
+                        _data_cache[cache_key] = {'data': cached, 'timestamp': datetime.now().timestamp()}
+                        return cached
             except Exception as cache_err:
                 # Cache read failed, fall back to yfinance
-                print(f"⚠️ Cache read failed for {symbol}: {cache_err}")
-                data = None
+                _log_symbol_warning(symbol, "Cache read failed for %s: %s", cache_err)
+                cached = None
         
         # Cache miss or non-daily: fetch from yfinance
-        ticker = yf.Ticker(symbol)
+        ticker = _make_ticker(symbol)
+        
+        # Partial cache hit: only download the rows after the last cached date
+        if cached is not None and not cached.empty:
+            missing_start = cached.index.max() + pd.Timedelta(days=1)
+            tail = ticker.history(start=missing_start, end=actual_end_date, interval=interval)
+            if tail is not None and not tail.empty:
+                tail = _strip_daily_tz(tail.dropna(subset=['Close']))
+                merged = pd.concat([cached, tail[cached.columns.intersection(tail.columns)]])
+                merged = merged[~merged.index.duplicated(keep='last')]
+            else:
+                merged = cached
+            
+            if len(merged) >= min_data_points:
+                if tail is not None and not tail.empty:
+                    try:
+                        cache_data(symbol, _to_cache_frame(tail), source='yfinance')
+                    except Exception as cache_err:
+                        _log_symbol_warning(symbol, "Cache write failed for %s: %s", cache_err)
+                _data_cache[cache_key] = {'data': merged, 'timestamp': datetime.now().timestamp()}
+                return merged
         
         if end_date:
             data = ticker.history(start=start_date, end=actual_end_date, interval=interval)
         else:
             data = ticker.history(period=period, interval=interval)
-        
-        if data is None or data.empty:
+
+        # Row count is an upper bound on valid rows, so reject sparse histories
+        # before paying for dropna (common on failed alternate-symbol attempts)
+        if data is None or len(data) < min_data_points:
             return None
-        
+        data = data.dropna(subset=['Close'])
+        if len(data) < min_data_points:
+            return None
+
         # Store in local cache if daily data (but don't fail if cache write fails)
         if LOCAL_CACHE_AVAILABLE and interval == '1d':
+            data = _strip_daily_tz(data)
             try:
-                cache_data(symbol, data, source='yfinance')
+                cache_data(symbol, _to_cache_frame(data), source='yfinance')
             except Exception as cache_err:
-                print(f"⚠️ Cache write failed for {symbol}: {cache_err}")
+                _log_symbol_warning(symbol, "Cache write failed for %s: %s", cache_err)
         
         # Store in memory cache
         _data_cache[cache_key] = {'data': data, 'timestamp': datetime.now().timestamp()}
@@ -139,7 +263,7 @@ def fetch_sector_data(symbol, period='1y', min_data_points=MIN_DATA_POINTS, end_
         return data
         
     except Exception as e:
-        print(f"Error fetching data for {symbol}: {e}")
+        _log_symbol_warning(symbol, "Error fetching data for %s: %s", e)
         return None
 
 
@@ -172,6 +296,120 @@ def fetch_sector_data_with_alternate(symbol, alternate_symbol=None, period='1y',
     return None, None
 
 
+def fetch_sectors_batch(symbols, period='1y', min_data_points=MIN_DATA_POINTS, end_date=None, interval='1d'):
+    """
+    Fetch several symbols with yf.download, up to BATCH_DOWNLOAD_MAX_SYMBOLS per request.
+    
+    Args:
+        symbols: List of Yahoo Finance symbols
+        period: Time period for historical data (default '1y')
+        min_data_points: Minimum required data points (default 50)
+        end_date: End date for historical analysis (datetime object)
+        interval: Data interval - '1h' (hourly), '1d' (daily), '1wk' (weekly)
+        
+    Returns:
+        Dictionary mapping symbol to its OHLCV DataFrame. Symbols that failed or
+        returned too little data are omitted so callers can fetch them individually.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+    
+    start_date, actual_end_date, period = _date_range(period, end_date, interval)
+    
+    # Daily bars are written to the local cache; a window that ended before today can no
+    # longer change, so symbols already on disk for it are replayed instead of downloaded
+    use_local_cache = LOCAL_CACHE_AVAILABLE and interval == '1d'
+    if use_local_cache and end_date and pd.Timestamp(end_date).normalize() < pd.Timestamp.now().normalize():
+        results = _local_cache_hits(symbols, start_date, end_date, min_data_points)
+    else:
+        results = {}
+    symbols = [symbol for symbol in symbols if symbol not in results]
+    if not symbols:
+        return results
+    
+    download_args = dict(interval=interval, group_by='ticker', auto_adjust=True, threads=True, progress=False)
+    
+    # At most BATCH_DOWNLOAD_MAX_SYMBOLS per request; a failed request only loses its own chunk
+    for start in range(0, len(symbols), BATCH_DOWNLOAD_MAX_SYMBOLS):
+        chunk = symbols[start:start + BATCH_DOWNLOAD_MAX_SYMBOLS]
+        try:
+            if end_date:
+                raw = _download(chunk, start=start_date, end=actual_end_date, **download_args)
+            else:
+                raw = _download(chunk, period=period, **download_args)
+        except Exception as e:
+            logger.warning("Batch download failed for %d symbols: %s", len(chunk), e)
+            continue
+        
+        if raw is None or raw.empty:
+            continue
+        
+        for symbol in chunk:
+            try:
+                if isinstance(raw.columns, pd.MultiIndex):
+                    if symbol not in raw.columns.get_level_values(0):
+                        continue
+                    data = raw[symbol]
+                else:
+                    data = raw
+                
+                if len(data) < min_data_points:
+                    continue
+                data = data.dropna(subset=['Close'])
+                if len(data) < min_data_points:
+                    continue
+                
+                if interval == '1d':
+                    data = _strip_daily_tz(data)
+                data.columns.name = None
+                results[symbol] = data
+            except Exception as e:
+                _log_symbol_warning(symbol, "Error splitting batch data for %s: %s", e)
+                continue
+            
+            # Persist to the local cache so restarts replay it instead of downloading again
+            if use_local_cache:
+                try:
+                    cache_data(symbol, _to_cache_frame(data), source='yfinance')
+                except Exception as cache_err:
+                    _log_symbol_warning(symbol, "Cache write failed for %s: %s", cache_err)
+    
+    return results
+
+
+def _local_cache_hits(symbols, start_date, end_date, min_data_points):
+    """
+    Read daily data for symbols whose local cache covers the whole requested window.
+    
+    A hit must reach back to the window start and forward to the last weekday on or
+    before end_date, so it holds the same bars a download of the window would.
+    
+    Args:
+        symbols: List of Yahoo Finance symbols
+        start_date: Start of the requested window (datetime)
+        end_date: Last day of the requested window (datetime)
+        min_data_points: Minimum rows required for a cache hit
+        
+    Returns:
+        Dictionary mapping symbol to its cached OHLCV DataFrame (misses are omitted)
+    """
+    first_needed = pd.Timestamp(start_date).normalize() + pd.Timedelta(days=7)
+    last_needed = pd.offsets.BDay().rollback(pd.Timestamp(end_date).normalize())
+    hits = {}
+    for symbol in symbols:
+        try:
+            cached = get_cached_data(symbol, start_date, end_date)
+        except Exception as cache_err:
+            _log_symbol_warning(symbol, "Cache read failed for %s: %s", cache_err)
+            continue
+        if cached is None or len(cached) < min_data_points:
+            continue
+        if cached.index.min() <= first_needed and cached.index.max() >= last_needed:
+            hits[symbol] = _from_cache_frame(cached)
+    return hits
+
+
 def fetch_all_sectors(sectors_dict, period='1y'):
     """
     Fetch data for all sectors.
@@ -226,30 +464,58 @@ def fetch_all_sectors_parallel(sectors_dict, alternates_dict=None, period='1y',
         )
         return sector_name, data, used_symbol
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all fetch tasks
-        futures = {
-            executor.submit(fetch_single, name, sym): name 
-            for name, sym in sectors_dict.items()
-        }
-        
-        # Process results as they complete
-        for future in as_completed(futures):
-            completed[0] += 1
-            try:
-                sector_name, data, used_symbol = future.result()
-                if data is not None and len(data) > 0:
+    def record(sector_name, success):
+        completed[0] += 1
+        if not success:
+            failed_sectors.append(sector_name)
+        if progress_callback:
+            progress_callback(sector_name, success, completed[0], total)
+    
+    # Bounded submission: keep at most 2 * max_workers fetches in flight
+    pending_items = iter(list(sectors_dict.items()))
+    max_in_flight = max_workers * 2
+    in_flight = {}
+    consecutive_failures = 0
+    
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while True:
+            while len(in_flight) < max_in_flight:
+                item = next(pending_items, None)
+                if item is None:
+                    break
+                name, sym = item
+                in_flight[executor.submit(fetch_single, name, sym)] = name
+            
+            if not in_flight:
+                break
+            
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                sector_name = in_flight.pop(future)
+                try:
+                    _, data, used_symbol = future.result()
+                    success = data is not None and len(data) > 0
+                except Exception:
+                    success = False
+                
+                if success:
                     sector_data[sector_name] = data
-                    if progress_callback:
-                        progress_callback(sector_name, True, completed[0], total)
+                    consecutive_failures = 0
                 else:
-                    failed_sectors.append(sector_name)
-                    if progress_callback:
-                        progress_callback(sector_name, False, completed[0], total)
-            except Exception as e:
-                sector_name = futures[future]
-                failed_sectors.append(sector_name)
-                if progress_callback:
-                    progress_callback(sector_name, False, completed[0], total)
+                    consecutive_failures += 1
+                record(sector_name, success)
+            
+            if consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                logger.warning("Aborting parallel fetch after %d consecutive failures", consecutive_failures)
+                for sector_name in in_flight.values():
+                    record(sector_name, False)
+                for sector_name, _ in pending_items:
+                    record(sector_name, False)
+                in_flight.clear()
+                break
+    finally:
+        # Don't wait for in-flight downloads after an abort or interrupt; queued ones are cancelled
+        executor.shutdown(wait=False, cancel_futures=True)
     
     return sector_data, failed_sectors
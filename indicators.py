@@ -8,6 +8,39 @@ import numpy as np
 
 from config import RSI_PERIOD, ADX_PERIOD, CMF_PERIOD
 
+# Compile the recursive smoothing loop with numba when it is installed (optional)
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _wilders_loop(values, seed, period):
+    """
+    Wilder's smoothing recursion over a float array.
+    
+    Args:
+        values: Input values
+        seed: Mean of the first `period` values (the value at position period - 1)
+        period: Smoothing period
+        
+    Returns:
+        Array of smoothed values, NaN before position period - 1
+    """
+    result = np.full(len(values), np.nan)
+    result[period - 1] = seed
+    for i in range(period, len(values)):
+        result[i] = (result[i - 1] * (period - 1) + values[i]) / period
+    return result
+
 
 def calculate_rsi(data, period=RSI_PERIOD):
     """
@@ -70,13 +103,12 @@ def calculate_adx(data, period=ADX_PERIOD):
     # Apply Wilder's smoothing
     def wilders_smoothing(series, period):
         """Apply Wilder's smoothing method (RMA)."""
-        result = pd.Series(index=series.index, dtype=float)
-        result.iloc[period - 1] = series.iloc[:period].mean()
+        if len(series) < period:
+            return pd.Series(np.nan, index=series.index)
         
-        for i in range(period, len(series)):
-            result.iloc[i] = (result.iloc[i - 1] * (period - 1) + series.iloc[i]) / period
-        
-        return result
+        values = series.to_numpy(dtype=np.float64)
+        seed = float(series.iloc[:period].mean())
+        return pd.Series(_wilders_loop(values, seed, period), index=series.index)
     
     # Smooth TR, +DM, -DM using Wilder's method
     atr = wilders_smoothing(tr, period)
@@ -129,26 +161,50 @@ def calculate_z_score(series):
     Calculate Z-Score for a series.
     
     Args:
-        series: Pandas Series
+        series: Pandas Series or array (NaN values are ignored)
         
     Returns:
         Z-Score value for the last element
     """
-    if series.isna().all() or len(series) < 2:
+    values = np.asarray(series, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) < 2:
         return 0.0
         
-    mean = series.mean()
-    std = series.std()
+    mean = values.mean()
+    std = values.std(ddof=1)
     
-    if std == 0 or pd.isna(std):
+    if std == 0 or np.isnan(std):
         return 0.0
         
-    latest_value = series.iloc[-1]
+    latest_value = values[-1]
     z_score = (latest_value - mean) / std
     
     return z_score
 
 
+def calculate_z_score_series(series):
+    """
+    Calculate the Z-Score of each element against all values up to and including it.
+    
+    Element i equals calculate_z_score(series.iloc[:i+1].dropna()), so a full-series
+    call can be indexed to read historical values without recomputation.
+    
+    Args:
+        series: Pandas Series
+        
+    Returns:
+        Series of Z-Scores aligned to the input index
+    """
+    valid = series.dropna()
+    mean = valid.expanding().mean()
+    std = valid.expanding().std()
+    
+    z_score = ((valid - mean) / std).where(std > 0, 0.0).fillna(0.0)
+    
+    return z_score.reindex(series.index).ffill().fillna(0.0)
+
+
 def calculate_mansfield_rs(sector_data, benchmark_data, period=None, interval='1d'):
     """
     Calculate Mansfield Relative Strength.
@@ -203,3 +259,33 @@ def calculate_mansfield_rs(sector_data, benchmark_data, period=None, interval='1
     except Exception as e:
         return 0.0
 
+
+def calculate_mansfield_rs_series(sector_data, benchmark_data, period=None, interval='1d'):
+    """
+    Calculate Mansfield Relative Strength for every bar.
+    
+    Element i matches calculate_mansfield_rs() on data truncated at that bar: the
+    moving average uses all available bars until `period` are available, and values
+    with fewer than 20 common bars are 0.
+    
+    Args:
+        sector_data: Sector price data DataFrame
+        benchmark_data: Benchmark (Nifty 50) data DataFrame
+        period: Period for moving average (if None, auto-calculated based on interval)
+        interval: Data interval ('1d' for daily, '1wk' for weekly, '1h' for hourly)
+        
+    Returns:
+        Series of Mansfield RS values aligned to the sector index
+    """
+    if period is None:
+        period = 52 if interval == '1wk' else 250
+    
+    common_index = sector_data.index.intersection(benchmark_data.index)
+    if len(common_index) < 20:
+        return pd.Series(0.0, index=sector_data.index)
+    
+    rs_ratio = sector_data['Close'].loc[common_index] / benchmark_data['Close'].loc[common_index]
+    rs_ratio_ma = rs_ratio.rolling(window=period, min_periods=20).mean()
+    mansfield_rs = ((rs_ratio / rs_ratio_ma) - 1) * 10
+    
+    return mansfield_rs.reindex(sector_data.index, method='ffill').fillna(0.0)
@@ -14,6 +14,7 @@ from pathlib import Path
 # Cache database location
 CACHE_DIR = Path('.') / 'data_cache'
 CACHE_DB = CACHE_DIR / 'market_data.db'
+AVAILABILITY_FILE = CACHE_DIR / 'symbol_availability.json'
 
 # Configuration
 LOCAL_CACHE_DAYS = 180  # Keep 6 months locally
@@ -270,6 +271,47 @@ def cleanup_old_data(keep_days=180):
         print(f"⚠️ Cleanup error: {e}")
 
 
+def get_cached_availability(max_age_hours=1):
+    """
+    Load the last symbol availability check if it is recent enough.
+    
+    Args:
+        max_age_hours: Maximum age of the saved check
+        
+    Returns:
+        Dict of {name: {'status', 'bars'}} or None if missing or stale
+    """
+    if not AVAILABILITY_FILE.exists():
+        return None
+    
+    try:
+        saved = json.loads(AVAILABILITY_FILE.read_text(encoding='utf-8'))
+        checked_at = datetime.fromisoformat(saved['checked_at'])
+        if datetime.now() - checked_at > timedelta(hours=max_age_hours):
+            return None
+        return saved['results']
+    except Exception as e:
+        print(f"⚠️ Availability cache read error: {e}")
+        return None
+
+
+def cache_availability(results):
+    """
+    Save a symbol availability check so other sessions and restarts can reuse it.
+    
+    Args:
+        results: Dict of {name: {'status', 'bars'}}
+    """
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        payload = {'checked_at': datetime.now().isoformat(), 'results': results}
+        AVAILABILITY_FILE.write_text(json.dumps(payload, ensure_ascii=False), encoding='utf-8')
+        return True
+    except Exception as e:
+        print(f"⚠️ Availability cache write error: {e}")
+        return False
+
+
 if __name__ == '__main__':
     # Test cache
     initialize_cache()
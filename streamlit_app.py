@@ -7,23 +7,57 @@ Version: 2.0.0 - Fixed reversal ranking logic (Jan 2026)
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import datetime, timedelta, timezone
+import os
+import json
 import warnings
 import traceback
+from html import escape
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, wraps
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 warnings.filterwarnings('ignore')
 
 try:
     from config import (SECTORS, SECTOR_ETFS, SECTOR_ETFS_ALTERNATE, MOMENTUM_SCORE_PERCENTILE_THRESHOLD, 
-                        DEFAULT_MOMENTUM_WEIGHTS, DEFAULT_REVERSAL_WEIGHTS, DECIMAL_PLACES)
-    from data_fetcher import fetch_sector_data, fetch_sector_data_with_alternate, fetch_all_sectors_parallel, clear_data_cache
-    from analysis import analyze_all_sectors, format_results_dataframe, analyze_sector
-    from indicators import calculate_rsi, calculate_adx, calculate_cmf, calculate_z_score, calculate_mansfield_rs
-    from company_analysis import display_company_momentum_tab, display_company_reversal_tab
+                        DEFAULT_MOMENTUM_WEIGHTS, DEFAULT_REVERSAL_WEIGHTS, USE_BATCH_DOWNLOAD)
+    from data_fetcher import (fetch_sector_data, fetch_sector_data_with_alternate, fetch_sectors_batch,
+                              clear_data_cache)
+    from analysis import (format_results_dataframe, compute_raw_indicators, apply_weights,
+                          rank_min, scale_weighted_rank, weighted_rank_min, top_k_desc)
+    from indicators import (calculate_rsi, calculate_adx, calculate_cmf, calculate_z_score,
+                            calculate_z_score_series, calculate_mansfield_rs_series)
+    from company_symbols import SECTOR_COMPANIES, load_sector_companies_from_excel
+    from table_styles import (GREEN_CELL, RED_CELL, SOURCE_STATUS_COLORS, mark_top_bottom, color_sign, color_rsi,
+                              color_status, table_styles)
 except ImportError as e:
     st.error(f"❌ Import Error: {str(e)}")
     st.info("Please ensure all required modules are installed: yfinance, pandas, numpy")
     st.stop()
 
+# Plotly is optional; the momentum trend chart is skipped without it
+try:
+    import plotly.graph_objects as go
+    PLOTLY_AVAILABLE = True
+except ImportError:
+    PLOTLY_AVAILABLE = False
+
+
+@lru_cache(maxsize=None)
+def _yf():
+    """yfinance module, imported on first use (only the availability check needs it here)."""
+    import yfinance
+    return yfinance
+
+
+@lru_cache(maxsize=None)
+def _company_analysis():
+    """company_analysis module, imported the first time a company tab is shown."""
+    import company_analysis
+    return company_analysis
+
 
 # Page configuration
 st.set_page_config(
@@ -34,7 +68,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better aesthetics, center alignment, and improved visibility
-st.markdown("""
+_APP_CSS = """
     <style>
     .main-header {
         font-size: 2.5rem;
@@ -95,7 +129,20 @@ st.markdown("""
         font-size: 14px;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+# Collapsed once at import; the stylesheet is re-sent on every rerun, so keep it small
+_APP_CSS = ' '.join(_APP_CSS.split())
+
+
+def _inject_css():
+    """
+    Emit the app stylesheet. Streamlit drops elements that a rerun does not emit again,
+    so this must run every rerun rather than once per session.
+    """
+    st.markdown(_APP_CSS, unsafe_allow_html=True)
+
+
+_inject_css()
 
 
 # Tooltip definitions for all technical indicators
@@ -116,20 +163,118 @@ INDICATOR_TOOLTIPS = {
     'Weight': 'Index weight (%). Shows company/sector importance in the index.',
 }
 
+# Display names of the columns that have a tooltip, built once at import
+TOOLTIP_COL_NAMES = {col_name: f"{col_name} ℹ️" for col_name in INDICATOR_TOOLTIPS}
+
 def get_column_with_tooltip(col_name, show_tooltip=True):
     """Return column name with tooltip hover text."""
-    if show_tooltip and col_name in INDICATOR_TOOLTIPS:
-        return f"{col_name} ℹ️"
-    return col_name
+    return TOOLTIP_COL_NAMES.get(col_name, col_name) if show_tooltip else col_name
+
+# Legend as one two-column HTML grid (definitions alternate between the columns),
+# built once at import so the legend is a single markdown element
+TOOLTIP_LEGEND_HTML = (
+    '<div style="display: grid; grid-template-columns: 1fr 1fr; column-gap: 2rem;">'
+    + ''.join(f"<p><b>{escape(indicator)}</b>: {escape(tooltip)}</p>" for indicator, tooltip in INDICATOR_TOOLTIPS.items())
+    + '</div>'
+)
 
 def display_tooltip_legend():
     """Display tooltip legend at bottom of page."""
     with st.expander("📋 **Indicator Definitions** (Click to expand)", expanded=False):
-        cols = st.columns(2)
-        indicators = list(INDICATOR_TOOLTIPS.items())
-        for idx, (indicator, tooltip) in enumerate(indicators):
-            with cols[idx % 2]:
-                st.markdown(f"**{indicator}**: {tooltip}")
+        st.markdown(TOOLTIP_LEGEND_HTML, unsafe_allow_html=True)
+
+
+@st.fragment
+def _weights_fragment():
+    """
+    Sidebar weight and reversal-filter sliders.
+    Applied values are kept in st.session_state (momentum_weights, reversal_weights,
+    reversal_thresholds); slider edits only rerun this fragment until applied.
+    """
+    # Momentum weights (percentages that sum to 100%)
+    st.subheader("Momentum Score Weights (%)")
+    st.caption("Weights should sum to 100%")
+    
+    rs_weight = st.slider("RS Rating Weight (%)", 0.0, 100.0, 
+                          DEFAULT_MOMENTUM_WEIGHTS['RS_Rating'], 1.0)
+    adx_weight = st.slider("ADX Z-Score Weight (%)", 0.0, 100.0, 
+                           DEFAULT_MOMENTUM_WEIGHTS['ADX_Z'], 1.0)
+    rsi_momentum_weight = st.slider("RSI Weight (%)", 0.0, 100.0, 
+                                    DEFAULT_MOMENTUM_WEIGHTS['RSI'], 1.0)
+    di_spread_weight = st.slider("DI Spread Weight (%)", 0.0, 100.0, 
+                                 DEFAULT_MOMENTUM_WEIGHTS['DI_Spread'], 1.0)
+    
+    # Calculate and display total
+    total_momentum_weight = adx_weight + rs_weight + rsi_momentum_weight + di_spread_weight
+    if abs(total_momentum_weight - 100.0) > 0.1:
+        st.warning(f"⚠️ Weights sum to {total_momentum_weight:.1f}% (should be 100%)")
+    else:
+        st.success(f"✅ Weights sum to {total_momentum_weight:.1f}%")
+    
+    momentum_weights = {
+        'ADX_Z': adx_weight,
+        'RS_Rating': rs_weight,
+        'RSI': rsi_momentum_weight,
+        'DI_Spread': di_spread_weight
+    }
+    
+    # Reversal filter thresholds (moved before weights)
+    st.subheader("Reversal Filters")
+    st.caption("Only show sectors meeting BOTH conditions")
+    rsi_threshold = st.slider("RSI must be below", 20.0, 60.0, 40.0, 1.0,
+                              help="Only show reversal candidates with RSI below this value")
+    adx_z_threshold = st.slider("ADX Z-Score must be below", -2.0, 2.0, 2.0, 0.1,
+                                help="RSI alone can indicate trend reversal. Use ADX_Z threshold only if you want to filter by trend strength. Default 2 = no filter")
+    
+    # Reversal weights
+    st.subheader("Reversal Score Weights (%)")
+    st.caption("Weights should sum to 100%")
+    rs_ranking_weight = st.slider("RS Ranking Weight (%)", 0.0, 100.0, 
+                                  DEFAULT_REVERSAL_WEIGHTS['RS_Rating'], 1.0)
+    cmf_reversal_weight = st.slider("CMF Weight (%)", 0.0, 100.0, 
+                                    DEFAULT_REVERSAL_WEIGHTS['CMF'], 1.0)
+    rsi_reversal_weight = st.slider("RSI Weight (%)", 0.0, 100.0, 
+                                    DEFAULT_REVERSAL_WEIGHTS['RSI'], 1.0)
+    adx_z_reversal_weight = st.slider("ADX Z Weight (%)", 0.0, 100.0, 
+                                      DEFAULT_REVERSAL_WEIGHTS['ADX_Z'], 1.0)
+    
+    # Calculate and display total
+    total_reversal_weight = rs_ranking_weight + cmf_reversal_weight + rsi_reversal_weight + adx_z_reversal_weight
+    if abs(total_reversal_weight - 100.0) > 0.1:
+        st.warning(f"⚠️ Weights sum to {total_reversal_weight:.1f}% (should be 100%)")
+    else:
+        st.success(f"✅ Weights sum to {total_reversal_weight:.1f}%")
+    
+    reversal_weights = {
+        'RS_Rating': rs_ranking_weight,
+        'CMF': cmf_reversal_weight,
+        'RSI': rsi_reversal_weight,
+        'ADX_Z': adx_z_reversal_weight
+    }
+    
+    reversal_thresholds = {
+        'RSI': rsi_threshold,
+        'ADX_Z': adx_z_threshold,
+        'CMF': 0.0  # CMF must be positive for reversal candidates
+    }
+    
+    # First run: apply the defaults without waiting for a click
+    if 'momentum_weights' not in st.session_state:
+        st.session_state.momentum_weights = momentum_weights
+        st.session_state.reversal_weights = reversal_weights
+        st.session_state.reversal_thresholds = reversal_thresholds
+    
+    pending = (momentum_weights != st.session_state.momentum_weights or
+               reversal_weights != st.session_state.reversal_weights or
+               reversal_thresholds != st.session_state.reversal_thresholds)
+    if pending:
+        st.caption("⏳ Changes are applied when you click Apply")
+    
+    if st.button("✅ Apply Weights & Filters", use_container_width=True, disabled=not pending):
+        st.session_state.momentum_weights = momentum_weights
+        st.session_state.reversal_weights = reversal_weights
+        st.session_state.reversal_thresholds = reversal_thresholds
+        st.rerun()
 
 
 def get_sidebar_controls():
@@ -181,141 +326,360 @@ def get_sidebar_controls():
     st.sidebar.subheader("📊 Display Options")
     enable_color_coding = st.sidebar.checkbox("Enable Bullish/Bearish Colors", value=True,
                                                help="Color code cells to highlight strong/weak signals")
-    
-    # Time period (interval) selection
-    time_interval = st.sidebar.radio(
-        "Analysis Interval",
-        options=["Daily", "Weekly", "Hourly"],
-        index=0,
-        help="Select data granularity. Note: Hourly data limited to ~60 days history"
-    )
-    
-    # Data source selection
-    st.sidebar.subheader("Data Source")
-    
-    # Initialize session state for ETF selection
-    if 'use_etf_state' not in st.session_state:
-        st.session_state.use_etf_state = False
-    
-    use_etf = st.sidebar.checkbox("Use ETF Proxy", value=st.session_state.use_etf_state, 
-                                   help="Toggle between Index and ETF data")
+    st.sidebar.checkbox("Show Error Details", value=False, key='debug',
+                        help="Show full tracebacks when the analysis fails")
+    
+    # Interval and data source each select a new download, so they sit in one form:
+    # changing both costs a single rerun when the form is submitted
+    with st.sidebar.form("data_selection", border=False):
+        # Time period (interval) selection
+        time_interval = st.radio(
+            "Analysis Interval",
+            options=["Daily", "Weekly", "Hourly"],
+            index=0,
+            help="Select data granularity. Note: Hourly data limited to ~60 days history"
+        )
+        
+        # Data source selection
+        st.subheader("Data Source")
+        
+        # Initialize session state for ETF selection
+        if 'use_etf_state' not in st.session_state:
+            st.session_state.use_etf_state = False
+        
+        use_etf = st.checkbox("Use ETF Proxy", value=st.session_state.use_etf_state, 
+                              help="Toggle between Index and ETF data")
+        
+        st.form_submit_button("📥 Load Data", use_container_width=True)
     
     # Update session state when checkbox changes
     if use_etf != st.session_state.use_etf_state:
         st.session_state.use_etf_state = use_etf
     
-    # Momentum weights (percentages that sum to 100%)
-    st.sidebar.subheader("Momentum Score Weights (%)")
-    st.sidebar.caption("Weights should sum to 100%")
-    
-    rs_weight = st.sidebar.slider("RS Rating Weight (%)", 0.0, 100.0, 
-                                   DEFAULT_MOMENTUM_WEIGHTS['RS_Rating'], 1.0)
-    adx_weight = st.sidebar.slider("ADX Z-Score Weight (%)", 0.0, 100.0, 
-                                    DEFAULT_MOMENTUM_WEIGHTS['ADX_Z'], 1.0)
-    rsi_momentum_weight = st.sidebar.slider("RSI Weight (%)", 0.0, 100.0, 
-                                             DEFAULT_MOMENTUM_WEIGHTS['RSI'], 1.0)
-    di_spread_weight = st.sidebar.slider("DI Spread Weight (%)", 0.0, 100.0, 
-                                          DEFAULT_MOMENTUM_WEIGHTS['DI_Spread'], 1.0)
-    
-    # Calculate and display total
-    total_momentum_weight = adx_weight + rs_weight + rsi_momentum_weight + di_spread_weight
-    if abs(total_momentum_weight - 100.0) > 0.1:
-        st.sidebar.warning(f"⚠️ Weights sum to {total_momentum_weight:.1f}% (should be 100%)")
-    else:
-        st.sidebar.success(f"✅ Weights sum to {total_momentum_weight:.1f}%")
-    
-    momentum_weights = {
-        'ADX_Z': adx_weight,
-        'RS_Rating': rs_weight,
-        'RSI': rsi_momentum_weight,
-        'DI_Spread': di_spread_weight
-    }
-    
-    # Reversal filter thresholds (moved before weights)
-    st.sidebar.subheader("Reversal Filters")
-    st.sidebar.caption("Only show sectors meeting BOTH conditions")
-    rsi_threshold = st.sidebar.slider("RSI must be below", 20.0, 60.0, 40.0, 1.0,
-                                      help="Only show reversal candidates with RSI below this value")
-    adx_z_threshold = st.sidebar.slider("ADX Z-Score must be below", -2.0, 2.0, 2.0, 0.1,
-                                        help="RSI alone can indicate trend reversal. Use ADX_Z threshold only if you want to filter by trend strength. Default 2 = no filter")
-    
-    # Reversal weights
-    st.sidebar.subheader("Reversal Score Weights (%)")
-    st.sidebar.caption("Weights should sum to 100%")
-    rs_ranking_weight = st.sidebar.slider("RS Ranking Weight (%)", 0.0, 100.0, 
-                                          DEFAULT_REVERSAL_WEIGHTS['RS_Rating'], 1.0)
-    cmf_reversal_weight = st.sidebar.slider("CMF Weight (%)", 0.0, 100.0, 
-                                            DEFAULT_REVERSAL_WEIGHTS['CMF'], 1.0)
-    rsi_reversal_weight = st.sidebar.slider("RSI Weight (%)", 0.0, 100.0, 
-                                            DEFAULT_REVERSAL_WEIGHTS['RSI'], 1.0)
-    adx_z_reversal_weight = st.sidebar.slider("ADX Z Weight (%)", 0.0, 100.0, 
-                                              DEFAULT_REVERSAL_WEIGHTS['ADX_Z'], 1.0)
-    
-    # Calculate and display total
-    total_reversal_weight = rs_ranking_weight + cmf_reversal_weight + rsi_reversal_weight + adx_z_reversal_weight
-    if abs(total_reversal_weight - 100.0) > 0.1:
-        st.sidebar.warning(f"⚠️ Weights sum to {total_reversal_weight:.1f}% (should be 100%)")
-    else:
-        st.sidebar.success(f"✅ Weights sum to {total_reversal_weight:.1f}%")
-    
-    reversal_weights = {
-        'RS_Rating': rs_ranking_weight,
-        'CMF': cmf_reversal_weight,
-        'RSI': rsi_reversal_weight,
-        'ADX_Z': adx_z_reversal_weight
-    }
+    # Weights and reversal filters live in a fragment: editing them reruns only the
+    # fragment, and the full analysis reruns once they are applied
+    with st.sidebar:
+        _weights_fragment()
     
-    reversal_thresholds = {
-        'RSI': rsi_threshold,
-        'ADX_Z': adx_z_threshold,
-        'CMF': 0.0  # CMF must be positive for reversal candidates
-    }
+    momentum_weights = st.session_state.momentum_weights
+    reversal_weights = st.session_state.reversal_weights
+    reversal_thresholds = st.session_state.reversal_thresholds
     
     return use_etf, momentum_weights, reversal_weights, analysis_date, time_interval, reversal_thresholds, enable_color_coding
 
 
-@st.cache_data(ttl=300, show_spinner=False)
-def fetch_all_sector_data_cached(data_source_key, analysis_date_str, yf_interval, use_etf):
+def _frame_fingerprint(df):
+    """Cheap hash for cached price-data inputs: shape, date span and the latest close."""
+    if df is None or len(df) == 0:
+        return None
+    return (len(df), df.index[0], df.index[-1], float(df['Close'].iloc[-1]))
+
+
+class _NoData(ValueError):
+    """Raised by the cached downloads on a failed fetch, so Streamlit does not memoize the miss."""
+
+
+# Seconds a cached download is reused (matches fetch_all_sector_data_cached and the data_fetcher cache)
+FETCH_CACHE_TTL = 300
+
+
+@st.cache_data(ttl=FETCH_CACHE_TTL, show_spinner=False)
+def _cached_fetch(symbol, end_date, interval, nonce=0):
+    """Cached single-symbol download. Keyed on (symbol, end_date, interval, nonce) only."""
+    data = fetch_sector_data(symbol, end_date=end_date, interval=interval)
+    if data is None:
+        raise _NoData(symbol)
+    return data
+
+
+@st.cache_resource(ttl=FETCH_CACHE_TTL, show_spinner=False)
+def _cached_benchmark(symbol, end_date, interval, nonce=0):
+    """
+    Benchmark download shared by every session for the same date, interval and nonce.
+    
+    The returned frame is a single shared object: callers must not modify it in place.
+    """
+    data = fetch_sector_data(symbol, end_date=end_date, interval=interval)
+    if data is None:
+        raise _NoData(symbol)
+    return data
+
+
+@st.cache_data(ttl=FETCH_CACHE_TTL, show_spinner=False)
+def _cached_fetch_with_alt(symbol, alternate_symbol, end_date, interval, nonce=0):
+    """Cached download of a symbol, falling back to its alternate symbol (nonce is only part of the key)."""
+    data, used_symbol = fetch_sector_data_with_alternate(
+        symbol,
+        alternate_symbol=alternate_symbol,
+        end_date=end_date,
+        interval=interval
+    )
+    if data is None:
+        raise _NoData(symbol)
+    return data, used_symbol
+
+
+# Price columns the indicators read; everything else yfinance returns is dropped on receipt
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _compact_ohlcv(df):
+    """Keep only the OHLCV columns, downcast to float32 to halve the memory held per sector."""
+    columns = [col for col in OHLCV_COLUMNS if col in df.columns]
+    return df[columns].astype('float32')
+
+
+# Seconds to wait for all per-symbol fallback downloads together
+FALLBACK_FETCH_TIMEOUT = 20
+
+
+@st.cache_resource(ttl=300, max_entries=8, show_spinner=False)
+def fetch_all_sector_data_cached(data_source_key, analysis_date_str, yf_interval, use_etf, nonce=0):
     """
     Cached function to fetch all sector data in parallel.
-    Uses string keys for cache compatibility.
+    Uses string keys for cache compatibility; a new nonce forces a fresh download.
+    
+    The frames are returned by reference (shared by every session), so callers must
+    copy a frame before modifying it.
     """
     data_source = SECTOR_ETFS if use_etf else SECTORS
     alternates = SECTOR_ETFS_ALTERNATE if use_etf else None
     
     # Parse date if provided
-    from datetime import datetime
     analysis_date = datetime.strptime(analysis_date_str, '%Y-%m-%d').date() if analysis_date_str else None
     
     sector_data = {}
     failed_sectors = []
     
-    for sector_name, symbol in data_source.items():
+    def fetch_one(sector_name, symbol):
+        alternate_symbol = alternates.get(sector_name) if alternates else None
         try:
-            alternate_symbol = alternates.get(sector_name) if alternates else None
-            data, used_symbol = fetch_sector_data_with_alternate(
-                symbol, 
-                alternate_symbol=alternate_symbol,
-                end_date=analysis_date, 
-                interval=yf_interval
-            )
+            if alternate_symbol:
+                data, _ = _cached_fetch_with_alt(symbol, alternate_symbol, analysis_date, yf_interval, nonce)
+            else:
+                data = _cached_fetch(symbol, analysis_date, yf_interval, nonce)
+        except _NoData:
+            # Failed downloads are not cached, so the next rerun retries them
+            return None
+        return data
+    
+    # The benchmark is shared across sessions; a failed download falls through to the paths below
+    try:
+        benchmark_data = _cached_benchmark(data_source['Nifty 50'], analysis_date, yf_interval, nonce)
+    except _NoData:
+        benchmark_data = None
+    if benchmark_data is not None and len(benchmark_data) > 0:
+        sector_data['Nifty 50'] = _compact_ohlcv(benchmark_data)
+    
+    # One request for every remaining symbol; only sectors missing from the batch are fetched individually
+    if USE_BATCH_DOWNLOAD:
+        symbols = [symbol for name, symbol in data_source.items() if name not in sector_data]
+        batch = fetch_sectors_batch(symbols, end_date=analysis_date, interval=yf_interval)
+        for sector_name, symbol in data_source.items():
+            if symbol in batch and sector_name not in sector_data:
+                sector_data[sector_name] = _compact_ohlcv(batch[symbol])
+        
+        # Alternates of the sectors the batch missed also go in a single request
+        if alternates:
+            alt_symbols = {name: alt for name, alt in alternates.items()
+                           if name in data_source and name not in sector_data and alt != 'N/A'}
+            alt_batch = fetch_sectors_batch(list(alt_symbols.values()), end_date=analysis_date, interval=yf_interval)
+            for sector_name, alt_symbol in alt_symbols.items():
+                if alt_symbol in alt_batch:
+                    sector_data[sector_name] = _compact_ohlcv(alt_batch[alt_symbol])
+    
+    # Submit the benchmark first so it is never queued behind the sectors
+    items = sorted(
+        ((name, symbol) for name, symbol in data_source.items() if name not in sector_data),
+        key=lambda item: item[0] != 'Nifty 50'
+    )
+    
+    # Not a with-block: leaving one waits for every thread, which would defeat the timeout
+    executor = ThreadPoolExecutor(max_workers=10)
+    futures = {
+        executor.submit(fetch_one, sector_name, symbol): sector_name
+        for sector_name, symbol in items
+    }
+    try:
+        for future in as_completed(futures, timeout=FALLBACK_FETCH_TIMEOUT):
+            sector_name = futures[future]
+            try:
+                data = future.result()
+            except FETCH_ERRORS as e:
+                if st.session_state.get('debug'):
+                    st.caption(f"⚠️ {sector_name}: {str(e)[:30]}")
+                data = None
             
             if data is not None and len(data) > 0:
-                sector_data[sector_name] = data
+                sector_data[sector_name] = _compact_ohlcv(data)
             else:
                 failed_sectors.append(sector_name)
-        except Exception:
-            failed_sectors.append(sector_name)
+    except FuturesTimeoutError:
+        # Sectors still downloading are reported as failed instead of stalling the page
+        failed_sectors.extend(name for name in futures.values()
+                              if name not in sector_data and name not in failed_sectors)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    # Keep the configured sector order regardless of completion order
+    sector_data = {name: sector_data[name] for name in data_source if name in sector_data}
+    failed_sectors = [name for name in data_source if name in failed_sectors]
     
     return sector_data, failed_sectors
 
 
-def analyze_sectors_with_progress(use_etf, momentum_weights, reversal_weights, analysis_date=None, time_interval='Daily', reversal_thresholds=None):
-    """Run analysis with progress indicators and optimized data fetching."""
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def _cached_raw_indicators(sector_data, benchmark_data, symbols_dict, interval):
+    """Weight-independent indicators, cached so weight/threshold changes only re-rank."""
+    return compute_raw_indicators(sector_data, benchmark_data, symbols_dict, interval)
+
+
+# Errors expected from downloads and from pandas/numpy on malformed data; anything
+# else is a bug and should surface rather than be reported as a failed analysis
+FETCH_ERRORS = (OSError, KeyError, ValueError)
+ANALYSIS_ERRORS = (KeyError, ValueError, TypeError, IndexError, ZeroDivisionError)
+
+
+@contextmanager
+def _capture_errors(stage):
+    """
+    Report expected errors raised inside the block instead of propagating them.
+    
+    Args:
+        stage: Name of the step shown in the error message
+        
+    Returns:
+        Dict with a 'failed' flag; set 'stage' on it to relabel later steps
+    """
+    outcome = {'failed': False, 'stage': stage}
     try:
+        yield outcome
+    except ANALYSIS_ERRORS + FETCH_ERRORS as e:
+        outcome['failed'] = True
+        st.error(f"❌ {outcome['stage']} failed: {str(e)}")
+        if st.session_state.get('debug'):
+            st.text(traceback.format_exc())
+
+
+def _safe_tab(label):
+    """
+    Decorator for tab renderers: an exception is reported inside the tab instead of
+    ending the page, so the other views stay usable.
+    
+    Args:
+        label: Tab name shown in the error message
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                st.error(f"❌ Error displaying {label}: {str(e)}")
+                _show_traceback()
+        return wrapper
+    return decorator
+
+
+def _show_traceback():
+    """Show the current exception's traceback, formatted only when error details are enabled."""
+    if st.session_state.get('debug'):
+        st.text(traceback.format_exc())
+    else:
+        st.caption("Enable 'Show Error Details' in the sidebar to see the traceback.")
+
+
+# The company tabs live in company_analysis, which is only imported when one is shown
+@_safe_tab("company momentum tab")
+def _company_momentum_tab(*args, **kwargs):
+    return _company_analysis().display_company_momentum_tab(*args, **kwargs)
+
+
+@_safe_tab("company reversal tab")
+def _company_reversal_tab(*args, **kwargs):
+    return _company_analysis().display_company_reversal_tab(*args, **kwargs)
+
+
+# Number of (source, date, interval) data sets kept in st.session_state
+SESSION_DATA_MAX_ENTRIES = 4
+
+# Seconds a session data set is reused (matches the fetch_all_sector_data_cached TTL)
+SESSION_DATA_TTL = 300
+
+
+def _store_session_data(key, entry):
+    """Store fetched frames in session state with their fetch time, evicting the oldest entries beyond the limit."""
+    keys = st.session_state.setdefault('_session_data_keys', [])
+    if key in keys:
+        keys.remove(key)
+    keys.append(key)
+    st.session_state[key] = (datetime.now().timestamp(), entry)
+    while len(keys) > SESSION_DATA_MAX_ENTRIES:
+        st.session_state.pop(keys.pop(0), None)
+
+
+def _get_session_data(key):
+    """Frames stored under key, or None if missing or fetched more than SESSION_DATA_TTL seconds ago."""
+    stored = st.session_state.get(key)
+    if stored is None:
+        return None
+    fetched_at, entry = stored
+    if datetime.now().timestamp() - fetched_at > SESSION_DATA_TTL:
+        st.session_state.pop(key, None)
+        keys = st.session_state.get('_session_data_keys', [])
+        if key in keys:
+            keys.remove(key)
+        return None
+    return entry
+
+
+# Sidebar interval labels to yfinance intervals
+INTERVAL_MAP = {'Daily': '1d', 'Weekly': '1wk', 'Hourly': '1h'}
+
+
+def _session_data_key(use_etf, analysis_date, time_interval):
+    """Session-state key of the frames fetched for a source, analysis date and interval."""
+    data_source_key = 'etf' if use_etf else 'index'
+    analysis_date_str = analysis_date.strftime('%Y-%m-%d') if analysis_date else None
+    return f"data::{data_source_key}::{analysis_date_str}::{INTERVAL_MAP.get(time_interval, '1d')}"
+
+
+def _clear_session_data():
+    """Drop all fetched frames held in session state."""
+    for key in st.session_state.get('_session_data_keys', []):
+        st.session_state.pop(key, None)
+    st.session_state['_session_data_keys'] = []
+
+
+def _sorted_sectors(df):
+    """
+    Alphabetical sector list for the trend selectboxes, reused across reruns.
+    Keyed on the sector column (each rerun builds a new results frame), so only the
+    names are kept in session state, never the frame itself.
+    """
+    sectors = tuple(df['Sector'])
+    cached = st.session_state.get('_sectors_sorted')
+    if cached is None or cached[0] != sectors:
+        cached = (sectors, sorted(sectors))
+        st.session_state['_sectors_sorted'] = cached
+    return cached[1]
+
+
+def _show_failed_sectors(failed_sectors):
+    """Display only the first 3 sectors that failed to download."""
+    if failed_sectors:
+        failed_display = failed_sectors[:3]
+        if len(failed_sectors) > 3:
+            st.info(f"⚠️ Failed to fetch data for: {', '.join(failed_display)}, and {len(failed_sectors) - 3} more")
+        elif failed_display:
+            st.info(f"⚠️ Failed to fetch data for: {', '.join(failed_display)}")
+
+
+def analyze_sectors_with_progress(use_etf, momentum_weights, reversal_weights, analysis_date=None, time_interval='Daily', reversal_thresholds=None, nonce=0):
+    """Run analysis with progress indicators and optimized data fetching (nonce selects the download generation)."""
+    with _capture_errors("Data fetch") as outcome:
         # Map interval to yfinance format
-        interval_map = {'Daily': '1d', 'Weekly': '1wk', 'Hourly': '1h'}
-        yf_interval = interval_map.get(time_interval, '1d')
+        yf_interval = INTERVAL_MAP.get(time_interval, '1d')
         
         # Select data source
         data_source = SECTOR_ETFS if use_etf else SECTORS
@@ -325,284 +689,616 @@ def analyze_sectors_with_progress(use_etf, momentum_weights, reversal_weights, a
         data_source_key = 'etf' if use_etf else 'index'
         analysis_date_str = analysis_date.strftime('%Y-%m-%d') if analysis_date else None
         
-        # Show loading spinner during data fetch
-        with st.spinner(f"🔄 Fetching {time_interval.lower()} sector data..."):
-            # Use cached parallel fetch
-            sector_data, failed_sectors = fetch_all_sector_data_cached(
-                data_source_key, 
-                analysis_date_str, 
-                yf_interval, 
-                use_etf
-            )
+        # Reuse frames fetched earlier in this session for the same source/date/interval
+        session_key = _session_data_key(use_etf, analysis_date, time_interval)
+        session_entry = _get_session_data(session_key)
         
-        # Get benchmark data from fetched data
-        benchmark_data = sector_data.get('Nifty 50')
+        if session_entry is not None:
+            benchmark_data, sector_data, market_date, failed_sectors = session_entry
+            _show_failed_sectors(failed_sectors)
+        else:
+            # Show loading spinner during data fetch
+            with st.spinner(f"🔄 Fetching {time_interval.lower()} sector data..."):
+                # Use cached parallel fetch
+                sector_data, failed_sectors = fetch_all_sector_data_cached(
+                    data_source_key, 
+                    analysis_date_str, 
+                    yf_interval, 
+                    use_etf,
+                    nonce
+                )
         
-        if benchmark_data is None:
-            st.error("❌ Failed to fetch benchmark data (Nifty 50). Please check internet connection and try again.")
-            return None, None, None
+            # Get benchmark data from fetched data
+            benchmark_data = sector_data.get('Nifty 50')
         
-        if len(benchmark_data) == 0:
-            st.error("❌ Benchmark data is empty. No data available for Nifty 50.")
-            return None, None, None
+            if benchmark_data is None:
+                st.error("❌ Failed to fetch benchmark data (Nifty 50). Please check internet connection and try again.")
+                return None, None, None
         
-        if failed_sectors:
-            # Display only first 3 failed sectors
-            failed_display = failed_sectors[:3]
-            if len(failed_sectors) > 3:
-                st.info(f"⚠️ Failed to fetch data for: {', '.join(failed_display)}, and {len(failed_sectors) - 3} more")
-            elif failed_display:
-                st.info(f"⚠️ Failed to fetch data for: {', '.join(failed_display)}")
+            if len(benchmark_data) == 0:
+                st.error("❌ Benchmark data is empty. No data available for Nifty 50.")
+                return None, None, None
         
-        if len(sector_data) <= 1:  # Only benchmark
-            st.error("❌ No sector data available for analysis. Please check your internet connection.")
-            return None, None, None
+            _show_failed_sectors(failed_sectors)
+        
+            if len(sector_data) <= 1:  # Only benchmark
+                st.error("❌ No sector data available for analysis. Please check your internet connection.")
+                return None, None, None
         
-        # Store the last market date from the data with proper interval logic
-        if benchmark_data is not None and len(benchmark_data) > 0:
-            last_data_timestamp = benchmark_data.index[-1]
-            if yf_interval == '1h':
-                market_date = last_data_timestamp.strftime('%Y-%m-%d %H:%M')
-            elif yf_interval == '1wk':
-                week_start = last_data_timestamp - pd.Timedelta(days=last_data_timestamp.weekday())
-                market_date = f"Week of {week_start.strftime('%Y-%m-%d')}"
+            # Store the last market date from the data with proper interval logic
+            if benchmark_data is not None and len(benchmark_data) > 0:
+                last_data_timestamp = benchmark_data.index[-1]
+                if yf_interval == '1h':
+                    market_date = last_data_timestamp.strftime('%Y-%m-%d %H:%M')
+                elif yf_interval == '1wk':
+                    week_start = last_data_timestamp - pd.Timedelta(days=last_data_timestamp.weekday())
+                    market_date = f"Week of {week_start.strftime('%Y-%m-%d')}"
+                else:
+                    market_date = last_data_timestamp.strftime('%Y-%m-%d')
             else:
-                market_date = last_data_timestamp.strftime('%Y-%m-%d')
-        else:
-            market_date = "N/A"
+                market_date = "N/A"
+            
+            _store_session_data(session_key, (benchmark_data, sector_data, market_date, failed_sectors))
         
         # Analyze all sectors (excludes Nifty 50 from rankings)
-        with st.spinner("📊 Analyzing sectors..."):
-            try:
-                df = analyze_all_sectors(sector_data, benchmark_data, momentum_weights, reversal_weights, data_source, yf_interval, reversal_thresholds)
-            except Exception as e:
-                st.error(f"❌ Analysis failed: {str(e)}")
-                st.info("Please try again or adjust the parameters.")
-                return None, None, None
+        outcome['stage'] = "Analysis"
+        # Frames already in the session mean the indicators are cached too, so skip the spinner
+        with st.spinner("📊 Analyzing sectors...") if session_entry is None else nullcontext():
+            raw_df = _cached_raw_indicators(sector_data, benchmark_data, data_source, yf_interval)
+            df = apply_weights(raw_df, momentum_weights, reversal_weights, reversal_thresholds)
         
         if df is None or df.empty:
             st.error("❌ Analysis returned empty results. Please try again.")
             return None, None, None
         
         # Format results
-        try:
-            df = format_results_dataframe(df)
-        except Exception as e:
-            st.error(f"❌ Error formatting results: {str(e)}")
-            return None, None, None
+        outcome['stage'] = "Formatting results"
+        df = format_results_dataframe(df)
         
         return df, sector_data, market_date
-        
-    except Exception as e:
-        st.error(f"❌ Unexpected error during analysis: {str(e)}")
-        st.text(traceback.format_exc())
-        return None, None, None
+    
+    # Only reached when _capture_errors reported an error
+    return None, None, None
 
 
-def color_mansfield_rs(val):
-    """Color code Mansfield RS: green if > 0, red if < 0."""
-    try:
-        if float(val) > 0:
-            return 'background-color: #27AE60; color: #fff; font-weight: bold'  # Green
-        else:
-            return 'background-color: #E74C3C; color: #fff; font-weight: bold'  # Red
-    except:
-        return ''
+# Momentum table: Momentum_Score top 3 green and bottom 3 red, RSI green above 65 and red
+# below 35, Mansfield RS and CMF green for positive and red for negative
+_MOMENTUM_STYLE_RULES = [
+    (['Momentum_Score'], mark_top_bottom, {'k': 3}),
+    (['RSI'], color_rsi, {}),
+    (['Mansfield_RS', 'CMF'], color_sign, {}),
+]
 
+# Reversal table: status colours, RSI green below 35 and red above 65, Mansfield RS and CMF by sign
+_REVERSAL_STYLE_RULES = [
+    (['Reversal_Status'], color_status, {}),
+    (['RSI'], color_rsi, {'above': RED_CELL, 'below': GREEN_CELL}),
+    (['Mansfield_RS', 'CMF'], color_sign, {}),
+]
 
-def color_momentum_score(df_row, enable_coloring=True):
-    """Color code momentum score cells: green for top 3, red for bottom 3."""
-    if not enable_coloring:
-        return [''] * len(df_row)
-    
-    try:
-        momentum_scores = pd.to_numeric(df_row.get('Momentum_Score', []), errors='coerce')
-        if len(momentum_scores) == 0:
-            return [''] * len(df_row)
-        
-        top_3_threshold = momentum_scores.nlargest(3).min()
-        bottom_3_threshold = momentum_scores.nsmallest(3).max()
-        current_score = float(df_row.get('Momentum_Score', 0))
-        
-        result = [''] * len(df_row)
-        
-        # Find the index of Momentum_Score column
-        if 'Momentum_Score' in df_row.index:
-            idx = list(df_row.index).index('Momentum_Score')
-            if current_score >= top_3_threshold:
-                result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'  # Green
-            elif current_score <= bottom_3_threshold:
-                result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'  # Red
-        
-        return result
-    except:
-        return [''] * len(df_row)
 
+# Display precision of the numeric trend table metrics
+TREND_DECIMALS = {
+    'Mansfield_RS': 1, 'RS_Rating': 1, 'ADX': 1, 'ADX_Z': 1, 'DI_Spread': 1,
+    'RSI': 1, 'CMF': 2, 'Momentum_Score': 1, 'Reversal_Score': 1, 'Rank': 0
+}
 
-def color_reversal_status(val, enable_coloring=True):
-    """Color code reversal status: green for BUY_DIV, yellow for Watch."""
-    if not enable_coloring:
-        return ''
-    
-    try:
-        if val == 'BUY_DIV':
-            return 'background-color: #27AE60; color: #fff; font-weight: bold'  # Green
-        elif val == 'Watch':
-            return 'background-color: #F39C12; color: #fff; font-weight: bold'  # Yellow/Orange
-    except:
-        pass
-    return ''
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def _csv_bytes(df, na_rep=''):
+    """CSV download payload, serialized once per table content rather than on every rerun."""
+    return df.to_csv(index=False, na_rep=na_rep).encode('utf-8')
 
-def format_value(val, decimals=1):
-    """Format numerical value with specified decimal places."""
-    try:
-        return f"{float(val):.{decimals}f}"
-    except:
-        return val
 
+# Display formats of numeric table columns (values stay numeric so the tables sort correctly)
+TABLE_FORMATS = {'Price': '{:.2f}', 'Change_%': '{:.2f}%',
+                 **{metric: f"{{:.{decimals}f}}" for metric, decimals in TREND_DECIMALS.items()}}
 
-def calculate_sector_trend(sector_name, data, benchmark_data, all_sector_data, periods=7):
+
+def _format_table(styler):
+    """Apply TABLE_FORMATS to the numeric columns of a Styler (missing values shown as N/A)."""
+    formats = {col: fmt for col, fmt in TABLE_FORMATS.items() if col in styler.data.columns}
+    return styler.format(formats, na_rep='N/A')
+
+
+def _format_trend_table(styler, metrics, columns):
     """
-    Calculate trend for a sector over the last N periods with ACTUAL rank-based momentum scores.
-    This calculates momentum scores by ranking all sectors at each historical period.
+    Apply TREND_DECIMALS to a transposed trend table, where each metric is a row.
     
     Args:
-        sector_name: Name of the sector to analyze
-        data: Price data for the selected sector
-        benchmark_data: Benchmark (Nifty 50) data
-        all_sector_data: Dictionary of all sector data for ranking
-        periods: Number of periods to look back
-    
+        styler: Styler of the transposed table
+        metrics: Series of metric names aligned to the table rows
+        columns: Period columns holding the values
+        
     Returns:
-        DataFrame with historical indicators and actual momentum scores
+        Styler with number formats applied (missing values shown as N/A)
     """
-    try:
-        if data is None or len(data) < periods:
-            return None
-        
-        trend_data = []
-        
-        for i in range(periods, 0, -1):
-            try:
-                # Get the actual date for this period from the data index
-                period_index = -i if i > 0 else -1
-                if abs(period_index) <= len(data):
-                    period_date = data.index[period_index]
-                    date_str = period_date.strftime('%d-%b')
-                else:
-                    date_str = ""
-                
-                period_label = f'T-{i-1} ({date_str})' if i > 1 else f'T ({date_str})'
-                
-                # For each period, analyze ALL sectors to get rankings
-                period_results = []
-                
-                for sect_name, sect_data in all_sector_data.items():
-                    if sect_name == 'Nifty 50':  # Skip benchmark
-                        continue
-                    
-                    # Get data up to that historical point
-                    subset_data = sect_data.iloc[:-i+1] if i > 1 else sect_data
-                    bench_subset = benchmark_data.iloc[:-i+1] if i > 1 else benchmark_data
-                    
-                    if len(subset_data) < 14:  # Minimum for most indicators
-                        continue
-                    
-                    # Calculate all indicators for this sector at this point in time
-                    rsi = calculate_rsi(subset_data)
-                    adx, plus_di, minus_di, di_spread = calculate_adx(subset_data)
-                    cmf = calculate_cmf(subset_data)
-                    # Note: interval info not available here - using default behavior
-                    mansfield_rs = calculate_mansfield_rs(subset_data, bench_subset)
-                    adx_z = calculate_z_score(adx.dropna())
-                    
-                    # Calculate RS Rating
-                    if bench_subset is not None and len(bench_subset) > 0:
-                        sector_returns = subset_data['Close'].pct_change().dropna()
-                        benchmark_returns = bench_subset['Close'].pct_change().dropna()
-                        
-                        common_index = sector_returns.index.intersection(benchmark_returns.index)
-                        if len(common_index) > 1:
-                            sector_returns_aligned = sector_returns.loc[common_index]
-                            benchmark_returns_aligned = benchmark_returns.loc[common_index]
-                            
-                            sector_cumret = (1 + sector_returns_aligned).prod() - 1
-                            benchmark_cumret = (1 + benchmark_returns_aligned).prod() - 1
-                            
-                            if not pd.isna(sector_cumret) and not pd.isna(benchmark_cumret):
-                                relative_perf = sector_cumret - benchmark_cumret
-                                rs_rating = 5 + (relative_perf * 25)
-                                rs_rating = max(0, min(10, rs_rating))
-                            else:
-                                rs_rating = 5.0
-                        else:
-                            rs_rating = 5.0
-                    else:
-                        rs_rating = 5.0
-                    
-                    # Store results for this sector
-                    period_results.append({
-                        'Sector': sect_name,
-                        'ADX_Z': adx_z if not pd.isna(adx_z) else 0,
-                        'RS_Rating': rs_rating,
-                        'RSI': rsi.iloc[-1] if not rsi.isna().all() else 50,
-                        'DI_Spread': di_spread.iloc[-1] if not di_spread.isna().all() else 0,
-                        'Mansfield_RS': mansfield_rs,
-                        'ADX': adx.iloc[-1] if not adx.isna().all() else 0,
-                        'CMF': cmf.iloc[-1] if not cmf.isna().all() else 0
-                    })
-                
-                if not period_results:
-                    continue
-                
-                # Create DataFrame and rank all sectors at this point in time
-                period_df = pd.DataFrame(period_results)
-                num_sectors = len(period_df)
-                
-                # Calculate ranks: Higher values = better = rank 1 (ascending=False)
-                period_df['ADX_Z_Rank'] = period_df['ADX_Z'].rank(ascending=False, method='min')
-                period_df['RS_Rating_Rank'] = period_df['RS_Rating'].rank(ascending=False, method='min')
-                period_df['RSI_Rank'] = period_df['RSI'].rank(ascending=False, method='min')
-                period_df['DI_Spread_Rank'] = period_df['DI_Spread'].rank(ascending=False, method='min')
-                
-                # Calculate weighted average rank (lower = better)
-                period_df['Weighted_Avg_Rank'] = (
-                    (period_df['ADX_Z_Rank'] * 0.20) +
-                    (period_df['RS_Rating_Rank'] * 0.40) +
-                    (period_df['RSI_Rank'] * 0.30) +
-                    (period_df['DI_Spread_Rank'] * 0.10)
-                )
-                
-                # Scale to 1-10 where 10 = best momentum, 1 = worst
-                if num_sectors > 1:
-                    min_rank = period_df['Weighted_Avg_Rank'].min()
-                    max_rank = period_df['Weighted_Avg_Rank'].max()
-                    if max_rank > min_rank:
-                        period_df['Momentum_Score'] = 10 - ((period_df['Weighted_Avg_Rank'] - min_rank) / (max_rank - min_rank)) * 9
-                    else:
-                        period_df['Momentum_Score'] = 5.0
-                else:
-                    period_df['Momentum_Score'] = 5.0
-                
-                # Extract data for the selected sector
-                sector_row = period_df[period_df['Sector'] == sector_name]
-                if len(sector_row) > 0:
-                    trend_data.append({
-                        'Period': period_label,
-                        'Mansfield_RS': format_value(sector_row['Mansfield_RS'].iloc[0], 1),
-                        'RS_Rating': format_value(sector_row['RS_Rating'].iloc[0], 1),
-                        'ADX': format_value(sector_row['ADX'].iloc[0], 1),
-                        'ADX_Z': format_value(sector_row['ADX_Z'].iloc[0], 1),
-                        'DI_Spread': format_value(sector_row['DI_Spread'].iloc[0], 1),
-                        'RSI': format_value(sector_row['RSI'].iloc[0], 1),
-                        'CMF': format_value(sector_row['CMF'].iloc[0], 2),
-                        'Momentum_Score': format_value(sector_row['Momentum_Score'].iloc[0], 1),
-                        'Rank': int(period_df['Momentum_Score'].rank(ascending=False, method='min')[sector_row.index[0]])
-                    })
-            except Exception as e:
-                st.warning(f"⚠️ Error calculating period {period_label}: {str(e)}")
-                continue
+    for metric, decimals in TREND_DECIMALS.items():
+        rows = metrics.index[metrics == metric]
+        if len(rows) > 0:
+            styler = styler.format(f"{{:.{decimals}f}}", subset=pd.IndexSlice[rows, columns], na_rep='N/A')
+    return styler
+
+
+# Column descriptors for the st.dataframe tables, built once at import instead of on every rerun
+_MOMENTUM_COLUMN_CONFIG = {
+    "Sector": st.column_config.TextColumn(
+        "Sector",
+        help="Market sector name"
+    ),
+    "Symbol": st.column_config.TextColumn(
+        "Symbol",
+        help="Index or ETF ticker symbol"
+    ),
+    "Price": st.column_config.NumberColumn(
+        "Price",
+        help="Current closing price",
+        format="%.2f"
+    ),
+    "Change_%": st.column_config.NumberColumn(
+        "Change %",
+        help="Percentage change vs previous close",
+        format="%.2f%%"
+    ),
+    "Momentum_Score": st.column_config.NumberColumn(
+        "Momentum Score",
+        help="Ranking-based composite score: (ADX_Z Rank × 20%) + (RS_Rating Rank × 40%) + (RSI Rank × 30%) + (DI_Spread Rank × 10%). Higher is better.",
+        format="%.1f"
+    ),
+    "Mansfield_RS": st.column_config.NumberColumn(
+        "Mansfield RS",
+        help="Relative strength vs Nifty 50 benchmark. Positive = outperforming, Negative = underperforming.",
+        format="%.1f"
+    ),
+    "RS_Rating": st.column_config.NumberColumn(
+        "RS Rating",
+        help="Relative strength rating (0-10 scale) based on weighted average performance vs Nifty 50",
+        format="%.1f"
+    ),
+    "ADX": st.column_config.NumberColumn(
+        "ADX",
+        help="Average Directional Index - measures trend strength. >25 = strong trend, <20 = weak/no trend",
+        format="%.1f"
+    ),
+    "ADX_Z": st.column_config.NumberColumn(
+        "ADX Z-Score",
+        help="ADX Z-Score - normalized ADX relative to other sectors. Higher values indicate stronger relative trend.",
+        format="%.1f"
+    ),
+    "RSI": st.column_config.NumberColumn(
+        "RSI",
+        help="Relative Strength Index (14-period). >70 = overbought, <30 = oversold, 40-60 = neutral",
+        format="%.1f"
+    ),
+    "DI_Spread": st.column_config.NumberColumn(
+        "DI Spread",
+        help="Directional Indicator Spread (+DI minus -DI). Positive = bullish, Negative = bearish",
+        format="%.1f"
+    ),
+    "CMF": st.column_config.NumberColumn(
+        "CMF",
+        help="Chaikin Money Flow (20-period). >0 = accumulation, <0 = distribution, >0.1 = strong buying",
+        format="%.2f"
+    )
+}
+
+_REVERSAL_COLUMN_CONFIG = {
+    "Sector": st.column_config.TextColumn(
+        "Sector",
+        help="Market sector name"
+    ),
+    "Price": st.column_config.NumberColumn(
+        "Price",
+        format="%.2f"
+    ),
+    "Change_%": st.column_config.NumberColumn(
+        "Change %",
+        format="%.2f%%"
+    ),
+    "Reversal_Status": st.column_config.TextColumn(
+        "Status",
+        help="BUY_DIV = Strong buy divergence signal, Watch = Potential reversal zone"
+    ),
+    "Reversal_Score": st.column_config.NumberColumn(
+        "Reversal Score",
+        help="Rank-based score for reversal potential. Higher rank = stronger reversal candidate based on RS Rating, CMF, RSI, and ADX Z rankings among eligible sectors.",
+        format="%.1f"
+    ),
+    "RS_Rating": st.column_config.NumberColumn(
+        "RS Rating",
+        help="Relative strength rating (0-10 scale). Lower values indicate underperformance with recovery potential",
+        format="%.1f"
+    ),
+    "CMF": st.column_config.NumberColumn(
+        "CMF",
+        help="Chaikin Money Flow. Positive values indicate accumulation/buying pressure",
+        format="%.2f"
+    ),
+    "RSI": st.column_config.NumberColumn(
+        "RSI",
+        help="Relative Strength Index. Lower values indicate oversold conditions",
+        format="%.1f"
+    ),
+    "ADX_Z": st.column_config.NumberColumn(
+        "ADX Z-Score",
+        help="Negative values indicate weak trend, favorable for reversals",
+        format="%.1f"
+    ),
+    "Mansfield_RS": st.column_config.NumberColumn(
+        "Mansfield RS",
+        help="Negative values indicate underperformance with recovery potential",
+        format="%.1f"
+    ),
+    "Momentum_Score": st.column_config.NumberColumn(
+        "Momentum Score",
+        help="Current momentum score for reference",
+        format="%.1f"
+    )
+}
+
+_HISTORICAL_REVERSAL_COLUMN_CONFIG = {
+    "Date": st.column_config.TextColumn(
+        "Date",
+        help="Analysis date"
+    ),
+    "Rank_1_Sector": st.column_config.TextColumn(
+        "Top Reversal #1",
+        help="Strongest reversal candidate on this date"
+    ),
+    "Rank_1_Symbol": st.column_config.TextColumn(
+        "Symbol #1",
+        help="Ticker symbol for top reversal candidate"
+    ),
+    "Rank_2_Sector": st.column_config.TextColumn(
+        "Top Reversal #2",
+        help="Second strongest reversal candidate on this date"
+    ),
+    "Rank_2_Symbol": st.column_config.TextColumn(
+        "Symbol #2",
+        help="Ticker symbol for second reversal candidate"
+    )
+}
+
+_ALL_REVERSAL_COLUMN_CONFIG = {
+    "Reversal_Score": st.column_config.NumberColumn(
+        "Reversal_Score",
+        format="%.1f"
+    ),
+    "RS_Rating": st.column_config.NumberColumn(format="%.1f"),
+    "CMF": st.column_config.NumberColumn(
+        "CMF",
+        format="%.2f"
+    ),
+    "RSI": st.column_config.NumberColumn(format="%.1f"),
+    "ADX_Z": st.column_config.NumberColumn(format="%.1f"),
+    "Mansfield_RS": st.column_config.NumberColumn(format="%.1f"),
+    "Momentum_Score": st.column_config.NumberColumn(format="%.1f")
+}
+
+
+def _indicator_array(series):
+    """Values of a full-series indicator plus the position of its first non-NaN value."""
+    values = series.to_numpy(dtype=float)
+    valid = ~np.isnan(values)
+    first_valid = int(valid.argmax()) if valid.any() else len(values)
+    return values, first_valid
+
+
+def _value_at(indicator, pos, default):
+    """Read an _indicator_array at `pos` as if the series ended there."""
+    values, first_valid = indicator
+    if pos < first_valid:
+        return default
+    return values[pos]
+
+
+def _values_at(indicator, positions, default):
+    """Vectorized _value_at for an array of positions."""
+    values, first_valid = indicator
+    return np.where(positions < first_valid, default, values[positions])
+
+
+# Benchmark-independent indicator arrays per (sector, data fingerprint), shared by the
+# trend panel and both historical reports; oldest entries are evicted first
+_INDICATOR_CACHE = {}
+INDICATOR_CACHE_MAX_ENTRIES = 64
+
+
+def _sector_indicator_arrays(sect_name, sect_data):
+    """
+    RSI, ADX, DI spread, ADX Z-Score and CMF arrays over a sector's full history.
+    Results are reused while the sector data fingerprint is unchanged.
+    """
+    key = (sect_name, _frame_fingerprint(sect_data))
+    cached = _INDICATOR_CACHE.get(key)
+    if cached is not None:
+        return cached
+    
+    adx, plus_di, minus_di, di_spread = calculate_adx(sect_data)
+    cached = {
+        'rsi': _indicator_array(calculate_rsi(sect_data)),
+        'adx': _indicator_array(adx),
+        'di_spread': _indicator_array(di_spread),
+        'adx_z': calculate_z_score_series(adx).to_numpy(),
+        'cmf': _indicator_array(calculate_cmf(sect_data)),
+    }
+    
+    # Evict from a snapshot of the keys; the trend precompute fills this from worker threads
+    stale = list(_INDICATOR_CACHE)
+    for old_key in stale[:max(len(stale) - INDICATOR_CACHE_MAX_ENTRIES + 1, 0)]:
+        _INDICATOR_CACHE.pop(old_key, None)
+    _INDICATOR_CACHE[key] = cached
+    return cached
+
+
+def _precompute_trend_indicators(all_sector_data, benchmark_data):
+    """
+    Compute every trend indicator once over each sector's full history.
+    All indicators are causal, so the value at position -i equals the value
+    computed on the series truncated i-1 bars earlier.
+    """
+    rs_rating, rs_columns = _rs_rating_matrix(all_sector_data, benchmark_data)
+    names = [name for name in all_sector_data if name != 'Nifty 50']  # Skip benchmark
+    
+    # Sectors are independent and the pandas/NumPy kernels release the GIL for much
+    # of their work, so compute them on a small thread pool
+    def compute(sect_name):
+        sect_data = all_sector_data[sect_name]
+        return (_sector_indicator_arrays(sect_name, sect_data),
+                calculate_mansfield_rs_series(sect_data, benchmark_data).to_numpy())
+    
+    with ThreadPoolExecutor(max_workers=min(8, max(len(names), 1))) as executor:
+        computed = dict(zip(names, executor.map(compute, names)))
+    
+    per_sector_cache = {}
+    for sect_name in names:
+        sect_data = all_sector_data[sect_name]
+        indicators, mansfield = computed[sect_name]
+        per_sector_cache[sect_name] = {
+            **indicators,
+            'mansfield': mansfield,
+            'rs_rating': rs_rating[:, rs_columns[sect_name]],
+            # Benchmark row of each sector bar (last benchmark bar on or before it)
+            'rs_rows': benchmark_data.index.searchsorted(sect_data.index, side='right') - 1
+        }
+    return per_sector_cache
+
+
+def _rs_rating_matrix(all_sector_data, benchmark_data):
+    """
+    RS Rating of every sector at every benchmark bar, computed in one (T, S) array op.
+    
+    Cumulative returns only count dates where both the sector and the benchmark have
+    a return, so each column equals the RS Rating over the common dates up to that bar.
+    
+    Returns:
+        Tuple of (rs_rating array of shape (T, S), {sector_name: column})
+    """
+    names = [name for name in all_sector_data if name != 'Nifty 50']
+    benchmark_returns = benchmark_data['Close'].pct_change().to_numpy(dtype=float)
+    if not names:
+        return np.full((len(benchmark_returns), 0), 5.0), {}
+    
+    sector_returns = np.column_stack([
+        all_sector_data[name]['Close'].pct_change().reindex(benchmark_data.index).to_numpy(dtype=float)
+        for name in names
+    ])
+    common = ~np.isnan(sector_returns) & ~np.isnan(benchmark_returns)[:, None]
+    
+    # Multiplying by 1 on non-common dates carries the last common value forward exactly
+    sector_cum = np.cumprod(np.where(common, 1 + sector_returns, 1.0), axis=0)
+    benchmark_cum = np.cumprod(np.where(common, 1 + benchmark_returns[:, None], 1.0), axis=0)
+    
+    rs_rating = np.nan_to_num(np.clip(5 + (sector_cum - benchmark_cum) * 25, 0, 10), nan=5.0)
+    rs_rating[np.cumsum(common, axis=0) <= 1] = 5.0
+    
+    return rs_rating, {name: col for col, name in enumerate(names)}
+
+
+# Factor order of the historical factor tensor
+HISTORICAL_FACTORS = ('ADX_Z', 'RS_Rating', 'RSI', 'DI_Spread', 'CMF')
+
+
+def _historical_factor_matrices(sector_data_dict, per_sector_cache, benchmark_len, steps, min_bars=50, dtype=np.float64):
+    """
+    Ranking inputs of every sector at every historical step, as one contiguous
+    (factors, steps, sectors) tensor so each factor's cross-sector rows are adjacent in memory.
+    Step i reads each sector at bar len - i - 1, the last bar of the data before bar -i.
+    
+    Args:
+        sector_data_dict: Dictionary of sector name to data DataFrame
+        per_sector_cache: Output of _precompute_trend_indicators
+        benchmark_len: Number of benchmark bars
+        steps: Array of bars-back values, one per row
+        min_bars: Bars of history a sector needs to be included at a step
+        dtype: Tensor dtype (the historical reports rank on float32 to halve memory traffic)
+    
+    Returns:
+        Tuple of (sector names, included mask, {factor: (steps, sectors) view}, tensor)
+        with factors in HISTORICAL_FACTORS order (NaN where not included)
+    """
+    names = [name for name in sector_data_dict if name != 'Nifty 50']
+    bench_pos = benchmark_len - steps - 1
+    shape = (len(steps), len(names))
+    included = np.zeros(shape, dtype=bool)
+    tensor = np.full((len(HISTORICAL_FACTORS),) + shape, np.nan, dtype=dtype)
+    factors = dict(zip(HISTORICAL_FACTORS, tensor))
+    
+    for col, name in enumerate(names):
+        cached = per_sector_cache[name]
+        pos = len(sector_data_dict[name]) - steps - 1
+        rows = pos + 1 >= min_bars
+        included[:, col] = rows
+        pos = pos[rows]
+        
+        adx_z = cached['adx_z'][pos]
+        factors['ADX_Z'][rows, col] = np.where(np.isnan(adx_z), 0, adx_z)
+        factors['RSI'][rows, col] = _values_at(cached['rsi'], pos, 50)
+        factors['DI_Spread'][rows, col] = _values_at(cached['di_spread'], pos, 0)
+        factors['CMF'][rows, col] = _values_at(cached['cmf'], pos, 0)
+        
+        # RS Rating as of the earlier of the sector bar and the benchmark bar
+        rs_rows = np.minimum(cached['rs_rows'][pos], bench_pos[rows])
+        factors['RS_Rating'][rows, col] = np.where(rs_rows >= 0, cached['rs_rating'][np.maximum(rs_rows, 0)], 5.0)
+    
+    return names, included, factors, tensor
+
+
+# Reversal ranking factors as (name, default weight, ascending): lower RS_Rating, RSI
+# and ADX_Z are better for reversals (lowest = rank 1); higher CMF is better
+REVERSAL_RANK_FACTORS = [('RS_Rating', 40, True), ('CMF', 40, False), ('RSI', 10, True), ('ADX_Z', 10, True)]
+
+
+# Minimum bars of history a sector needs before its indicators are used in a trend period
+MIN_TREND_BARS = 14
+
+
+# Bars kept in the shared historical panel; trend views read their last N periods from it
+MAX_TREND_PERIODS = 10
+
+
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def _historical_panel(all_sector_data, benchmark_data, periods=MAX_TREND_PERIODS):
+    """
+    Indicator values for every sector at each of the last N bars.
+    The panel does not depend on the selected sector, so it is built once per data set
+    and shared by every trend view.
+    
+    Args:
+        all_sector_data: Dictionary of all sector data for ranking
+        benchmark_data: Benchmark (Nifty 50) data
+        periods: Number of bars to look back
+    
+    Returns:
+        Dict of {bars_back: period_df}, where bars_back = 1 is each sector's latest bar
+    """
+    # Indicators are computed once per sector; every period reads (periods, sectors) column arrays
+    per_sector_cache = _precompute_trend_indicators(all_sector_data, benchmark_data)
+    steps = np.arange(periods, 0, -1) - 1
+    names, included, factors, _ = _historical_factor_matrices(
+        all_sector_data, per_sector_cache, len(benchmark_data), steps, min_bars=MIN_TREND_BARS)
+    
+    factors['Mansfield_RS'] = np.full(included.shape, np.nan)
+    factors['ADX'] = np.full(included.shape, np.nan)
+    for col, name in enumerate(names):
+        rows = included[:, col]
+        pos = len(all_sector_data[name]) - steps[rows] - 1
+        factors['Mansfield_RS'][rows, col] = per_sector_cache[name]['mansfield'][pos]
+        factors['ADX'][rows, col] = _values_at(per_sector_cache[name]['adx'], pos, 0)
+    
+    names = np.array(names, dtype=object)
+    columns = ['ADX_Z', 'RS_Rating', 'RSI', 'DI_Spread', 'Mansfield_RS', 'ADX', 'CMF']
+    panel = {}
+    for row, i in enumerate(steps + 1):
+        mask = included[row]
+        if mask.any():
+            panel[int(i)] = pd.DataFrame({'Sector': names[mask], **{c: factors[c][row, mask] for c in columns}})
+    
+    return panel
+
+
+def _historical_indicator_matrix(sector_name, all_sector_data, benchmark_data, periods):
+    """
+    Indicator values for every sector at each of the last N periods.
+    Shared by the momentum and reversal trends, which only differ in how they score it.
+    
+    Args:
+        sector_name: Sector whose dates label the periods
+        all_sector_data: Dictionary of all sector data for ranking
+        benchmark_data: Benchmark (Nifty 50) data
+        periods: Number of periods to look back
+    
+    Returns:
+        Dict of {period_label: period_df}, oldest period first
+    """
+    data = all_sector_data[sector_name]
+    panel = _historical_panel(all_sector_data, benchmark_data, max(periods, MAX_TREND_PERIODS))
+    matrix = {}
+    
+    for i in range(periods, 0, -1):
+        if i not in panel:
+            continue
+        
+        # Get the actual date for this period from the data index
+        if i <= len(data):
+            date_str = data.index[-i].strftime('%d-%b')
+        else:
+            date_str = ""
+        
+        period_label = f'T-{i-1} ({date_str})' if i > 1 else f'T ({date_str})'
+        matrix[period_label] = panel[i]
+    
+    return matrix
+
+
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
+def calculate_sector_trend(sector_name, data, benchmark_data, all_sector_data, periods=7):
+    """
+    Calculate trend for a sector over the last N periods with ACTUAL rank-based momentum scores.
+    This calculates momentum scores by ranking all sectors at each historical period.
+    
+    Args:
+        sector_name: Name of the sector to analyze
+        data: Price data for the selected sector
+        benchmark_data: Benchmark (Nifty 50) data
+        all_sector_data: Dictionary of all sector data for ranking
+        periods: Number of periods to look back
+    
+    Returns:
+        DataFrame with historical indicators and actual momentum scores (numeric;
+        format with TREND_DECIMALS for display)
+    """
+    try:
+        if data is None or len(data) < periods:
+            return None
+        
+        # Periods where the selected sector has fewer than MIN_TREND_BARS bars would be skipped anyway
+        periods = min(periods, len(data) - MIN_TREND_BARS + 1)
+        if periods < 1:
+            return None
+        
+        matrix = _historical_indicator_matrix(sector_name, all_sector_data, benchmark_data, periods)
+        matrix = {label: period_df for label, period_df in matrix.items()
+                  if (period_df['Sector'].to_numpy() == sector_name).any()}
+        if not matrix:
+            return None
+        
+        momentum_columns = ['ADX_Z', 'RS_Rating', 'RSI', 'DI_Spread']
+        momentum_rank_weights = np.array([0.20, 0.40, 0.30, 0.10])
+        
+        # Lay every period out as a (factors, periods, sectors) array; sectors missing
+        # from a period stay NaN and are left unranked
+        sectors = list(dict.fromkeys(s for period_df in matrix.values() for s in period_df['Sector']))
+        sector_col = {name: col for col, name in enumerate(sectors)}
+        values = np.full((len(momentum_columns), len(matrix), len(sectors)), np.nan)
+        for t, period_df in enumerate(matrix.values()):
+            cols = [sector_col[name] for name in period_df['Sector']]
+            values[:, t, cols] = period_df[momentum_columns].to_numpy(dtype=float).T
+        
+        # Rank and score all periods in one pass: higher values = better = rank 1,
+        # then scale the weighted average rank to 1-10 where 10 = best momentum
+        ranks = rank_min(values)
+        weighted_rank = sum(rank * weight for rank, weight in zip(ranks, momentum_rank_weights))
+        momentum_scores = scale_weighted_rank(weighted_rank)
+        score_ranks = rank_min(momentum_scores)
+        
+        # Extract data for the selected sector
+        col = sector_col[sector_name]
+        trend_data = []
+        for t, (period_label, period_df) in enumerate(matrix.items()):
+            sector_row = period_df.iloc[np.flatnonzero(period_df['Sector'].to_numpy() == sector_name)[0]]
+            trend_data.append({
+                'Period': period_label,
+                'Mansfield_RS': sector_row['Mansfield_RS'],
+                'RS_Rating': sector_row['RS_Rating'],
+                'ADX': sector_row['ADX'],
+                'ADX_Z': sector_row['ADX_Z'],
+                'DI_Spread': sector_row['DI_Spread'],
+                'RSI': sector_row['RSI'],
+                'CMF': sector_row['CMF'],
+                'Momentum_Score': momentum_scores[t, col],
+                'Rank': int(score_ranks[t, col])
+            })
         
         if not trend_data:
             return None
@@ -615,6 +1311,7 @@ def calculate_sector_trend(sector_name, data, benchmark_data, all_sector_data, p
         return None
 
 
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
 def calculate_reversal_trend(sector_name, data, benchmark_data, all_sector_data, reversal_weights, reversal_thresholds, periods=7):
     """
     Calculate reversal trend for a sector over the last N periods with ACTUAL rank-based reversal scores.
@@ -630,177 +1327,83 @@ def calculate_reversal_trend(sector_name, data, benchmark_data, all_sector_data,
         periods: Number of periods to look back
     
     Returns:
-        DataFrame with historical indicators and actual reversal scores
+        DataFrame with historical indicators and actual reversal scores (numeric,
+        NaN score when not eligible; format with TREND_DECIMALS for display)
     """
     try:
         if data is None or len(data) < periods:
             return None
         
+        # Periods where the selected sector has fewer than MIN_TREND_BARS bars would be skipped anyway
+        periods = min(periods, len(data) - MIN_TREND_BARS + 1)
+        if periods < 1:
+            return None
+        
         trend_data = []
+        matrix = _historical_indicator_matrix(sector_name, all_sector_data, benchmark_data, periods)
         
-        for i in range(periods, 0, -1):
+        for period_label, period_df in matrix.items():
             try:
-                # Get the actual date for this period from the data index
-                period_index = -i if i > 0 else -1
-                if abs(period_index) <= len(data):
-                    period_date = data.index[period_index]
-                    date_str = period_date.strftime('%d-%b')
-                else:
-                    date_str = ""
-                
-                period_label = f'T-{i-1} ({date_str})' if i > 1 else f'T ({date_str})'
-                
-                # For each period, analyze ALL sectors to get rankings
-                period_results = []
-                
-                for sect_name, sect_data in all_sector_data.items():
-                    if sect_name == 'Nifty 50':  # Skip benchmark
-                        continue
-                    
-                    # Get data up to that historical point
-                    subset_data = sect_data.iloc[:-i+1] if i > 1 else sect_data
-                    bench_subset = benchmark_data.iloc[:-i+1] if i > 1 else benchmark_data
-                    
-                    if len(subset_data) < 14:  # Minimum for most indicators
-                        continue
-                    
-                    # Calculate all indicators for this sector at this point in time
-                    rsi = calculate_rsi(subset_data)
-                    adx, plus_di, minus_di, di_spread = calculate_adx(subset_data)
-                    cmf = calculate_cmf(subset_data)
-                    mansfield_rs = calculate_mansfield_rs(subset_data, bench_subset)
-                    adx_z = calculate_z_score(adx.dropna())
-                    
-                    # Calculate RS Rating
-                    if bench_subset is not None and len(bench_subset) > 0:
-                        sector_returns = subset_data['Close'].pct_change().dropna()
-                        benchmark_returns = bench_subset['Close'].pct_change().dropna()
-                        
-                        common_index = sector_returns.index.intersection(benchmark_returns.index)
-                        if len(common_index) > 1:
-                            sector_returns_aligned = sector_returns.loc[common_index]
-                            benchmark_returns_aligned = benchmark_returns.loc[common_index]
-                            
-                            sector_cumret = (1 + sector_returns_aligned).prod() - 1
-                            benchmark_cumret = (1 + benchmark_returns_aligned).prod() - 1
-                            
-                            if not pd.isna(sector_cumret) and not pd.isna(benchmark_cumret):
-                                relative_perf = sector_cumret - benchmark_cumret
-                                rs_rating = 5 + (relative_perf * 25)
-                                rs_rating = max(0, min(10, rs_rating))
-                            else:
-                                rs_rating = 5.0
-                        else:
-                            rs_rating = 5.0
-                    else:
-                        rs_rating = 5.0
-                    
-                    # Get final values
-                    rsi_val = rsi.iloc[-1] if not rsi.isna().all() else 50
-                    adx_z_val = adx_z if not pd.isna(adx_z) else 0
-                    cmf_val = cmf.iloc[-1] if not cmf.isna().all() else 0
-                    
-                    # Check reversal eligibility
-                    meets_rsi = rsi_val < reversal_thresholds.get('RSI', 40)
-                    meets_adx_z = adx_z_val < reversal_thresholds.get('ADX_Z', -0.5)
-                    
-                    period_results.append({
-                        'Sector': sect_name,
-                        'RSI': rsi_val,
-                        'ADX_Z': adx_z_val,
-                        'CMF': cmf_val,
-                        'RS_Rating': rs_rating,
-                        'Mansfield_RS': mansfield_rs,
-                        'Meets_RSI': meets_rsi,
-                        'Meets_ADX_Z': meets_adx_z,
-                        'Eligible': meets_rsi and meets_adx_z
-                    })
+                # Check reversal eligibility
+                period_df = period_df[['Sector', 'RSI', 'ADX_Z', 'CMF', 'RS_Rating', 'Mansfield_RS']].copy()
+                period_df['Meets_RSI'] = period_df['RSI'] < reversal_thresholds.get('RSI', 40)
+                period_df['Meets_ADX_Z'] = period_df['ADX_Z'] < reversal_thresholds.get('ADX_Z', -0.5)
+                period_df['Eligible'] = period_df['Meets_RSI'] & period_df['Meets_ADX_Z']
                 
-                if not period_results:
+                # Extract data for the selected sector
+                sector_row = period_df[period_df['Sector'] == sector_name]
+                if len(sector_row) == 0:
                     continue
+                is_eligible = sector_row['Eligible'].iloc[0]
+                rsi_val = sector_row['RSI'].iloc[0]
+                adx_z_val = sector_row['ADX_Z'].iloc[0]
+                cmf_val = sector_row['CMF'].iloc[0]
                 
-                # Create DataFrame
-                period_df = pd.DataFrame(period_results)
-                
-                # Filter to eligible reversals only
-                eligible_reversals = period_df[period_df['Eligible']].copy()
-                
-                if len(eligible_reversals) > 0:
-                    num_eligible = len(eligible_reversals)
-                    # Calculate ranks within eligible sectors
-                    # Lower RS_Rating, RSI, ADX_Z are better for reversals → rank ascending=True (lowest = rank 1)
-                    # Higher CMF is better → rank ascending=False (highest = rank 1)
-                    eligible_reversals['RS_Rating_Rank'] = eligible_reversals['RS_Rating'].rank(ascending=True, method='min')
-                    eligible_reversals['CMF_Rank'] = eligible_reversals['CMF'].rank(ascending=False, method='min')
-                    eligible_reversals['RSI_Rank'] = eligible_reversals['RSI'].rank(ascending=True, method='min')
-                    eligible_reversals['ADX_Z_Rank'] = eligible_reversals['ADX_Z'].rank(ascending=True, method='min')
+                reversal_score = np.nan
+                status = 'No'
+                rank = np.nan
+                # Scores are only read for the selected sector, so skip ranking when it is not eligible
+                if is_eligible:
+                    # Check if BUY_DIV or Watch based on standard thresholds (same as main table)
+                    if rsi_val < reversal_thresholds.get('RSI', 40) * 0.75 and adx_z_val < reversal_thresholds.get('ADX_Z', -0.5) - 0.5 and cmf_val > 0.1:
+                        status = 'BUY_DIV'
+                    else:
+                        status = 'Watch'
                     
-                    # Calculate weighted average rank (lower = better reversal candidate)
+                    # Rank within eligible sectors on plain arrays and take the
+                    # weighted average rank (lower = better reversal candidate)
+                    eligible_reversals = period_df[period_df['Eligible']]
                     total_weight = sum(reversal_weights.values())
-                    eligible_reversals['Weighted_Avg_Rank'] = (
-                        (eligible_reversals['RS_Rating_Rank'] * reversal_weights.get('RS_Rating', 40) / total_weight) +
-                        (eligible_reversals['CMF_Rank'] * reversal_weights.get('CMF', 40) / total_weight) +
-                        (eligible_reversals['RSI_Rank'] * reversal_weights.get('RSI', 10) / total_weight) +
-                        (eligible_reversals['ADX_Z_Rank'] * reversal_weights.get('ADX_Z', 10) / total_weight)
+                    weighted_rank = sum(
+                        rank_min(eligible_reversals[factor].to_numpy(dtype=float), ascending=ascending)
+                        * reversal_weights.get(factor, default) / total_weight
+                        for factor, default, ascending in REVERSAL_RANK_FACTORS
                     )
                     
                     # Scale to 1-10 where 10 = best reversal candidate, 1 = worst
-                    if num_eligible > 1:
-                        min_rank = eligible_reversals['Weighted_Avg_Rank'].min()
-                        max_rank = eligible_reversals['Weighted_Avg_Rank'].max()
-                        if max_rank > min_rank:
-                            eligible_reversals['Reversal_Score'] = 10 - ((eligible_reversals['Weighted_Avg_Rank'] - min_rank) / (max_rank - min_rank)) * 9
-                        else:
-                            eligible_reversals['Reversal_Score'] = 5.0
+                    if len(eligible_reversals) > 1:
+                        scores = scale_weighted_rank(weighted_rank)
                     else:
-                        eligible_reversals['Reversal_Score'] = 10.0  # Single eligible gets max score
+                        scores = np.array([10.0])  # Single eligible gets max score
                     
-                    # Merge back to get reversal scores
-                    period_df = period_df.merge(
-                        eligible_reversals[['Sector', 'Reversal_Score']], 
-                        on='Sector', 
-                        how='left'
-                    )
-                    period_df['Reversal_Score'].fillna(0, inplace=True)
-                else:
-                    period_df['Reversal_Score'] = 0
+                    reversal_score = scores[(eligible_reversals['Sector'] == sector_name).to_numpy()][0]
+                    if reversal_score > 0:
+                        # Min-method rank = 1 + number of eligible sectors with a higher score
+                        rank = 1 + int(np.count_nonzero(scores > reversal_score))
+                    else:
+                        reversal_score = np.nan
                 
-                # Extract data for the selected sector
-                sector_row = period_df[period_df['Sector'] == sector_name]
-                if len(sector_row) > 0:
-                    reversal_score = sector_row['Reversal_Score'].iloc[0]
-                    is_eligible = sector_row['Eligible'].iloc[0]
-                    rsi_val = sector_row['RSI'].iloc[0]
-                    adx_z_val = sector_row['ADX_Z'].iloc[0]
-                    cmf_val = sector_row['CMF'].iloc[0]
-                    
-                    # Determine reversal status based on thresholds (same as main table)
-                    status = 'No'
-                    if is_eligible:
-                        # Check if BUY_DIV or Watch based on standard thresholds
-                        if rsi_val < reversal_thresholds.get('RSI', 40) * 0.75 and adx_z_val < reversal_thresholds.get('ADX_Z', -0.5) - 0.5 and cmf_val > 0.1:
-                            status = 'BUY_DIV'
-                        else:
-                            status = 'Watch'
-                    
-                    # Rank should show number if eligible and has reversal_score > 0
-                    rank = 'N/A'
-                    if status != 'No' and reversal_score > 0:  # Only if eligible with score
-                        ranked_df = period_df[period_df['Reversal_Score'] > 0].copy()
-                        if len(ranked_df) > 0:
-                            rank = int(ranked_df['Reversal_Score'].rank(ascending=False, method='min')[sector_row.index[0]])
-                    
-                    trend_data.append({
-                        'Period': period_label,
-                        'Status': status,
-                        'RS_Rating': format_value(sector_row['RS_Rating'].iloc[0], 1),
-                        'CMF': format_value(sector_row['CMF'].iloc[0], 2),
-                        'RSI': format_value(sector_row['RSI'].iloc[0], 1),
-                        'ADX_Z': format_value(sector_row['ADX_Z'].iloc[0], 1),
-                        'Mansfield_RS': format_value(sector_row['Mansfield_RS'].iloc[0], 1),
-                        'Reversal_Score': format_value(reversal_score, 1) if reversal_score > 0 else 'N/A',
-                        'Rank': rank
-                    })
+                trend_data.append({
+                    'Period': period_label,
+                    'Status': status,
+                    'RS_Rating': sector_row['RS_Rating'].iloc[0],
+                    'CMF': cmf_val,
+                    'RSI': rsi_val,
+                    'ADX_Z': adx_z_val,
+                    'Mansfield_RS': sector_row['Mansfield_RS'].iloc[0],
+                    'Reversal_Score': reversal_score,
+                    'Rank': rank
+                })
             except Exception as e:
                 st.warning(f"⚠️ Error calculating period {period_label}: {str(e)}")
                 continue
@@ -812,10 +1415,11 @@ def calculate_reversal_trend(sector_name, data, benchmark_data, all_sector_data,
         return df
         
     except Exception as e:
-        st.warning(f"⚠️ Error calculating reversal trend: {str(e)}")
+        st.warning(f"⚠️ Error calculating trend: {str(e)}")
         return None
 
 
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
 def calculate_historical_momentum_performance(sector_data_dict, benchmark_data, momentum_weights, use_etf, interval='1d', months=6):
     """
     Calculate historical top 2 momentum ETFs with forward returns over the past N months.
@@ -832,9 +1436,6 @@ def calculate_historical_momentum_performance(sector_data_dict, benchmark_data,
         DataFrame with date, top 2 ETFs, and their forward returns
     """
     try:
-        from datetime import timedelta
-        import pandas as pd
-        
         # Determine lookback period based on interval
         if interval == '1wk':
             # For weekly, approximate 6 months = 26 weeks
@@ -851,143 +1452,80 @@ def calculate_historical_momentum_performance(sector_data_dict, benchmark_data,
         
         historical_results = []
         
+        # Indicators are computed once per sector over the full history; each step
+        # reads them at the last bar of the data available at that point
+        per_sector_cache = _precompute_trend_indicators(sector_data_dict, benchmark_data)
+        momentum_factors = [('ADX_Z', 20), ('RS_Rating', 40), ('RSI', 30), ('DI_Spread', 10)]
+        
+        # Close prices as plain arrays for the forward-return lookups
+        closes = {name: data['Close'].to_numpy() for name, data in sector_data_dict.items()}
+        
+        def calc_forward_return(close, current_idx, forward_periods):
+            """Percent change from bar current_idx to forward_periods bars later (None past the end)."""
+            if current_idx + forward_periods < len(close):
+                current_price = close[current_idx]
+                future_price = close[current_idx + forward_periods]
+                return ((future_price - current_price) / current_price) * 100
+            return None
+        
+        # Rank every historical step at once on (steps, sectors) arrays:
+        # higher values = better = rank 1, weighted average rank (lower = better)
+        steps = np.arange(lookback_periods, 0, -1)
+        names, included, factors, tensor = _historical_factor_matrices(
+            sector_data_dict, per_sector_cache, len(benchmark_data), steps, dtype=np.float32
+        )
+        # Momentum factors are the leading HISTORICAL_FACTORS, so rank a zero-copy slice of the tensor
+        weighted_rank = weighted_rank_min(
+            tensor[:len(momentum_factors)],
+            [momentum_weights.get(factor, default) for factor, default in momentum_factors],
+            [False] * len(momentum_factors),
+            sum(momentum_weights.values())
+        )
+        
+        # Scale each step to 1-10 where 10 = best momentum, 1 = worst
+        momentum_scores = scale_weighted_rank(weighted_rank)
+        
         # Loop through historical dates
-        for i in range(lookback_periods, 0, -1):
+        for row, i in enumerate(steps):
             try:
                 analysis_date = benchmark_data.index[-i]
                 
-                # Analyze all sectors at this point in time
-                period_results = []
-                
-                for sect_name, sect_data in sector_data_dict.items():
-                    if sect_name == 'Nifty 50':  # Skip benchmark
-                        continue
-                    
-                    # Get data up to this historical point
-                    subset_data = sect_data.iloc[:-i] if i > 0 else sect_data
-                    bench_subset = benchmark_data.iloc[:-i] if i > 0 else benchmark_data
-                    
-                    if len(subset_data) < 50:  # Need sufficient history
-                        continue
-                    
-                    # Calculate indicators
-                    from indicators import calculate_rsi, calculate_adx, calculate_z_score
-                    
-                    rsi = calculate_rsi(subset_data)
-                    adx, plus_di, minus_di, di_spread = calculate_adx(subset_data)
-                    adx_z = calculate_z_score(adx.dropna())
-                    
-                    # Calculate RS Rating
-                    if bench_subset is not None and len(bench_subset) > 0:
-                        sector_returns = subset_data['Close'].pct_change().dropna()
-                        benchmark_returns = bench_subset['Close'].pct_change().dropna()
-                        
-                        common_index = sector_returns.index.intersection(benchmark_returns.index)
-                        if len(common_index) > 1:
-                            sector_returns_aligned = sector_returns.loc[common_index]
-                            benchmark_returns_aligned = benchmark_returns.loc[common_index]
-                            
-                            sector_cumret = (1 + sector_returns_aligned).prod() - 1
-                            benchmark_cumret = (1 + benchmark_returns_aligned).prod() - 1
-                            
-                            if not pd.isna(sector_cumret) and not pd.isna(benchmark_cumret):
-                                relative_perf = sector_cumret - benchmark_cumret
-                                rs_rating = 5 + (relative_perf * 25)
-                                rs_rating = max(0, min(10, rs_rating))
-                            else:
-                                rs_rating = 5.0
-                        else:
-                            rs_rating = 5.0
-                    else:
-                        rs_rating = 5.0
-                    
-                    period_results.append({
-                        'Sector': sect_name,
-                        'ADX_Z': adx_z if not pd.isna(adx_z) else 0,
-                        'RS_Rating': rs_rating,
-                        'RSI': rsi.iloc[-1] if not rsi.isna().all() else 50,
-                        'DI_Spread': di_spread.iloc[-1] if not di_spread.isna().all() else 0,
-                        'Price': subset_data['Close'].iloc[-1]
-                    })
-                
-                if not period_results or len(period_results) < 2:
+                sector_cols = np.flatnonzero(included[row])
+                if len(sector_cols) < 2:
                     continue
                 
-                # Create DataFrame and rank
-                period_df = pd.DataFrame(period_results)
-                num_sectors = len(period_df)
-                
-                # Calculate ranks: Higher values = better = rank 1 (ascending=False)
-                period_df['ADX_Z_Rank'] = period_df['ADX_Z'].rank(ascending=False, method='min')
-                period_df['RS_Rating_Rank'] = period_df['RS_Rating'].rank(ascending=False, method='min')
-                period_df['RSI_Rank'] = period_df['RSI'].rank(ascending=False, method='min')
-                period_df['DI_Spread_Rank'] = period_df['DI_Spread'].rank(ascending=False, method='min')
-                
-                # Calculate weighted average rank (lower = better)
-                total_weight = sum(momentum_weights.values())
-                period_df['Weighted_Avg_Rank'] = (
-                    (period_df['ADX_Z_Rank'] * momentum_weights.get('ADX_Z', 20) / total_weight) +
-                    (period_df['RS_Rating_Rank'] * momentum_weights.get('RS_Rating', 40) / total_weight) +
-                    (period_df['RSI_Rank'] * momentum_weights.get('RSI', 30) / total_weight) +
-                    (period_df['DI_Spread_Rank'] * momentum_weights.get('DI_Spread', 10) / total_weight)
-                )
-                
-                # Scale to 1-10 where 10 = best momentum, 1 = worst
-                if num_sectors > 1:
-                    min_rank = period_df['Weighted_Avg_Rank'].min()
-                    max_rank = period_df['Weighted_Avg_Rank'].max()
-                    if max_rank > min_rank:
-                        period_df['Momentum_Score'] = 10 - ((period_df['Weighted_Avg_Rank'] - min_rank) / (max_rank - min_rank)) * 9
-                    else:
-                        period_df['Momentum_Score'] = 5.0
-                else:
-                    period_df['Momentum_Score'] = 5.0
-                
                 # Get top 2 by momentum score (higher score = better)
-                period_df = period_df.sort_values('Momentum_Score', ascending=False)
-                top_2 = period_df.head(2)
-                
-                if len(top_2) < 2:
-                    continue
+                top_2 = sector_cols[top_k_desc(momentum_scores[row, sector_cols], 2)]
                 
                 # Calculate forward returns (7-day and 14-day)
-                rank_1_sector = top_2.iloc[0]['Sector']
-                rank_2_sector = top_2.iloc[1]['Sector']
+                rank_1_sector = names[top_2[0]]
+                rank_2_sector = names[top_2[1]]
                 
                 # Get forward price data
-                rank_1_data = sector_data_dict[rank_1_sector]
-                rank_2_data = sector_data_dict[rank_2_sector]
+                rank_1_data = closes[rank_1_sector]
+                rank_2_data = closes[rank_2_sector]
                 
                 # Find current price index
                 current_idx = len(rank_1_data) - i
                 
-                # Calculate returns
-                def calc_forward_return(data, current_idx, forward_periods):
-                    if current_idx + forward_periods < len(data):
-                        current_price = data.iloc[current_idx]['Close']
-                        future_price = data.iloc[current_idx + forward_periods]['Close']
-                        return ((future_price - current_price) / current_price) * 100
-                    return None
-                
                 rank_1_7day = calc_forward_return(rank_1_data, current_idx, 7)
                 rank_1_14day = calc_forward_return(rank_1_data, current_idx, 14)
                 rank_2_7day = calc_forward_return(rank_2_data, current_idx, 7)
                 rank_2_14day = calc_forward_return(rank_2_data, current_idx, 14)
                 
                 # Get symbols
-                from config import SECTORS, SECTOR_ETFS
                 data_source = SECTOR_ETFS if use_etf else SECTORS
                 
                 historical_results.append({
                     'Date': analysis_date.strftime('%Y-%m-%d'),
                     'Rank_1_Sector': rank_1_sector,
                     'Rank_1_Symbol': data_source.get(rank_1_sector, 'N/A'),
-                    'Rank_1_7Day_Return_%': round(rank_1_7day, 2) if rank_1_7day is not None else 'N/A',
-                    'Rank_1_14Day_Return_%': round(rank_1_14day, 2) if rank_1_14day is not None else 'N/A',
+                    'Rank_1_7Day_Return_%': round(rank_1_7day, 2) if rank_1_7day is not None else np.nan,
+                    'Rank_1_14Day_Return_%': round(rank_1_14day, 2) if rank_1_14day is not None else np.nan,
                     'Rank_2_Sector': rank_2_sector,
                     'Rank_2_Symbol': data_source.get(rank_2_sector, 'N/A'),
-                    'Rank_2_7Day_Return_%': round(rank_2_7day, 2) if rank_2_7day is not None else 'N/A',
-                    'Rank_2_14Day_Return_%': round(rank_2_14day, 2) if rank_2_14day is not None else 'N/A'
+                    'Rank_2_7Day_Return_%': round(rank_2_7day, 2) if rank_2_7day is not None else np.nan,
+                    'Rank_2_14Day_Return_%': round(rank_2_14day, 2) if rank_2_14day is not None else np.nan
                 })
                 
             except Exception as e:
@@ -1003,6 +1541,7 @@ def calculate_historical_momentum_performance(sector_data_dict, benchmark_data,
         return None
 
 
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs={pd.DataFrame: _frame_fingerprint})
 def calculate_historical_reversal_performance(sector_data_dict, benchmark_data, reversal_weights, reversal_thresholds, use_etf, interval='1d', months=6):
     """
     Calculate historical top 2 reversal candidates over the past N months.
@@ -1021,9 +1560,6 @@ def calculate_historical_reversal_performance(sector_data_dict, benchmark_data,
         DataFrame with date and top 2 reversal candidates
     """
     try:
-        from datetime import timedelta
-        import pandas as pd
-        
         # Determine lookback period based on interval
         if interval == '1wk':
             # For weekly, approximate 6 months = 26 weeks
@@ -1040,126 +1576,55 @@ def calculate_historical_reversal_performance(sector_data_dict, benchmark_data,
         
         historical_results = []
         
+        # Indicators are computed once per sector over the full history; each step
+        # reads them at the last bar of the data available at that point
+        per_sector_cache = _precompute_trend_indicators(sector_data_dict, benchmark_data)
+        
+        # Check eligibility and rank eligible sectors for every historical step at once
+        steps = np.arange(lookback_periods, 0, -1)
+        names, included, factors, _ = _historical_factor_matrices(
+            sector_data_dict, per_sector_cache, len(benchmark_data), steps, dtype=np.float32
+        )
+        eligible = (included &
+                    (factors['RSI'] < reversal_thresholds.get('RSI', 40)) &
+                    (factors['ADX_Z'] < reversal_thresholds.get('ADX_Z', -0.5)))
+        
+        reversal_scores = weighted_rank_min(
+            [np.where(eligible, factors[factor], np.nan) for factor, default, ascending in REVERSAL_RANK_FACTORS],
+            [reversal_weights.get(factor, default) for factor, default, ascending in REVERSAL_RANK_FACTORS],
+            [ascending for factor, default, ascending in REVERSAL_RANK_FACTORS],
+            sum(reversal_weights.values()),
+            scale=100
+        )
+        
+        # Top 2 reversals per step (first-listed sector wins ties; NaN scores are not picked)
+        top_2 = np.argsort(-reversal_scores, axis=1, kind='stable')[:, :2]
+        top_2_valid = ~np.isnan(np.take_along_axis(reversal_scores, top_2, axis=1))
+        
         # Loop through historical dates
-        for i in range(lookback_periods, 0, -1):
+        for row, i in enumerate(steps):
             try:
                 analysis_date = benchmark_data.index[-i]
+                top_2_reversals = top_2[row][top_2_valid[row]]
                 
-                # Analyze all sectors at this point in time
-                period_results = []
-                
-                for sect_name, sect_data in sector_data_dict.items():
-                    if sect_name == 'Nifty 50':  # Skip benchmark
-                        continue
-                    
-                    # Get data up to this historical point
-                    subset_data = sect_data.iloc[:-i] if i > 0 else sect_data
-                    bench_subset = benchmark_data.iloc[:-i] if i > 0 else benchmark_data
-                    
-                    if len(subset_data) < 50:  # Need sufficient history
-                        continue
-                    
-                    # Calculate indicators
-                    from indicators import calculate_rsi, calculate_adx, calculate_z_score, calculate_mansfield_rs
-                    
-                    rsi = calculate_rsi(subset_data)
-                    adx, plus_di, minus_di, di_spread = calculate_adx(subset_data)
-                    adx_z = calculate_z_score(adx.dropna())
-                    cmf = calculate_cmf(subset_data)
-                    mansfield_rs = calculate_mansfield_rs(subset_data, bench_subset)
-                    
-                    # Calculate RS Rating
-                    if bench_subset is not None and len(bench_subset) > 0:
-                        sector_returns = subset_data['Close'].pct_change().dropna()
-                        benchmark_returns = bench_subset['Close'].pct_change().dropna()
-                        
-                        common_index = sector_returns.index.intersection(benchmark_returns.index)
-                        if len(common_index) > 1:
-                            sector_returns_aligned = sector_returns.loc[common_index]
-                            benchmark_returns_aligned = benchmark_returns.loc[common_index]
-                            
-                            sector_cumret = (1 + sector_returns_aligned).prod() - 1
-                            benchmark_cumret = (1 + benchmark_returns_aligned).prod() - 1
-                            
-                            if not pd.isna(sector_cumret) and not pd.isna(benchmark_cumret):
-                                relative_perf = sector_cumret - benchmark_cumret
-                                rs_rating = 5 + (relative_perf * 25)
-                                rs_rating = max(0, min(10, rs_rating))
-                            else:
-                                rs_rating = 5.0
-                        else:
-                            rs_rating = 5.0
-                    else:
-                        rs_rating = 5.0
+                if len(top_2_reversals) > 0:
+                    # Get symbols
+                    data_source = SECTOR_ETFS if use_etf else SECTORS
                     
-                    # Get final values
-                    rsi_val = rsi.iloc[-1] if not rsi.isna().all() else 50
-                    adx_z_val = adx_z if not pd.isna(adx_z) else 0
-                    cmf_val = cmf.iloc[-1] if not cmf.isna().all() else 0
+                    rank_1_sector = names[top_2_reversals[0]] if len(top_2_reversals) >= 1 else 'N/A'
+                    rank_1_symbol = data_source.get(rank_1_sector, 'N/A') if rank_1_sector != 'N/A' else 'N/A'
                     
-                    # Check reversal eligibility
-                    meets_rsi = rsi_val < reversal_thresholds.get('RSI', 40)
-                    meets_adx_z = adx_z_val < reversal_thresholds.get('ADX_Z', -0.5)
+                    rank_2_sector = names[top_2_reversals[1]] if len(top_2_reversals) >= 2 else 'N/A'
+                    rank_2_symbol = data_source.get(rank_2_sector, 'N/A') if rank_2_sector != 'N/A' else 'N/A'
                     
-                    period_results.append({
-                        'Sector': sect_name,
-                        'RSI': rsi_val,
-                        'ADX_Z': adx_z_val,
-                        'CMF': cmf_val,
-                        'RS_Rating': rs_rating,
-                        'Mansfield_RS': mansfield_rs,
-                        'Meets_RSI': meets_rsi,
-                        'Meets_ADX_Z': meets_adx_z,
-                        'Eligible': meets_rsi and meets_adx_z
+                    historical_results.append({
+                        'Date': analysis_date.strftime('%Y-%m-%d'),
+                        'Rank_1_Sector': rank_1_sector,
+                        'Rank_1_Symbol': rank_1_symbol,
+                        'Rank_2_Sector': rank_2_sector,
+                        'Rank_2_Symbol': rank_2_symbol
                     })
-                
-                if not period_results:
-                    continue
-                
-                # Create DataFrame
-                period_df = pd.DataFrame(period_results)
-                
-                # Filter to eligible reversals only
-                eligible_reversals = period_df[period_df['Eligible']].copy()
-                
-                if len(eligible_reversals) > 0:
-                    # Calculate ranks within eligible sectors
-                    eligible_reversals['RS_Rating_Rank'] = eligible_reversals['RS_Rating'].rank(ascending=True, method='min')
-                    eligible_reversals['CMF_Rank'] = eligible_reversals['CMF'].rank(ascending=False, method='min')
-                    eligible_reversals['RSI_Rank'] = eligible_reversals['RSI'].rank(ascending=True, method='min')
-                    eligible_reversals['ADX_Z_Rank'] = eligible_reversals['ADX_Z'].rank(ascending=True, method='min')
-                    
-                    # Calculate reversal score with percentage weights
-                    total_weight = sum(reversal_weights.values())
-                    eligible_reversals['Reversal_Score'] = (
-                        (eligible_reversals['RS_Rating_Rank'] * reversal_weights.get('RS_Rating', 40) / total_weight * 100) +
-                        (eligible_reversals['CMF_Rank'] * reversal_weights.get('CMF', 40) / total_weight * 100) +
-                        (eligible_reversals['RSI_Rank'] * reversal_weights.get('RSI', 10) / total_weight * 100) +
-                        (eligible_reversals['ADX_Z_Rank'] * reversal_weights.get('ADX_Z', 10) / total_weight * 100)
-                    )
-                    
-                    # Get top 2 reversals
-                    top_2_reversals = eligible_reversals.nlargest(2, 'Reversal_Score')
-                    
-                    if len(top_2_reversals) > 0:
-                        # Get symbols
-                        from config import SECTORS, SECTOR_ETFS
-                        data_source = SECTOR_ETFS if use_etf else SECTORS
-                        
-                        rank_1_sector = top_2_reversals.iloc[0]['Sector'] if len(top_2_reversals) >= 1 else 'N/A'
-                        rank_1_symbol = data_source.get(rank_1_sector, 'N/A') if rank_1_sector != 'N/A' else 'N/A'
-                        
-                        rank_2_sector = top_2_reversals.iloc[1]['Sector'] if len(top_2_reversals) >= 2 else 'N/A'
-                        rank_2_symbol = data_source.get(rank_2_sector, 'N/A') if rank_2_sector != 'N/A' else 'N/A'
-                        
-                        historical_results.append({
-                            'Date': analysis_date.strftime('%Y-%m-%d'),
-                            'Rank_1_Sector': rank_1_sector,
-                            'Rank_1_Symbol': rank_1_symbol,
-                            'Rank_2_Sector': rank_2_sector,
-                            'Rank_2_Symbol': rank_2_symbol
-                        })
-                
+            
             except Exception as e:
                 continue
         
@@ -1173,190 +1638,19 @@ def calculate_historical_reversal_performance(sector_data_dict, benchmark_data,
         return None
 
 
-def display_momentum_tab(df, sector_data_dict, benchmark_data, enable_color_coding=True):
-    """Display momentum ranking tab with improved formatting."""
-    st.markdown("### 📈 Momentum Ranking (Sorted by Momentum Score)")
-    st.markdown("---")
-    
-    # Store original df for reference in trend analysis
-    original_df = df.copy()
-    
-    # Select columns for display
-    momentum_df = df[['Sector', 'Symbol', 'Price', 'Change_%', 'Momentum_Score', 'Mansfield_RS', 'RS_Rating', 
-                      'ADX', 'ADX_Z', 'RSI', 'DI_Spread', 'CMF']].copy()
-    
-    # SORT FIRST by Momentum_Score (before formatting to strings)
-    momentum_df = momentum_df.sort_values('Momentum_Score', ascending=False)
-    
-    # Format decimal places AFTER sorting
-    for col in ['Momentum_Score', 'Mansfield_RS', 'RS_Rating', 'ADX', 'ADX_Z', 'RSI', 'DI_Spread']:
-        momentum_df[col] = momentum_df[col].apply(lambda x: format_value(x, 1))
-    momentum_df['CMF'] = momentum_df['CMF'].apply(lambda x: format_value(x, 2))
-    momentum_df['Price'] = momentum_df['Price'].apply(lambda x: format_value(x, 2))
-    momentum_df['Change_%'] = momentum_df['Change_%'].apply(lambda x: f"{format_value(x, 2)}%")
-    
-    # Apply color styling if enabled
-    if enable_color_coding:
-        def style_row(row):
-            result = [''] * len(row)
-            
-            # Color Mansfield RS (green for positive, red for negative)
-            if 'Mansfield_RS' in row.index:
-                idx = list(row.index).index('Mansfield_RS')
-                try:
-                    if float(row['Mansfield_RS']) > 0:
-                        result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                    else:
-                        result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-                except:
-                    pass
-            
-            # Color CMF (green for positive, red for negative)
-            if 'CMF' in row.index:
-                idx = list(row.index).index('CMF')
-                try:
-                    if float(row['CMF']) > 0:
-                        result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                    else:
-                        result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-                except:
-                    pass
-            
-            # Color RSI (green for >65, red for <35, gray for neutral)
-            if 'RSI' in row.index:
-                idx = list(row.index).index('RSI')
-                try:
-                    rsi_val = float(row['RSI'])
-                    if rsi_val > 65:
-                        result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                    elif rsi_val < 35:
-                        result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-                except:
-                    pass
-            
-            # Color Momentum_Score (top 3 green, bottom 3 red)
-            if 'Momentum_Score' in row.index:
-                idx = list(row.index).index('Momentum_Score')
-                try:
-                    scores = pd.to_numeric(momentum_df['Momentum_Score'], errors='coerce')
-                    top_3_threshold = scores.nlargest(3).min()
-                    bottom_3_threshold = scores.nsmallest(3).max()
-                    current_score = float(row['Momentum_Score'])
-                    
-                    if current_score >= top_3_threshold:
-                        result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                    elif current_score <= bottom_3_threshold:
-                        result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-                except:
-                    pass
-            
-            return result
-        
-        momentum_df_styled = momentum_df.style.apply(style_row, axis=1)
-    else:
-        momentum_df_styled = momentum_df.style
-    
-    # Display the dataframe with sorting enabled (already sorted by Momentum_Score descending)
-    st.dataframe(
-        momentum_df_styled,
-        use_container_width=True,
-        height=500,
-        hide_index=True,
-        column_config={
-            "Sector": st.column_config.TextColumn(
-                "Sector",
-                help="Market sector name"
-            ),
-            "Symbol": st.column_config.TextColumn(
-                "Symbol",
-                help="Index or ETF ticker symbol"
-            ),
-            "Price": st.column_config.NumberColumn(
-                "Price",
-                help="Current closing price",
-                format="%.2f"
-            ),
-            "Change_%": st.column_config.TextColumn(
-                "Change %",
-                help="Percentage change vs previous close"
-            ),
-            "Momentum_Score": st.column_config.NumberColumn(
-                "Momentum Score",
-                help="Ranking-based composite score: (ADX_Z Rank × 20%) + (RS_Rating Rank × 40%) + (RSI Rank × 30%) + (DI_Spread Rank × 10%). Higher is better.",
-                format="%.1f"
-            ),
-            "Mansfield_RS": st.column_config.NumberColumn(
-                "Mansfield RS",
-                help="Relative strength vs Nifty 50 benchmark. Positive = outperforming, Negative = underperforming.",
-                format="%.1f"
-            ),
-            "RS_Rating": st.column_config.NumberColumn(
-                "RS Rating",
-                help="Relative strength rating (0-10 scale) based on weighted average performance vs Nifty 50",
-                format="%.1f"
-            ),
-            "ADX": st.column_config.NumberColumn(
-                "ADX",
-                help="Average Directional Index - measures trend strength. >25 = strong trend, <20 = weak/no trend",
-                format="%.1f"
-            ),
-            "ADX_Z": st.column_config.NumberColumn(
-                "ADX Z-Score",
-                help="ADX Z-Score - normalized ADX relative to other sectors. Higher values indicate stronger relative trend.",
-                format="%.1f"
-            ),
-            "RSI": st.column_config.NumberColumn(
-                "RSI",
-                help="Relative Strength Index (14-period). >70 = overbought, <30 = oversold, 40-60 = neutral",
-                format="%.1f"
-            ),
-            "DI_Spread": st.column_config.NumberColumn(
-                "DI Spread",
-                help="Directional Indicator Spread (+DI minus -DI). Positive = bullish, Negative = bearish",
-                format="%.1f"
-            ),
-            "CMF": st.column_config.NumberColumn(
-                "CMF",
-                help="Chaikin Money Flow (20-period). >0 = accumulation, <0 = distribution, >0.1 = strong buying",
-                format="%.2f"
-            )
-        }
-    )
-    
-    # Key metrics summary with CMF sum total (2x2 matrix for better space usage)
-    metric_col1, metric_col2 = st.columns(2)
-    momentum_df_numeric = df[['Sector', 'Momentum_Score', 'Mansfield_RS', 'CMF']].copy()
-    
-    # Calculate super bullish threshold (top 30% of sectors)
-    momentum_threshold = momentum_df_numeric['Momentum_Score'].quantile(MOMENTUM_SCORE_PERCENTILE_THRESHOLD / 100.0)
-    
-    with metric_col1:
-        super_bullish = len(momentum_df_numeric[momentum_df_numeric['Momentum_Score'] >= momentum_threshold])
-        st.metric("Top Momentum Sectors", super_bullish, 
-                  help=f"Top {100-MOMENTUM_SCORE_PERCENTILE_THRESHOLD}% by Momentum Score (>= {momentum_threshold:.1f})")
-    with metric_col2:
-        positive_mansfield = len(momentum_df_numeric[momentum_df_numeric['Mansfield_RS'] > 0])
-        st.metric("Positive Mansfield RS", positive_mansfield,
-                  help="Outperforming vs Nifty 50")
-    
-    metric_col3, metric_col4 = st.columns(2)
-    with metric_col3:
-        avg_momentum = momentum_df_numeric['Momentum_Score'].mean()
-        st.metric("Average Momentum", f"{avg_momentum:.1f}")
-    with metric_col4:
-        # CMF Sum Total - indicates overall sector rotation direction
-        cmf_sum = momentum_df_numeric['CMF'].sum()
-        cmf_delta = "↑ Net Inflow" if cmf_sum > 0 else "↓ Net Outflow"
-        st.metric("CMF Sum (Sector Rotation)", f"{cmf_sum:.2f}", delta=cmf_delta,
-                  help="Sum of all sector CMF values. Positive = net money flowing into sectors (bullish rotation), Negative = net money flowing out (bearish rotation). Value near 1 indicates clear sector rotation.")
-    
+@st.fragment
+def _momentum_trend_section(df, sector_data_dict, benchmark_data):
+    """
+    Momentum trend view for one sector (T-7 to T).
+    A fragment, so picking another sector reruns only this section, not the whole page.
+    """
     # Sector Trend Analysis
     st.markdown("---")
     st.markdown("### 📊 Sector Trend Analysis (T-7 to T)")
     
     # Find #1 ranked sector and set as default
     # The #1 sector is the one with the highest Momentum_Score
-    sectors_list = sorted(df['Sector'].tolist())
+    sectors_list = _sorted_sectors(df)
     rank_1_sector = None
     rank_1_idx = 0
     
@@ -1379,20 +1673,21 @@ def display_momentum_tab(df, sector_data_dict, benchmark_data, enable_color_codi
             st.markdown(f"#### Trend for **{selected_sector}**")
             
             # Display current rank and momentum score
-            # Find the row that starts with 'T (' (the current period)
-            current_row = trend_df[trend_df['Period'].str.startswith('T (')]
+            # Periods are oldest first, so the current period ('T (...)') can only be the last row
+            current_row = trend_df.iloc[[-1]] if trend_df['Period'].iloc[-1].startswith('T (') else trend_df.iloc[0:0]
             if len(current_row) > 0:
                 col_a, col_b = st.columns(2)
                 with col_a:
-                    st.metric("Current Momentum Score", current_row['Momentum_Score'].iloc[0])
+                    st.metric("Current Momentum Score", f"{current_row['Momentum_Score'].iloc[0]:.1f}")
                 with col_b:
                     st.metric("Current Rank", f"#{int(current_row['Rank'].iloc[0])}")
             
             # Add note about momentum score calculation
             st.caption("✅ **Note:** All Momentum Scores are actual rank-based values calculated by comparing all sectors at each historical period. This shows the true momentum evolution over time.")
             
-            # Transpose for better view with color coding
-            trend_display = trend_df.set_index('Period').T
+            # Transpose for better view with color coding (every metric is numeric, so the
+            # period columns stay float64; Rank is shown without decimals via TREND_DECIMALS)
+            trend_display = trend_df.set_index('Period').T.astype(float)
             
             # Apply color styling to trend data
             def style_trend(val):
@@ -1461,17 +1756,17 @@ def display_momentum_tab(df, sector_data_dict, benchmark_data, enable_color_codi
                 st.markdown("**Blue (Rank Row)**")
                 st.markdown("- Shows sector's rank among all sectors at each historical period")
             
-            trend_styled = trend_display.style.applymap(style_trend)
+            trend_styled = _format_trend_table(trend_display.style.applymap(style_trend),
+                                               trend_display.index.to_series(), list(trend_display.columns))
             st.dataframe(trend_styled, use_container_width=True, height=400)
             
             # Show momentum trend visualization
-            if len(trend_df) > 1:
+            if len(trend_df) > 1 and PLOTLY_AVAILABLE:
                 st.markdown("##### Momentum Score Trend")
                 try:
-                    momentum_scores = [float(x) for x in trend_df['Momentum_Score'].tolist()]
+                    momentum_scores = trend_df['Momentum_Score'].tolist()
                     periods = trend_df['Period'].tolist()
                     
-                    import plotly.graph_objects as go
                     fig = go.Figure()
                     fig.add_trace(go.Scatter(
                         x=periods,
@@ -1493,303 +1788,162 @@ def display_momentum_tab(df, sector_data_dict, benchmark_data, enable_color_codi
                     pass  # Skip chart if error
         else:
             st.warning(f"Insufficient data to calculate trend for {selected_sector}")
-    
-    # Historical Top 2 Momentum Performance
+
+
+@_safe_tab("momentum tab")
+def display_momentum_tab(df, sector_data_dict, benchmark_data, enable_color_coding=True):
+    """Display momentum ranking tab with improved formatting."""
+    st.markdown("### 📈 Momentum Ranking (Sorted by Momentum Score)")
     st.markdown("---")
-    st.markdown("### 📊 Historical Top 2 Momentum Performance (6 Months)")
-    st.markdown("See how the top 2 momentum-ranked sectors performed over the past 6 months with forward returns.")
     
-    st.info("💡 **Note:** Historical rankings are recalculated point-in-time using data available on each date. "
-            "Live analysis may differ slightly due to data updates. Use the '📅 Historical Rankings' tab for recent T-7 to T comparison.")
+    # One date stamp for every download file name in this tab
+    today = datetime.now().strftime('%Y%m%d')
     
-    if st.button("🔍 Generate Historical Performance Report"):
-        with st.spinner("Analyzing 6 months of historical data..."):
-            # Get interval from session state or default
-            interval_map = {'Daily': '1d', 'Weekly': '1wk', 'Hourly': '1h'}
-            # Try to get momentum weights from somewhere, or use defaults
-            from config import DEFAULT_MOMENTUM_WEIGHTS
-            
-            # Determine if using ETF from the data
-            use_etf = 'Symbol' in df.columns and any('.NS' not in str(s) for s in df['Symbol'].values)
-            
-            # Get current interval from the analysis
-            current_interval = '1d'  # Default, will be passed from main
-            
-            historical_df = calculate_historical_momentum_performance(
-                sector_data_dict, 
-                benchmark_data, 
-                DEFAULT_MOMENTUM_WEIGHTS,
-                use_etf,
-                current_interval,
-                months=6
-            )
-        
-        if historical_df is not None and not historical_df.empty:
-            st.success(f"✅ Generated report for {len(historical_df)} historical dates")
-            
-            # Display summary statistics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            # Calculate average returns (excluding N/A values)
-            def calc_avg(column):
-                vals = [v for v in historical_df[column].values if v != 'N/A']
-                return sum(vals) / len(vals) if vals else 0
-            
-            with col1:
-                avg_r1_7d = calc_avg('Rank_1_7Day_Return_%')
-                st.metric("Rank 1 Avg 7-Day Return", f"{avg_r1_7d:.2f}%")
-            with col2:
-                avg_r1_14d = calc_avg('Rank_1_14Day_Return_%')
-                st.metric("Rank 1 Avg 14-Day Return", f"{avg_r1_14d:.2f}%")
-            with col3:
-                avg_r2_7d = calc_avg('Rank_2_7Day_Return_%')
-                st.metric("Rank 2 Avg 7-Day Return", f"{avg_r2_7d:.2f}%")
-            with col4:
-                avg_r2_14d = calc_avg('Rank_2_14Day_Return_%')
-                st.metric("Rank 2 Avg 14-Day Return", f"{avg_r2_14d:.2f}%")
-            
-            # Display the dataframe
-            st.dataframe(historical_df, use_container_width=True, height=400)
-            
-            # Download button
-            csv_historical = historical_df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download Historical Performance Report",
-                data=csv_historical,
-                file_name=f"historical_momentum_performance_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
-            )
-        else:
-            st.warning("⚠️ Unable to generate historical report. Insufficient data available.")
+    # Store original df for reference in trend analysis
+    original_df = df.copy()
     
-    # Download button
-    csv = momentum_df.to_csv(index=False)
-    st.download_button(
-        label="📥 Download Momentum Data",
-        data=csv,
-        file_name=f"momentum_ranking_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv"
+    # Select columns for display
+    momentum_df = df[['Sector', 'Symbol', 'Price', 'Change_%', 'Momentum_Score', 'Mansfield_RS', 'RS_Rating', 
+                      'ADX', 'ADX_Z', 'RSI', 'DI_Spread', 'CMF']].copy()
+    
+    # Sort by Momentum_Score; columns stay numeric and decimals are applied at render time
+    momentum_df = momentum_df.sort_values('Momentum_Score', ascending=False)
+    
+    # Apply color styling if enabled
+    if enable_color_coding:
+        # All colour rules in one table-wide pass
+        momentum_df_styled = momentum_df.style.apply(table_styles, axis=None, rules=_MOMENTUM_STYLE_RULES)
+    else:
+        momentum_df_styled = momentum_df.style
+    
+    # Display the dataframe with sorting enabled (already sorted by Momentum_Score descending)
+    st.dataframe(
+        _format_table(momentum_df_styled),
+        use_container_width=True,
+        height=500,
+        hide_index=True,
+        column_config=_MOMENTUM_COLUMN_CONFIG
     )
-
-
-def display_reversal_tab(df, sector_data_dict, benchmark_data, reversal_weights, reversal_thresholds, enable_color_coding=True):
-    """Display reversal candidates tab with scoring and trend analysis."""
-    st.markdown("### 🔄 Reversal Candidates (Bottom Fishing Opportunities)")
-    st.markdown("---")
     
-    # Select columns: include Price and Change % now
-    reversal_df = df[['Sector', 'Price', 'Change_%', 'Reversal_Status', 'Reversal_Score', 'RS_Rating',
-                      'CMF', 'RSI', 'ADX_Z', 'Mansfield_RS', 'Momentum_Score']].copy()
+    # Key metrics summary with CMF sum total (2x2 matrix for better space usage)
+    metric_col1, metric_col2 = st.columns(2)
+    momentum_df_numeric = df[['Sector', 'Momentum_Score', 'Mansfield_RS', 'CMF']].copy()
     
-    # Filter FIRST (before formatting)
-    reversal_candidates = reversal_df[reversal_df['Reversal_Status'] != 'No'].copy()
+    # Calculate super bullish threshold (top 30% of sectors)
+    momentum_threshold = momentum_df_numeric['Momentum_Score'].quantile(MOMENTUM_SCORE_PERCENTILE_THRESHOLD / 100.0)
     
-    if not reversal_candidates.empty:
-        # SORT FIRST by Reversal_Score (before formatting to strings)
-        reversal_candidates = reversal_candidates.sort_values('Reversal_Score', ascending=False)
-        
-        # Format decimal places AFTER sorting
-        for col in ['Reversal_Score', 'RS_Rating', 'RSI', 'ADX_Z', 'Mansfield_RS', 'Momentum_Score']:
-            reversal_candidates[col] = reversal_candidates[col].apply(lambda x: format_value(x, 1))
-        reversal_candidates['CMF'] = reversal_candidates['CMF'].apply(lambda x: format_value(x, 2))
-        reversal_candidates['Price'] = reversal_candidates['Price'].apply(lambda x: format_value(x, 2))
-        reversal_candidates['Change_%'] = reversal_candidates['Change_%'].apply(lambda x: f"{format_value(x, 2)}%")
-        
-        # Apply color styling if enabled
-        if enable_color_coding:
-            def style_row(row):
-                result = [''] * len(row)
-                
-                # Color Reversal_Status (green for BUY_DIV, yellow for Watch)
-                if 'Reversal_Status' in row.index:
-                    idx = list(row.index).index('Reversal_Status')
-                    if row['Reversal_Status'] == 'BUY_DIV':
-                        result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                    elif row['Reversal_Status'] == 'Watch':
-                        result[idx] = 'background-color: #F39C12; color: #fff; font-weight: bold'
-                
-                # Color Mansfield_RS (green for positive, red for negative)
-                if 'Mansfield_RS' in row.index:
-                    idx = list(row.index).index('Mansfield_RS')
-                    try:
-                        if float(row['Mansfield_RS']) > 0:
-                            result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                        else:
-                            result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-                    except:
-                        pass
-                
-                # Color CMF (green for positive, red for negative)
-                if 'CMF' in row.index:
-                    idx = list(row.index).index('CMF')
-                    try:
-                        if float(row['CMF']) > 0:
-                            result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                        else:
-                            result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-                    except:
-                        pass
-                
-                # Color RSI (green for <35, yellow for neutral, red for >65)
-                if 'RSI' in row.index:
-                    idx = list(row.index).index('RSI')
-                    try:
-                        rsi_val = float(row['RSI'])
-                        if rsi_val < 35:
-                            result[idx] = 'background-color: #27AE60; color: #fff; font-weight: bold'
-                        elif rsi_val > 65:
-                            result[idx] = 'background-color: #E74C3C; color: #fff; font-weight: bold'
-                    except:
-                        pass
-                
-                return result
-            
-            reversal_candidates_styled = reversal_candidates.style.apply(style_row, axis=1)
-        else:
-            reversal_candidates_styled = reversal_candidates.style
-        
-        st.dataframe(
-            reversal_candidates_styled,
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "Sector": st.column_config.TextColumn(
-                    "Sector",
-                    help="Market sector name"
-                ),
-                "Reversal_Status": st.column_config.TextColumn(
-                    "Status",
-                    help="BUY_DIV = Strong buy divergence signal, Watch = Potential reversal zone"
-                ),
-                "Reversal_Score": st.column_config.NumberColumn(
-                    "Reversal Score",
-                    help="Rank-based score for reversal potential. Higher rank = stronger reversal candidate based on RS Rating, CMF, RSI, and ADX Z rankings among eligible sectors.",
-                    format="%.1f"
-                ),
-                "RS_Rating": st.column_config.NumberColumn(
-                    "RS Rating",
-                    help="Relative strength rating (0-10 scale). Lower values indicate underperformance with recovery potential",
-                    format="%.1f"
-                ),
-                "CMF": st.column_config.NumberColumn(
-                    "CMF",
-                    help="Chaikin Money Flow. Positive values indicate accumulation/buying pressure",
-                    format="%.2f"
-                ),
-                "RSI": st.column_config.NumberColumn(
-                    "RSI",
-                    help="Relative Strength Index. Lower values indicate oversold conditions",
-                    format="%.1f"
-                ),
-                "ADX_Z": st.column_config.NumberColumn(
-                    "ADX Z-Score",
-                    help="Negative values indicate weak trend, favorable for reversals",
-                    format="%.1f"
-                ),
-                "Mansfield_RS": st.column_config.NumberColumn(
-                    "Mansfield RS",
-                    help="Negative values indicate underperformance with recovery potential",
-                    format="%.1f"
-                ),
-                "Momentum_Score": st.column_config.NumberColumn(
-                    "Momentum Score",
-                    help="Current momentum score for reference",
-                    format="%.1f"
-                )
-            }
-        )
-        
-        # Summary metrics
-        col1, col2 = st.columns(2)
-        with col1:
-            buy_div_count = len(reversal_candidates[reversal_candidates['Reversal_Status'] == 'BUY_DIV'])
-            st.metric("BUY_DIV Signals", buy_div_count, help="Strong reversal signals")
-        with col2:
-            watch_count = len(reversal_candidates[reversal_candidates['Reversal_Status'] == 'Watch'])
-            st.metric("Watch List", watch_count, help="Potential reversals")
-        
-        # Download button
-        csv = reversal_candidates.to_csv(index=False)
-        st.download_button(
-            label="📥 Download Reversal Candidates",
-            data=csv,
-            file_name=f"reversal_candidates_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv"
-        )
-    else:
-        st.info("ℹ️ No reversal candidates found at this time.")
+    with metric_col1:
+        super_bullish = len(momentum_df_numeric[momentum_df_numeric['Momentum_Score'] >= momentum_threshold])
+        st.metric("Top Momentum Sectors", super_bullish, 
+                  help=f"Top {100-MOMENTUM_SCORE_PERCENTILE_THRESHOLD}% by Momentum Score (>= {momentum_threshold:.1f})")
+    with metric_col2:
+        positive_mansfield = len(momentum_df_numeric[momentum_df_numeric['Mansfield_RS'] > 0])
+        st.metric("Positive Mansfield RS", positive_mansfield,
+                  help="Outperforming vs Nifty 50")
     
-    # Historical Top 2 Reversal Performance
+    metric_col3, metric_col4 = st.columns(2)
+    with metric_col3:
+        avg_momentum = momentum_df_numeric['Momentum_Score'].mean()
+        st.metric("Average Momentum", f"{avg_momentum:.1f}")
+    with metric_col4:
+        # CMF Sum Total - indicates overall sector rotation direction
+        cmf_sum = momentum_df_numeric['CMF'].sum()
+        cmf_delta = "↑ Net Inflow" if cmf_sum > 0 else "↓ Net Outflow"
+        st.metric("CMF Sum (Sector Rotation)", f"{cmf_sum:.2f}", delta=cmf_delta,
+                  help="Sum of all sector CMF values. Positive = net money flowing into sectors (bullish rotation), Negative = net money flowing out (bearish rotation). Value near 1 indicates clear sector rotation.")
+    
+    _momentum_trend_section(df, sector_data_dict, benchmark_data)
+    
+    # Historical Top 2 Momentum Performance
     st.markdown("---")
-    st.markdown("### 📊 Historical Top 2 Reversal Candidate Performance (6 Months)")
-    st.markdown("See which sectors were identified as top reversal candidates over the past 6 months.")
+    st.markdown("### 📊 Historical Top 2 Momentum Performance (6 Months)")
+    st.markdown("See how the top 2 momentum-ranked sectors performed over the past 6 months with forward returns.")
     
-    if st.button("🔍 Generate Historical Reversal Report", key="btn_historical_reversal"):
-        with st.spinner("Analyzing 6 months of historical reversal data..."):
+    st.info("💡 **Note:** Historical rankings are recalculated point-in-time using data available on each date. "
+            "Live analysis may differ slightly due to data updates. Use the '📅 Historical Rankings' tab for recent T-7 to T comparison.")
+    
+    if st.button("🔍 Generate Historical Performance Report"):
+        with st.spinner("Analyzing 6 months of historical data..."):
             # Get interval from session state or default
             interval_map = {'Daily': '1d', 'Weekly': '1wk', 'Hourly': '1h'}
-            current_interval = '1d'  # Will be passed from main if available
+            # The sidebar records the data source the current results were fetched with
+            use_etf = st.session_state.get('use_etf_state', False)
             
-            historical_reversal_df = calculate_historical_reversal_performance(
+            # Get current interval from the analysis
+            current_interval = '1d'  # Default, will be passed from main
+            
+            historical_df = calculate_historical_momentum_performance(
                 sector_data_dict, 
                 benchmark_data, 
-                reversal_weights,
-                reversal_thresholds,
-                'Symbol' in df.columns and any('.NS' not in str(s) for s in df['Symbol'].values),
+                DEFAULT_MOMENTUM_WEIGHTS,
+                use_etf,
                 current_interval,
                 months=6
             )
         
-        if historical_reversal_df is not None and not historical_reversal_df.empty:
-            st.success(f"✅ Generated report for {len(historical_reversal_df)} historical dates")
+        if historical_df is not None and not historical_df.empty:
+            st.success(f"✅ Generated report for {len(historical_df)} historical dates")
             
-            # Display the dataframe
-            st.dataframe(
-                historical_reversal_df,
-                use_container_width=True,
-                height=400,
-                hide_index=True,
-                column_config={
-                    "Date": st.column_config.TextColumn(
-                        "Date",
-                        help="Analysis date"
-                    ),
-                    "Rank_1_Sector": st.column_config.TextColumn(
-                        "Top Reversal #1",
-                        help="Strongest reversal candidate on this date"
-                    ),
-                    "Rank_1_Symbol": st.column_config.TextColumn(
-                        "Symbol #1",
-                        help="Ticker symbol for top reversal candidate"
-                    ),
-                    "Rank_2_Sector": st.column_config.TextColumn(
-                        "Top Reversal #2",
-                        help="Second strongest reversal candidate on this date"
-                    ),
-                    "Rank_2_Symbol": st.column_config.TextColumn(
-                        "Symbol #2",
-                        help="Ticker symbol for second reversal candidate"
-                    )
-                }
-            )
+            # Display summary statistics
+            col1, col2, col3, col4 = st.columns(4)
+            
+            # Calculate average returns (missing forward returns are NaN and skipped)
+            def calc_avg(column):
+                avg = historical_df[column].mean()
+                return 0 if pd.isna(avg) else avg
+            
+            with col1:
+                avg_r1_7d = calc_avg('Rank_1_7Day_Return_%')
+                st.metric("Rank 1 Avg 7-Day Return", f"{avg_r1_7d:.2f}%")
+            with col2:
+                avg_r1_14d = calc_avg('Rank_1_14Day_Return_%')
+                st.metric("Rank 1 Avg 14-Day Return", f"{avg_r1_14d:.2f}%")
+            with col3:
+                avg_r2_7d = calc_avg('Rank_2_7Day_Return_%')
+                st.metric("Rank 2 Avg 7-Day Return", f"{avg_r2_7d:.2f}%")
+            with col4:
+                avg_r2_14d = calc_avg('Rank_2_14Day_Return_%')
+                st.metric("Rank 2 Avg 14-Day Return", f"{avg_r2_14d:.2f}%")
+            
+            # Display the dataframe (returns stay numeric; missing forward returns show as N/A)
+            return_columns = [col for col in historical_df.columns if col.endswith('_Return_%')]
+            st.dataframe(historical_df.style.format('{:.2f}', subset=return_columns, na_rep='N/A'),
+                         use_container_width=True, height=400)
             
             # Download button
-            csv_historical_reversal = historical_reversal_df.to_csv(index=False)
+            csv_historical = _csv_bytes(historical_df, na_rep='N/A')
             st.download_button(
-                label="📥 Download Historical Top 2 Reversal Candidates (6 Months)",
-                data=csv_historical_reversal,
-                file_name=f"historical_reversal_candidates_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv",
-                key="download_historical_reversal"
+                label="📥 Download Historical Performance Report",
+                data=csv_historical,
+                file_name=f"historical_momentum_performance_{today}.csv",
+                mime="text/csv"
             )
         else:
-            st.warning("⚠️ Unable to generate historical reversal report. Insufficient data available.")
+            st.warning("⚠️ Unable to generate historical report. Insufficient data available.")
+    
+    # Download button
+    csv = _csv_bytes(momentum_df)
+    st.download_button(
+        label="📥 Download Momentum Data",
+        data=csv,
+        file_name=f"momentum_ranking_{today}.csv",
+        mime="text/csv"
+    )
+
+
+@st.fragment
+def _reversal_trend_section(df, sector_data_dict, benchmark_data, reversal_weights, reversal_thresholds):
+    """
+    Reversal trend view for one sector (T-7 to T).
+    A fragment, so picking another sector reruns only this section, not the whole page.
+    """
+    today = datetime.now().strftime('%Y%m%d')
     
     # Sector Trend Analysis for Reversals
     st.markdown("---")
     st.markdown("### 📊 Sector Trend Analysis - Reversal Metrics (T-7 to T)")
     
-    sectors_list = sorted(df['Sector'].tolist())
+    sectors_list = _sorted_sectors(df)
     selected_reversal_sector = st.selectbox(
         "Select Sector for Reversal Trend Analysis",
         options=sectors_list,
@@ -1815,8 +1969,13 @@ def display_reversal_tab(df, sector_data_dict, benchmark_data, reversal_weights,
                 st.markdown(f"**Historical Reversal Indicators for {selected_reversal_sector}**")
                 st.caption("Shows how reversal metrics evolved over the last 8 periods. Score shown only when sector is eligible (passes RSI and ADX Z filters).")
                 
+                # Status is the only text metric: show it on its own row so the transposed
+                # metric table below keeps float64 period columns instead of object
+                reversal_trend_indexed = reversal_trend_df.set_index('Period')
+                st.dataframe(reversal_trend_indexed[['Status']].T, use_container_width=True)
+                
                 # Transpose the dataframe: periods as columns, parameters as rows
-                reversal_trend_transposed = reversal_trend_df.set_index('Period').T
+                reversal_trend_transposed = reversal_trend_indexed.drop(columns=['Status']).T.astype(float)
                 reversal_trend_transposed.index.name = 'Metric'
                 reversal_trend_transposed = reversal_trend_transposed.reset_index()
                 
@@ -1877,7 +2036,9 @@ def display_reversal_tab(df, sector_data_dict, benchmark_data, reversal_weights,
                     st.markdown("**Blue (Rank Row)**")
                     st.markdown("- Shows sector's reversal rank at each historical period")
                 
-                reversal_styled = reversal_trend_transposed.style.applymap(style_reversal_trend)
+                reversal_styled = _format_trend_table(reversal_trend_transposed.style.applymap(style_reversal_trend),
+                                                      reversal_trend_transposed['Metric'],
+                                                      list(reversal_trend_transposed.columns[1:]))
                 st.dataframe(
                     reversal_styled,
                     use_container_width=True,
@@ -1885,11 +2046,11 @@ def display_reversal_tab(df, sector_data_dict, benchmark_data, reversal_weights,
                 )
                 
                 # Download button for reversal trend
-                reversal_trend_csv = reversal_trend_df.to_csv(index=False)
+                reversal_trend_csv = _csv_bytes(reversal_trend_df.round(TREND_DECIMALS), na_rep='N/A')
                 st.download_button(
                     label=f"📥 Download {selected_reversal_sector} Reversal Trend",
                     data=reversal_trend_csv,
-                    file_name=f"reversal_trend_{selected_reversal_sector}_{datetime.now().strftime('%Y%m%d')}.csv",
+                    file_name=f"reversal_trend_{selected_reversal_sector}_{today}.csv",
                     mime="text/csv",
                     key="download_reversal_trend"
                 )
@@ -1897,48 +2058,122 @@ def display_reversal_tab(df, sector_data_dict, benchmark_data, reversal_weights,
                 st.info(f"ℹ️ Unable to calculate reversal trend for {selected_reversal_sector}. Insufficient data.")
         else:
             st.warning(f"⚠️ No data available for {selected_reversal_sector}")
+
+
+@_safe_tab("reversal tab")
+def display_reversal_tab(df, sector_data_dict, benchmark_data, reversal_weights, reversal_thresholds, enable_color_coding=True):
+    """Display reversal candidates tab with scoring and trend analysis."""
+    st.markdown("### 🔄 Reversal Candidates (Bottom Fishing Opportunities)")
+    st.markdown("---")
     
-    # Show all sectors with reversal scores (regardless of filters)
+    # One date stamp for every download file name in this tab
+    today = datetime.now().strftime('%Y%m%d')
+    
+    # Select and sort once; the candidates table and the All Sectors table are both views of this
+    reversal_df = df[['Sector', 'Price', 'Change_%', 'Reversal_Status', 'Reversal_Score', 'RS_Rating',
+                      'CMF', 'RSI', 'ADX_Z', 'Mansfield_RS', 'Momentum_Score']].sort_values('Reversal_Score', ascending=False)
+    reversal_candidates = reversal_df[reversal_df['Reversal_Status'].to_numpy() != 'No']
+    
+    if not reversal_candidates.empty:
+        # Apply color styling if enabled
+        if enable_color_coding:
+            # All colour rules in one table-wide pass
+            reversal_candidates_styled = reversal_candidates.style.apply(table_styles, axis=None,
+                                                                         rules=_REVERSAL_STYLE_RULES)
+        else:
+            reversal_candidates_styled = reversal_candidates.style
+        
+        # Columns stay numeric; decimals are applied at render time
+        st.dataframe(
+            _format_table(reversal_candidates_styled),
+            use_container_width=True,
+            hide_index=True,
+            column_config=_REVERSAL_COLUMN_CONFIG
+        )
+        
+        # Summary metrics
+        col1, col2 = st.columns(2)
+        with col1:
+            buy_div_count = len(reversal_candidates[reversal_candidates['Reversal_Status'] == 'BUY_DIV'])
+            st.metric("BUY_DIV Signals", buy_div_count, help="Strong reversal signals")
+        with col2:
+            watch_count = len(reversal_candidates[reversal_candidates['Reversal_Status'] == 'Watch'])
+            st.metric("Watch List", watch_count, help="Potential reversals")
+        
+        # Download button
+        csv = _csv_bytes(reversal_candidates.round({**TREND_DECIMALS, 'Price': 2, 'Change_%': 2}))
+        st.download_button(
+            label="📥 Download Reversal Candidates",
+            data=csv,
+            file_name=f"reversal_candidates_{today}.csv",
+            mime="text/csv"
+        )
+    else:
+        st.info("ℹ️ No reversal candidates found at this time.")
+    
+    # Historical Top 2 Reversal Performance
     st.markdown("---")
-    st.markdown("#### All Sectors - Reversal Scores")
-    st.caption("Note: Shows all sectors including those not meeting reversal filters. Reversal_Score = 0 means ineligible.")
-    # Use original df to show ALL sectors
-    all_reversal = df[['Sector', 'Reversal_Status', 'Reversal_Score', 'RS_Rating',
-                       'CMF', 'RSI', 'ADX_Z', 'Mansfield_RS', 'Momentum_Score']].copy()
+    st.markdown("### 📊 Historical Top 2 Reversal Candidate Performance (6 Months)")
+    st.markdown("See which sectors were identified as top reversal candidates over the past 6 months.")
     
-    # Format decimal places
-    for col in ['Reversal_Score', 'RS_Rating', 'RSI', 'ADX_Z', 'Mansfield_RS', 'Momentum_Score']:
-        all_reversal[col] = all_reversal[col].apply(lambda x: format_value(x, 1))
-    all_reversal['CMF'] = all_reversal['CMF'].apply(lambda x: format_value(x, 2))
+    if st.button("🔍 Generate Historical Reversal Report", key="btn_historical_reversal"):
+        with st.spinner("Analyzing 6 months of historical reversal data..."):
+            # Get interval from session state or default
+            interval_map = {'Daily': '1d', 'Weekly': '1wk', 'Hourly': '1h'}
+            current_interval = '1d'  # Will be passed from main if available
+            
+            historical_reversal_df = calculate_historical_reversal_performance(
+                sector_data_dict, 
+                benchmark_data, 
+                reversal_weights,
+                reversal_thresholds,
+                st.session_state.get('use_etf_state', False),
+                current_interval,
+                months=6
+            )
+        
+        if historical_reversal_df is not None and not historical_reversal_df.empty:
+            st.success(f"✅ Generated report for {len(historical_reversal_df)} historical dates")
+            
+            # Display the dataframe
+            st.dataframe(
+                historical_reversal_df,
+                use_container_width=True,
+                height=400,
+                hide_index=True,
+                column_config=_HISTORICAL_REVERSAL_COLUMN_CONFIG
+            )
+            
+            # Download button
+            csv_historical_reversal = _csv_bytes(historical_reversal_df)
+            st.download_button(
+                label="📥 Download Historical Top 2 Reversal Candidates (6 Months)",
+                data=csv_historical_reversal,
+                file_name=f"historical_reversal_candidates_{today}.csv",
+                mime="text/csv",
+                key="download_historical_reversal"
+            )
+        else:
+            st.warning("⚠️ Unable to generate historical reversal report. Insufficient data available.")
     
-    all_reversal = all_reversal.sort_values('Reversal_Score', ascending=False)
+    _reversal_trend_section(df, sector_data_dict, benchmark_data, reversal_weights, reversal_thresholds)
     
-    def color_reversal_mansfield(val):
-        try:
-            if float(val) > 0:
-                return 'background-color: #27AE60; color: #fff; font-weight: bold'  # Green
-            else:
-                return 'background-color: #E67E22; color: #fff; font-weight: bold'  # Orange
-        except:
-            return ''
+    # Show all sectors with reversal scores (regardless of filters)
+    st.markdown("---")
+    st.markdown("#### All Sectors - Reversal Scores")
+    st.caption("Note: Shows all sectors including those not meeting reversal filters. Reversal_Score = 0 means ineligible.")
+    # All sectors, already sorted by the numeric scores; decimals come from column_config
+    all_reversal = reversal_df.drop(columns=['Price', 'Change_%'])
     
     st.dataframe(
         all_reversal,
         use_container_width=True,
         hide_index=True,
-        column_config={
-            "Reversal_Score": st.column_config.NumberColumn(
-                "Reversal_Score",
-                format="%.1f"
-            ),
-            "CMF": st.column_config.NumberColumn(
-                "CMF",
-                format="%.2f"
-            )
-        }
+        column_config=_ALL_REVERSAL_COLUMN_CONFIG
     )
 
 
+@_safe_tab("interpretation tab")
 def display_interpretation_tab():
     """Display interpretation guide tab."""
     st.markdown("### 📊 Interpretation Guide")
@@ -2033,10 +2268,7 @@ def display_interpretation_tab():
 @st.cache_data(ttl=3600)
 def test_symbol_availability():
     """Test connectivity for all symbols at page load."""
-    import yfinance as yf
-    from datetime import datetime, timedelta
-    
-    results = {}
+    yf = _yf()
     
     # Add Nifty 50 benchmark
     all_symbols = {'Nifty 50': '^NSEI'}
@@ -2044,23 +2276,46 @@ def test_symbol_availability():
     all_symbols.update({f"{k}_ETF": v for k, v in SECTOR_ETFS.items()})
     all_symbols.update({f"{k}_ALT_ETF": v for k, v in SECTOR_ETFS_ALTERNATE.items()})
     
+    # Reuse a check saved to disk within the last hour (survives restarts and other workers)
+    try:
+        from local_cache import get_cached_availability, cache_availability
+    except ImportError:
+        get_cached_availability = cache_availability = None
+    
+    if get_cached_availability is not None:
+        saved = get_cached_availability(max_age_hours=1)
+        if saved is not None and set(saved) == set(all_symbols):
+            return {sector: saved[sector] for sector in all_symbols}
+    
     test_date = (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d')
+    end_date = datetime.now().strftime('%Y-%m-%d')
     
-    for sector, symbol in all_symbols.items():
+    def check(symbol):
         try:
-            data = yf.download(symbol, start=test_date, end=datetime.now().strftime('%Y-%m-%d'), 
-                              progress=False, interval='1d')
+            # yf.download shares module-level result dicts across threads; Ticker.history does not
+            data = yf.Ticker(symbol).history(start=test_date, end=end_date, interval='1d')
             
             if data is not None and len(data) > 0:
-                results[sector] = {'status': '✅', 'bars': len(data)}
-            else:
-                results[sector] = {'status': '❌', 'bars': 0}
+                return {'status': '✅', 'bars': len(data)}
         except:
-            results[sector] = {'status': '❌', 'bars': 0}
+            pass
+        return {'status': '❌', 'bars': 0}
+    
+    # Each check is a network round-trip, so run them concurrently
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = {executor.submit(check, symbol): sector for sector, symbol in all_symbols.items()}
+        checked = {futures[future]: future.result() for future in as_completed(futures)}
+    
+    # Keep the original symbol order for display
+    results = {sector: checked[sector] for sector in all_symbols}
+    
+    if cache_availability is not None:
+        cache_availability(results)
     
     return results
 
 
+@_safe_tab("historical rankings tab")
 def display_historical_rankings_tab(sector_data_dict, benchmark_data, momentum_weights, reversal_weights, reversal_thresholds, use_etf):
     """
     Display historical rankings showing how top 2 sectors evolved over past 7 trading days.
@@ -2083,8 +2338,6 @@ def display_historical_rankings_tab(sector_data_dict, benchmark_data, momentum_w
         st.error("❌ No data available for historical analysis")
         return
     
-    from indicators import calculate_rsi, calculate_adx, calculate_z_score, calculate_cmf, calculate_mansfield_rs
-    
     # Get current top 2 momentum sectors
     current_results = []
     for sect_name, sect_data in sector_data_dict.items():
@@ -2184,7 +2437,7 @@ def display_historical_rankings_tab(sector_data_dict, benchmark_data, momentum_w
                             
                             rsi = calculate_rsi(subset)
                             adx, _, _, di_spread = calculate_adx(subset)
-                            adx_z = calculate_z_score(adx.dropna())
+                            adx_z = calculate_z_score(adx)
                             
                             hist_data.append({
                                 'Date': date,
@@ -2279,7 +2532,7 @@ def display_historical_rankings_tab(sector_data_dict, benchmark_data, momentum_w
                                 rsi = calculate_rsi(subset)
                                 cmf = calculate_cmf(subset)
                                 adx, _, _, _ = calculate_adx(subset)
-                                adx_z = calculate_z_score(adx.dropna())
+                                adx_z = calculate_z_score(adx)
                                 
                                 hist_data.append({
                                     'Date': date,
@@ -2298,17 +2551,51 @@ def display_historical_rankings_tab(sector_data_dict, benchmark_data, momentum_w
 
 
 
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_sector_companies(excel_file, modified_time):
+    """
+    Sector-company mapping parsed from the Excel workbook, or None if it is unavailable.
+    `modified_time` is only part of the cache key, so replacing the file is picked up immediately.
+    """
+    return load_sector_companies_from_excel(excel_file)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _sector_company_frames(display_data):
+    """
+    Per-sector company tables for the Sector Companies tab, built once per mapping.
+    
+    Args:
+        display_data: Dict of {sector: {symbol: {'name', 'weight'}}}
+        
+    Returns:
+        Dict of {sector: (company DataFrame, number of companies)}
+    """
+    frames = {}
+    for sector, companies in display_data.items():
+        company_df = pd.DataFrame([
+            {'Symbol': symbol, 'Company Name': info['name'], 'Weight (%)': f"{info['weight']:.1f}"}
+            for symbol, info in companies.items()
+        ])
+        frames[sector] = (company_df, len(companies))
+    return frames
+
+
+@_safe_tab("sector companies tab")
 def display_sector_companies_tab():
     """Display sector-wise company mappings with symbols."""
     st.markdown("### 🏢 Sector-wise Company Mappings")
     st.markdown("---")
     
-    st.info("📋 **Top companies by weight in each sector/ETF** - These are the companies tracked for company-level analysis.")
+    # One date stamp for every download file name in this tab
+    today = datetime.now().strftime('%Y%m%d')
     
-    from company_symbols import SECTOR_COMPANIES, load_sector_companies_from_excel
+    st.info("📋 **Top companies by weight in each sector/ETF** - These are the companies tracked for company-level analysis.")
     
-    # Try to load from Excel if available
-    excel_data = load_sector_companies_from_excel('Sector-Company.xlsx')
+    # Try to load from Excel if available (parsed once per hour, not on every rerun)
+    excel_file = 'Sector-Company.xlsx'
+    excel_data = _cached_sector_companies(
+        excel_file, os.path.getmtime(excel_file) if os.path.exists(excel_file) else None)
     
     # Use Excel data if available, otherwise use default
     display_data = excel_data if excel_data is not None else SECTOR_COMPANIES
@@ -2333,12 +2620,12 @@ def display_sector_companies_tab():
                 })
         
         download_df = pd.DataFrame(all_company_data)
-        csv_data = download_df.to_csv(index=False)
+        csv_data = _csv_bytes(download_df)
         
         st.download_button(
             label="📥 Download All Companies (CSV)",
             data=csv_data,
-            file_name=f"sector_companies_{datetime.now().strftime('%Y%m%d')}.csv",
+            file_name=f"sector_companies_{today}.csv",
             mime="text/csv",
             help="Download current sector-company mappings"
         )
@@ -2356,44 +2643,23 @@ def display_sector_companies_tab():
     
     sectors = sorted(display_data.keys())
     half = len(sectors) // 2
+    company_frames = _sector_company_frames(display_data)
     
     # Left column
     with col1:
         for sector in sectors[:half]:
             with st.expander(f"📊 **{sector}**", expanded=False):
-                companies = display_data[sector]
-                
-                # Create dataframe for this sector
-                company_data = []
-                for symbol, info in companies.items():
-                    company_data.append({
-                        'Symbol': symbol,
-                        'Company Name': info['name'],
-                        'Weight (%)': f"{info['weight']:.1f}"
-                    })
-                
-                df = pd.DataFrame(company_data)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-                st.caption(f"Total companies: {len(companies)}")
+                company_df, company_count = company_frames[sector]
+                st.dataframe(company_df, use_container_width=True, hide_index=True)
+                st.caption(f"Total companies: {company_count}")
     
     # Right column
     with col2:
         for sector in sectors[half:]:
             with st.expander(f"📊 **{sector}**", expanded=False):
-                companies = display_data[sector]
-                
-                # Create dataframe for this sector
-                company_data = []
-                for symbol, info in companies.items():
-                    company_data.append({
-                        'Symbol': symbol,
-                        'Company Name': info['name'],
-                        'Weight (%)': f"{info['weight']:.1f}"
-                    })
-                
-                df = pd.DataFrame(company_data)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-                st.caption(f"Total companies: {len(companies)}")
+                company_df, company_count = company_frames[sector]
+                st.dataframe(company_df, use_container_width=True, hide_index=True)
+                st.caption(f"Total companies: {company_count}")
     
     # Summary statistics
     # Summary statistics
@@ -2414,6 +2680,7 @@ def display_sector_companies_tab():
         st.metric("Avg Companies/Sector", f"{avg_companies:.1f}")
 
 
+@_safe_tab("data sources tab")
 def display_data_sources_tab():
     """Display data sources connectivity status."""
     st.markdown("### 📊 Data Sources & Connectivity")
@@ -2469,17 +2736,9 @@ def display_data_sources_tab():
     # Create and display dataframe
     df_sources = pd.DataFrame(display_data)
     
-    # Style the dataframe
-    def color_status(val):
-        if val == '✅':
-            return 'background-color: #27AE60; color: #fff; font-weight: bold'
-        elif val == '❌':
-            return 'background-color: #E74C3C; color: #fff; font-weight: bold'
-        elif val == 'N/A':
-            return 'background-color: #95A5A6; color: #fff'
-        return ''
-    
-    styled_df = df_sources.style.map(color_status, subset=['Index Status', 'ETF Status', 'Alternate Status'])
+    # Style the status columns with one lookup per column
+    styled_df = df_sources.style.apply(color_status, colors=SOURCE_STATUS_COLORS,
+                                       subset=['Index Status', 'ETF Status', 'Alternate Status'])
     st.dataframe(styled_df, use_container_width=True)
     
     # Summary statistics
@@ -2502,14 +2761,71 @@ def display_data_sources_tab():
     st.caption(f"⏰ Test completed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
 
+@lru_cache(maxsize=32)
+def _weights_json(items):
+    """Indented JSON for a weights dict given as a tuple of its items (keeps the dict order)."""
+    return json.dumps(dict(items), indent=2)
+
+
+# Page header (title and sub-title) sent as a single markdown element
+HEADER_HTML = ('<div class="main-header">📊 NSE Market Sector Analysis Tool</div>'
+               '<div class="sub-header">Advanced Technical Analysis with Configurable Weights</div>')
+
+DATE_INFO_TEMPLATE = '''
+    <div class="date-info">
+        <b>📊 Data Source:</b> {data_source} | 
+        <b>📅 Analysis Date:</b> {analysis_time} | 
+        <b>📈 Market Data Date:</b> {market_date} | 
+        <b>⏱️ Interval:</b> {interval}
+    </div>
+'''
+
+
+def _analysis_timestamp_ist(run_key):
+    """
+    IST (UTC+5:30) time at which the analysis identified by run_key was first shown.
+    
+    Widget reruns of the same analysis reuse the stored string; a new run_key stamps a new time.
+    """
+    cached = st.session_state.get('analysis_ts_ist')
+    if cached is None or cached[0] != run_key:
+        ist_time = datetime.now(timezone.utc) + timedelta(hours=5, minutes=30)
+        cached = (run_key, ist_time.strftime('%Y-%m-%d %H:%M:%S IST'))
+        st.session_state['analysis_ts_ist'] = cached
+    return cached[1]
+
+
+TAB_LABELS = [
+    "📈 Momentum Ranking",
+    "🔄 Reversal Candidates",
+    "📊 Interpretation Guide",
+    "🏢 Company Momentum",
+    "🏢 Company Reversals",
+    "📅 Historical Rankings",
+    "🔌 Data Sources",
+    "🏢 Sector Companies"
+]
+
+
+def _interpretation_view():
+    """Interpretation guide followed by the indicator legend."""
+    display_interpretation_tab()
+    display_tooltip_legend()
+
+
+# Views rendered without the sector analysis, by tab label
+STANDALONE_TABS = {
+    TAB_LABELS[2]: _interpretation_view,
+    TAB_LABELS[6]: display_data_sources_tab,
+    TAB_LABELS[7]: display_sector_companies_tab
+}
+
+
 def main():
     """Main Streamlit app function."""
     try:
         # Header
-        st.markdown('<div class="main-header">📊 NSE Market Sector Analysis Tool</div>', 
-                    unsafe_allow_html=True)
-        st.markdown('<div class="sub-header">Advanced Technical Analysis with Configurable Weights</div>', 
-                    unsafe_allow_html=True)
+        st.markdown(HEADER_HTML, unsafe_allow_html=True)
         
         # Sidebar controls
         try:
@@ -2521,32 +2837,45 @@ def main():
         # Display current weights
         with st.sidebar.expander("📋 Current Configuration"):
             st.write("**Momentum Weights:**")
-            st.json(momentum_weights)
+            st.code(_weights_json(tuple(momentum_weights.items())), language="json")
             st.write("**Reversal Weights:**")
-            st.json(reversal_weights)
+            st.code(_weights_json(tuple(reversal_weights.items())), language="json")
             st.write(f"**Data Source:** {'ETF Proxy' if use_etf else 'NSE Indices'}")
             st.write(f"**Analysis Date:** {analysis_date}")
         
         # Display symbols being used
         with st.sidebar.expander("📊 Symbols Used"):
             data_source = SECTOR_ETFS if use_etf else SECTORS
-            for sector, symbol in list(data_source.items())[:5]:  # Show first 5
+            for sector, symbol in islice(data_source.items(), 5):  # Show first 5
                 st.text(f"{sector}: {symbol}")
             if len(data_source) > 5:
                 st.text(f"... and {len(data_source) - 5} more")
             st.info("See SYMBOLS.txt for complete list")
         
-        # Refresh button
+        # Refresh button: a new nonce re-keys only the downloads, so every other cached result survives
         if st.button("🔄 Run Analysis", type="primary", use_container_width=True):
-            st.cache_data.clear()
+            st.session_state['analysis_nonce'] = st.session_state.get('analysis_nonce', 0) + 1
             clear_data_cache()  # Also clear data fetcher cache
+            _clear_session_data()
+        
+        # Tab selector (8 views: 4 sector-level + 2 company-level + 1 historical + 1 sector companies + 1 data sources).
+        # Unlike st.tabs, only the selected view is rendered, so hidden views cost no compute or downloads.
+        # The date banner is filled in above the selector once the analysis has finished.
+        date_info = st.empty()
+        selected_tab = st.radio("View", TAB_LABELS, horizontal=True, key="active_tab",
+                                label_visibility="collapsed")
+        
+        # Views that do not read the analysis results paint immediately, without waiting for it
+        if selected_tab in STANDALONE_TABS:
+            STANDALONE_TABS[selected_tab]()
+            return
         
-        # Run analysis
-        with st.spinner("Analyzing sectors..."):
-            # Convert date to datetime for analysis
-            from datetime import datetime as dt
-            analysis_datetime = dt.combine(analysis_date, dt.min.time()) if analysis_date else None
-            df, sector_data, market_date = analyze_sectors_with_progress(use_etf, momentum_weights, reversal_weights, analysis_datetime, time_interval, reversal_thresholds)
+        # Run analysis (no spinner round trip when this session already holds the data)
+        analysis_datetime = datetime.combine(analysis_date, datetime.min.time()) if analysis_date else None
+        data_is_hot = _get_session_data(_session_data_key(use_etf, analysis_datetime, time_interval)) is not None
+        with st.spinner("Analyzing sectors...") if not data_is_hot else nullcontext():
+            df, sector_data, market_date = analyze_sectors_with_progress(use_etf, momentum_weights, reversal_weights, analysis_datetime, time_interval, reversal_thresholds,
+                                                                          nonce=st.session_state.get('analysis_nonce', 0))
         
         if df is None or df.empty:
             st.error("❌ Unable to complete analysis. Please try again or check your internet connection.")
@@ -2555,111 +2884,45 @@ def main():
         
         # Display combined data source and date information with IST timezone
         data_source_type = "ETF Proxy" if use_etf else "NSE Indices"
-        # Convert to IST (UTC+5:30)
-        from datetime import timezone
-        ist_offset = timedelta(hours=5, minutes=30)
-        ist_time = datetime.now(timezone.utc) + ist_offset
-        current_time_ist = ist_time.strftime('%Y-%m-%d %H:%M:%S IST')
-        st.markdown(f'''
-            <div class="date-info">
-                <b>📊 Data Source:</b> {data_source_type} | 
-                <b>📅 Analysis Date:</b> {current_time_ist} | 
-                <b>📈 Market Data Date:</b> {market_date} | 
-                <b>⏱️ Interval:</b> {time_interval}
-            </div>
-        ''', unsafe_allow_html=True)
-        
-        # Create tabs (8 total: 4 sector-level + 2 company-level + 1 historical + 1 sector companies + 1 data sources)
-        try:
-            tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
-                "📈 Momentum Ranking",
-                "🔄 Reversal Candidates",
-                "📊 Interpretation Guide",
-                "🏢 Company Momentum",
-                "🏢 Company Reversals",
-                "📅 Historical Rankings",
-                "🔌 Data Sources",
-                "🏢 Sector Companies"
-            ])
-            
-            # Get benchmark data for trend analysis
-            data_source = SECTOR_ETFS if use_etf else SECTORS
-            benchmark_data = sector_data.get('Nifty 50') if sector_data else None
-            
-            with tab1:
-                try:
-                    display_momentum_tab(df, sector_data, benchmark_data, enable_color_coding)
-                    display_tooltip_legend()
-                except Exception as e:
-                    st.error(f"❌ Error displaying momentum tab: {str(e)}")
-                    st.text(traceback.format_exc())
-            
-            with tab2:
-                try:
-                    display_reversal_tab(df, sector_data, benchmark_data, reversal_weights, reversal_thresholds, enable_color_coding)
-                    display_tooltip_legend()
-                except Exception as e:
-                    st.error(f"❌ Error displaying reversal tab: {str(e)}")
-                    st.text(traceback.format_exc())
-            
-            with tab3:
-                try:
-                    display_interpretation_tab()
-                    display_tooltip_legend()
-                except Exception as e:
-                    st.error(f"❌ Error displaying interpretation tab: {str(e)}")
-            
-            with tab4:
-                try:
-                    # Pass top sector as default for company momentum analysis
-                    # Sort by Momentum_Score first to get rank #1
-                    df_sorted_momentum = df.sort_values('Momentum_Score', ascending=False)
-                    top_sector = df_sorted_momentum.iloc[0]['Sector'] if not df_sorted_momentum.empty else None
-                    display_company_momentum_tab(time_interval=time_interval, momentum_weights=momentum_weights, analysis_date=analysis_date, default_sector=top_sector)
-                    display_tooltip_legend()
-                except Exception as e:
-                    st.error(f"❌ Error displaying company momentum tab: {str(e)}")
-                    st.text(traceback.format_exc())
-            
-            with tab5:
-                try:
-                    # Get top reversal candidate (if any)
-                    top_reversal_sector = None
-                    if not df.empty:
-                        reversal_candidates = df[df['Reversal_Status'] != 'No']
-                        if not reversal_candidates.empty:
-                            top_reversal_sector = reversal_candidates.iloc[0]['Sector']
-                    display_company_reversal_tab(time_interval=time_interval, reversal_weights=reversal_weights, reversal_thresholds=reversal_thresholds, analysis_date=analysis_date, default_sector=top_reversal_sector)
-                    display_tooltip_legend()
-                except Exception as e:
-                    st.error(f"❌ Error displaying company reversal tab: {str(e)}")
-                    st.text(traceback.format_exc())
-            
-            with tab6:
-                try:
-                    display_historical_rankings_tab(sector_data, benchmark_data, momentum_weights, reversal_weights, reversal_thresholds, use_etf)
-                    display_tooltip_legend()
-                except Exception as e:
-                    st.error(f"❌ Error displaying historical rankings tab: {str(e)}")
-                    st.text(traceback.format_exc())
-            
-            with tab7:
-                try:
-                    display_data_sources_tab()
-                except Exception as e:
-                    st.error(f"❌ Error displaying data sources tab: {str(e)}")
-                    st.text(traceback.format_exc())
-            
-            with tab8:
-                try:
-                    display_sector_companies_tab()
-                except Exception as e:
-                    st.error(f"❌ Error displaying sector companies tab: {str(e)}")
-                    st.text(traceback.format_exc())
-                    
-        except Exception as e:
-            st.error(f"❌ Error creating tabs: {str(e)}")
-            st.text(traceback.format_exc())
+        current_time_ist = _analysis_timestamp_ist(
+            (st.session_state.get('analysis_nonce', 0), use_etf, analysis_date, time_interval, market_date))
+        date_info.markdown(DATE_INFO_TEMPLATE.format(data_source=data_source_type, analysis_time=current_time_ist,
+                                                     market_date=market_date, interval=time_interval),
+                           unsafe_allow_html=True)
+        
+        # Get benchmark data for trend analysis
+        benchmark_data = sector_data.get('Nifty 50') if sector_data else None
+        
+        # Each view reports its own errors (see _safe_tab); anything else reaches the handler below
+        if selected_tab == TAB_LABELS[0]:
+            display_momentum_tab(df, sector_data, benchmark_data, enable_color_coding)
+            display_tooltip_legend()
+        
+        elif selected_tab == TAB_LABELS[1]:
+            display_reversal_tab(df, sector_data, benchmark_data, reversal_weights, reversal_thresholds, enable_color_coding)
+            display_tooltip_legend()
+        
+        elif selected_tab == TAB_LABELS[3]:
+            # Pass top sector as default for company momentum analysis
+            # Sort by Momentum_Score first to get rank #1
+            df_sorted_momentum = df.sort_values('Momentum_Score', ascending=False)
+            top_sector = df_sorted_momentum.iloc[0]['Sector'] if not df_sorted_momentum.empty else None
+            _company_momentum_tab(time_interval=time_interval, momentum_weights=momentum_weights, analysis_date=analysis_date, default_sector=top_sector)
+            display_tooltip_legend()
+        
+        elif selected_tab == TAB_LABELS[4]:
+            # Get top reversal candidate (if any)
+            top_reversal_sector = None
+            if not df.empty:
+                reversal_candidates = df[df['Reversal_Status'] != 'No']
+                if not reversal_candidates.empty:
+                    top_reversal_sector = reversal_candidates.iloc[0]['Sector']
+            _company_reversal_tab(time_interval=time_interval, reversal_weights=reversal_weights, reversal_thresholds=reversal_thresholds, analysis_date=analysis_date, default_sector=top_reversal_sector)
+            display_tooltip_legend()
+        
+        elif selected_tab == TAB_LABELS[5]:
+            display_historical_rankings_tab(sector_data, benchmark_data, momentum_weights, reversal_weights, reversal_thresholds, use_etf)
+            display_tooltip_legend()
     
     except Exception as e:
         st.error(f"❌ Critical error in main function: {str(e)}")
@@ -0,0 +1,53 @@
+"""
+Table styling module for NSE Market Sector Analysis Tool
+Cell colours and column stylers shared by the sector and company tables
+"""
+
+import pandas as pd
+import numpy as np
+
+GREEN_CELL = 'background-color: #27AE60; color: #fff; font-weight: bold'
+RED_CELL = 'background-color: #E74C3C; color: #fff; font-weight: bold'
+YELLOW_CELL = 'background-color: #F39C12; color: #fff; font-weight: bold'
+STATUS_COLORS = {'BUY_DIV': GREEN_CELL, 'Watch': YELLOW_CELL}
+SOURCE_STATUS_COLORS = {'✅': GREEN_CELL, '❌': RED_CELL, 'N/A': 'background-color: #95A5A6; color: #fff'}
+
+
+def mark_top_bottom(col, k=3, enable=True):
+    """Column styler: green for the top k values, red for the bottom k."""
+    if not enable:
+        return [''] * len(col)
+    scores = pd.to_numeric(col, errors='coerce')
+    top_threshold = scores.nlargest(k).min()
+    bottom_threshold = scores.nsmallest(k).max()
+    return np.where(scores >= top_threshold, GREEN_CELL,
+                    np.where(scores <= bottom_threshold, RED_CELL, '')).tolist()
+
+
+def color_sign(col):
+    """Column styler: green for positive values, red otherwise, blank if not numeric."""
+    values = pd.to_numeric(col, errors='coerce')
+    return np.where(values.isna(), '', np.where(values > 0, GREEN_CELL, RED_CELL)).tolist()
+
+
+def color_rsi(col, above=GREEN_CELL, below=RED_CELL, upper=65, lower=35):
+    """Column styler: `above` for RSI over `upper`, `below` for RSI under `lower`, blank otherwise."""
+    values = pd.to_numeric(col, errors='coerce')
+    return np.where(values > upper, above, np.where(values < lower, below, '')).tolist()
+
+
+def color_status(col, colors=STATUS_COLORS):
+    """Column styler: CSS looked up per status value (green for BUY_DIV, yellow for Watch by default)."""
+    return col.map(colors).fillna('').tolist()
+
+
+def table_styles(data, rules):
+    """
+    Table styler for Styler.apply(axis=None): CSS for every cell from (columns, column styler,
+    kwargs) rules, so all colour rules of a table are applied in one Styler pass.
+    """
+    css = pd.DataFrame('', index=data.index, columns=data.columns)
+    for columns, styler, kwargs in rules:
+        for col in columns:
+            css[col] = styler(data[col], **kwargs)
+    return css
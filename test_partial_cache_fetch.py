@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Test that a partially filled local cache only downloads the missing tail"""
+
+import os
+import sys
+import tempfile
+from datetime import date
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keep the SQLite cache away from the real data_cache directory
+os.chdir(tempfile.mkdtemp())
+
+import data_fetcher
+from config import MIN_DATA_POINTS
+from local_cache import cache_data
+
+SYMBOL = '^TESTPARTIAL'
+calls = []
+
+
+def _ohlcv(index):
+    close = pd.Series(range(100, 100 + len(index)), index=index, dtype=float)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1,
+                         'Close': close, 'Volume': 1000.0}, index=index.rename('Date'))
+
+
+class RecordingTicker:
+    def history(self, start=None, end=None, period=None, interval='1d'):
+        calls.append({'start': start, 'end': end, 'period': period})
+        if start is None:
+            start = pd.Timestamp(end) - pd.Timedelta(days=365)
+        return _ohlcv(pd.bdate_range(pd.Timestamp(start), pd.Timestamp(end) - pd.Timedelta(days=1)))
+
+
+end_date = date.today()
+# Cached rows stop 20 business days ago and are too few on their own to satisfy MIN_DATA_POINTS
+cached_index = pd.bdate_range(end=pd.Timestamp(end_date) - pd.offsets.BDay(20), periods=MIN_DATA_POINTS - 10)
+cache_data(SYMBOL, data_fetcher._to_cache_frame(_ohlcv(cached_index)))
+
+data_fetcher._make_ticker = lambda symbol: RecordingTicker()
+data = data_fetcher.fetch_sector_data(SYMBOL, end_date=end_date, interval='1d', use_cache=True)
+
+print(f"History calls: {calls}")
+if data is None:
+    print("❌ No data returned")
+    sys.exit(1)
+if len(calls) != 1 or calls[0]['start'] is None or pd.Timestamp(calls[0]['start']) <= cached_index.max():
+    print("❌ Expected a single download starting after the last cached date")
+    sys.exit(1)
+print(f"✅ Only the tail was downloaded ({len(data)} rows returned)")